@@ -0,0 +1,254 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+
+import numpy as np
+
+from ornek_indeksi import words, PRODUCT_COLUMN, QUESTION_COLUMN, ANSWER_COLUMN
+
+# Geçmiş soru-cevap örnekleri için anlamsal (vektör) arama.
+#
+# Soru ve ürün metinleri, kelimeler ve harf üçlüleri (" kap", "apa", ...)
+# üzerinde işaretli özellik karmasıyla sabit boyutlu vektörlere dönüştürülür;
+# böylece dış bir model ya da ağ bağlantısı gerekmez ve "Kapaklı Sepet 30x30"
+# ile "Kapakli Saklama Sepeti" gibi farklı yazılmış ilanlar birbirine yakın
+# düşer. Vektörler diskte ham float32 dosyasında tutulur ve bellek eşlemeli
+# (np.memmap) okunur; sorgu başına tek bir matris-vektör çarpımıyla tüm
+# örneklerin kosinüs benzerliği hesaplanır.
+#
+# İndeks artımlıdır: yalnızca henüz eklenmemiş satırlar (içerik özetine göre)
+# vektörleştirilip dosyaların sonuna eklenir. Tek yazıcı arka plan
+# işleyicisidir; panel indeksi salt okunur açar ve ``refresh`` ile yeni
+# satırları görür. Geçerli satır sayısı ``meta.json`` dosyasındadır, yarım
+# kalmış eklemeler bir sonraki yazmada kesilir.
+
+DIM = 384
+# Ürün benzerliğinin soru benzerliğine göre ağırlığı.
+PRODUCT_WEIGHT = 0.5
+# Bu benzerliğin altındaki örnekler sonuç ve ``min_examples`` sayımına girmez.
+MIN_SIMILARITY = 0.3
+# Vektörleştirme değiştiğinde diskteki eski indeks kullanılmasın diye artırılır.
+VECTOR_VERSION = 2
+
+VECTORS_FILE = "vektorler.f32"
+RECORDS_FILE = "kayitlar.jsonl"
+META_FILE = "meta.json"
+
+
+def _features(text):
+    features = []
+    for word in words(text):
+        features.append(word)
+        padded = f" {word} "
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return features
+
+
+def stable_hash(text):
+    """Metnin 64 bitlik özeti; süreçten sürece ve yeniden başlatmalar arasında aynıdır.
+
+    Python'un hash() değeri her süreçte farklı tohumlandığı için diske yazılan
+    vektörlerde ve süreçler arası paylaştırmada (``parcalama``) bu kullanılır.
+    """
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+_feature_slots = {}
+
+
+def _slot(feature):
+    slot = _feature_slots.get(feature)
+    if slot is None:
+        digest = stable_hash(feature)
+        slot = _feature_slots[feature] = (digest % DIM, 1.0 if digest >> 63 else -1.0)
+    return slot
+
+
+def text_vector(text):
+    vector = np.zeros(DIM, dtype=np.float32)
+    for feature in _features(text):
+        index, sign = _slot(feature)
+        vector[index] += sign
+    # Sık tekrarlanan özellikler baskın olmasın diye sayılar sönümlenir.
+    vector = np.sign(vector) * np.log1p(np.abs(vector))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def embed(product_name, question):
+    """Ürün ve soru metninden birim uzunlukta örnek vektörü."""
+    vector = text_vector(question) + PRODUCT_WEIGHT * text_vector(product_name)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def fingerprint(product_name, question, answer):
+    text = "\x1f".join(str(value) for value in (product_name, question, answer))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class SemanticIndex:
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._records = []
+        self._fingerprints = set()
+        self._records_offset = 0
+        self._vectors = np.empty((0, DIM), dtype=np.float32)
+        self._meta = {}
+        self._meta_mtime = None
+        os.makedirs(directory, exist_ok=True)
+        self.refresh()
+
+    def __len__(self):
+        return len(self._records)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_meta(self):
+        try:
+            with open(self._path(META_FILE), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if meta.get('version') != VECTOR_VERSION or meta.get('dim') != DIM:
+            return {}
+        return meta
+
+    def refresh(self):
+        """Diskteki indekste yeni satırlar varsa yükler (salt okunur açılan panel için)."""
+        try:
+            mtime = os.stat(self._path(META_FILE)).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._meta_mtime:
+            return
+        with self._lock:
+            meta = self._read_meta()
+            count = meta.get('count', 0)
+            if count < len(self._records):
+                self._records, self._fingerprints, self._records_offset = [], set(), 0
+            if count > len(self._records):
+                with open(self._path(RECORDS_FILE), "rb") as f:
+                    f.seek(self._records_offset)
+                    while len(self._records) < count:
+                        line = f.readline()
+                        if not line.endswith(b"\n"):
+                            break
+                        record = json.loads(line)
+                        self._records.append(record)
+                        self._fingerprints.add(record['fp'])
+                    self._records_offset = f.tell()
+            self._vectors = self._map_vectors(len(self._records))
+            self._meta = meta
+            self._meta_mtime = mtime
+
+    def _map_vectors(self, count):
+        if not count:
+            return np.empty((0, DIM), dtype=np.float32)
+        return np.memmap(self._path(VECTORS_FILE), dtype=np.float32, mode="r", shape=(count, DIM))
+
+    def _write_meta(self, meta):
+        tmp_path = self._path(f".{META_FILE}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._path(META_FILE))
+
+    @property
+    def meta(self):
+        return dict(self._meta)
+
+    def add(self, rows, source="cevap", meta=None):
+        """``(ürün, soru, cevap)`` satırlarından indekste olmayanları ekler; eklenen sayıyı döndürür.
+
+        ``meta`` verilirse (ör. örnek dosyasının anahtarı, cevap günlüğü imleci)
+        satırlarla birlikte ``meta.json`` dosyasına yazılır.
+        """
+        with self._lock:
+            new = []
+            seen = set()
+            for product_name, question, answer in rows:
+                if not str(question).strip() or not str(answer).strip():
+                    continue
+                fp = fingerprint(product_name, question, answer)
+                if fp in self._fingerprints or fp in seen:
+                    continue
+                seen.add(fp)
+                new.append({'fp': fp, 'product': str(product_name), 'question': str(question),
+                            'answer': str(answer), 'source': source})
+            if not new and meta is None:
+                return 0
+
+            count = len(self._records)
+            # Önceki yazma yarıda kaldıysa geçerli satırlardan sonrası atılır.
+            with open(self._path(VECTORS_FILE), "ab") as f:
+                f.truncate(count * DIM * 4)
+            with open(self._path(RECORDS_FILE), "ab") as f:
+                f.truncate(self._records_offset)
+            if new:
+                vectors = np.vstack([embed(r['product'], r['question']) for r in new]).astype(np.float32)
+                with open(self._path(VECTORS_FILE), "ab") as f:
+                    f.write(vectors.tobytes())
+                with open(self._path(RECORDS_FILE), "ab") as f:
+                    for record in new:
+                        f.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+                    self._records_offset = f.tell()
+
+            self._records.extend(new)
+            self._fingerprints.update(r['fp'] for r in new)
+            meta = {**self._meta, **(meta or {}), 'version': VECTOR_VERSION, 'dim': DIM, 'count': len(self._records)}
+            self._write_meta(meta)
+            self._meta = meta
+            self._meta_mtime = os.stat(self._path(META_FILE)).st_mtime_ns
+            self._vectors = self._map_vectors(len(self._records))
+            return len(new)
+
+    def sync_frame(self, df, source_key):
+        """Örnek tablosundaki yeni satırları ekler; tablo değişmediyse hiçbir şey yapmaz.
+
+        Tablodan satır silindiyse indeks, eklenmiş cevaplar korunarak baştan kurulur.
+        """
+        if self._meta.get('source_key') == source_key:
+            return 0
+        rows = list(df[[PRODUCT_COLUMN, QUESTION_COLUMN, ANSWER_COLUMN]].itertuples(index=False, name=None))
+        fingerprints = [fingerprint(*row) for row in rows]
+        current = set(fingerprints)
+        if any(r['source'] == 'ornek' and r['fp'] not in current for r in self._records):
+            logging.info("Örnek dosyasından satır silinmiş, anlamsal indeks yeniden kuruluyor.")
+            self.rebuild(rows, [r for r in self._records if r['source'] != 'ornek'])
+        new_rows = [row for row, fp in zip(rows, fingerprints) if fp not in self._fingerprints]
+        added = self.add(new_rows, source='ornek', meta={'source_key': source_key})
+        if added:
+            logging.info(f"Anlamsal indekse {added} örnek eklendi ({len(self)} kayıt).")
+        return added
+
+    def rebuild(self, rows, extra_records=()):
+        with self._lock:
+            for name in (VECTORS_FILE, RECORDS_FILE, META_FILE):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+            self._records, self._fingerprints, self._records_offset = [], set(), 0
+            self._vectors = self._map_vectors(0)
+            self._meta, self._meta_mtime = {}, None
+        for source in {r['source'] for r in extra_records}:
+            self.add([(r['product'], r['question'], r['answer']) for r in extra_records if r['source'] == source], source=source)
+
+    def search(self, product_name, question, k=3):
+        """Soruya en benzer ``k`` örneği döndürür.
+
+        ``ExampleIndex.search`` ile aynı biçimde ``([(soru, cevap), ...],
+        benzer örnek sayısı)`` döner; sayım ``MIN_SIMILARITY`` üstündeki örneklerdir.
+        """
+        with self._lock:
+            vectors, records = self._vectors, self._records
+        if not len(vectors):
+            return [], 0
+        scores = vectors @ embed(product_name, question)
+        match_count = int(np.count_nonzero(scores >= MIN_SIMILARITY))
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(records[i]['question'], records[i]['answer']) for i in top if scores[i] >= MIN_SIMILARITY], match_count
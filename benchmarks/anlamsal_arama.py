@@ -0,0 +1,140 @@
+"""Örnek aramasında BM25 (ürün adı + soru) ile anlamsal vektör aramasının isabet ve gecikme karşılaştırması.
+
+Örnek tablosundan seçilen satırlar, ilanlar arasında olduğu gibi ürün adı
+değiştirilerek (kelime atma/ekleme, yazım farkı, Türkçe karakter kaybı) ve
+soruda yazım hataları yapılarak sorguya dönüştürülür. Sorgunun kaynak
+örneği ilk ``k`` sonuçta geliyorsa isabet sayılır (recall@k).
+
+Kullanım (depo kök dizininden)::
+
+    python benchmarks/anlamsal_arama.py
+    python benchmarks/anlamsal_arama.py --scale 20 --queries 500
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from servisler import read_past_data  # noqa: E402
+from ornek_indeksi import ExampleIndex, PRODUCT_COLUMN, QUESTION_COLUMN, ANSWER_COLUMN  # noqa: E402
+from anlamsal_indeks import SemanticIndex  # noqa: E402
+
+_ASCII = str.maketrans('ığüşöçİĞÜŞÖÇ', 'igusocIGUSOC')
+
+
+def vary_product(name, rng, vocabulary):
+    tokens = str(name).split()
+    if len(tokens) > 3:
+        tokens = [t for t in tokens if rng.random() > 0.3] or tokens[:2]
+    # Başka ilanlarda geçen bir kelime ("Set", "Büyük", "2'li") eklenir ya da bir kelimede yazım farkı olur.
+    if rng.random() < 0.5:
+        tokens.insert(rng.randrange(len(tokens) + 1), rng.choice(vocabulary))
+    if rng.random() < 0.3:
+        i = rng.randrange(len(tokens))
+        tokens[i] = vary_question(tokens[i], rng)
+    if len(tokens) > 1 and rng.random() < 0.5:
+        i = rng.randrange(len(tokens) - 1)
+        tokens[i], tokens[i + 1] = tokens[i + 1], tokens[i]
+    text = " ".join(tokens)
+    return text.translate(_ASCII) if rng.random() < 0.5 else text
+
+
+def vary_question(text, rng):
+    chars = list(str(text))
+    for _ in range(max(1, len(chars) // 25)):
+        if len(chars) < 4:
+            break
+        i = rng.randrange(len(chars) - 1)
+        if rng.random() < 0.5:
+            chars[i], chars[i + 1] = chars[i + 1], chars[i]
+        else:
+            del chars[i]
+    return "".join(chars)
+
+
+def evaluate(search, queries, k):
+    durations, hits = [], 0
+    for product_name, question, source in queries:
+        started = time.perf_counter()
+        examples, _ = search(product_name, question, k)
+        durations.append((time.perf_counter() - started) * 1000)
+        hits += source in examples
+    durations.sort()
+    return {
+        'recall': hits / len(queries),
+        'p50_ms': statistics.median(durations),
+        'p99_ms': durations[min(len(durations) - 1, int(len(durations) * 0.99))],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file", default="soru_cevap_ornekleri.xlsx")
+    parser.add_argument("--scale", type=int, default=1, help="Tablonun kaç kez çoğaltılacağı")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    past_df = read_past_data(args.file)
+    if past_df is None:
+        print(f"{args.file} okunamadı.")
+        return 1
+    if args.scale > 1:
+        # Çoğaltılan satırlar ayrı örnek sayılsın diye sorulara kopya numarası eklenir.
+        past_df = pd.concat(
+            [past_df.assign(**{QUESTION_COLUMN: past_df[QUESTION_COLUMN].astype(str) + ("" if i == 0 else f" #{i}")})
+             for i in range(args.scale)], ignore_index=True)
+
+    rng = random.Random(args.seed)
+    vocabulary = sorted({token for name in past_df[PRODUCT_COLUMN].astype(str).unique() for token in name.split()})
+    sample = past_df.sample(n=min(args.queries, len(past_df)), random_state=args.seed)
+    queries = [
+        (vary_product(row[PRODUCT_COLUMN], rng, vocabulary), vary_question(row[QUESTION_COLUMN], rng),
+         (str(row[QUESTION_COLUMN]), str(row[ANSWER_COLUMN])))
+        for _, row in sample.iterrows()
+    ]
+
+    started = time.perf_counter()
+    bm25 = ExampleIndex(past_df)
+    bm25_build = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory(prefix="anlamsal-") as directory:
+        head = past_df.iloc[:-100] if len(past_df) > 200 else past_df
+        started = time.perf_counter()
+        semantic = SemanticIndex(directory)
+        semantic.add(head[[PRODUCT_COLUMN, QUESTION_COLUMN, ANSWER_COLUMN]].itertuples(index=False, name=None), source='ornek')
+        semantic_build = time.perf_counter() - started
+        started = time.perf_counter()
+        added = semantic.sync_frame(past_df, source_key="benchmark")
+        incremental = time.perf_counter() - started
+        started = time.perf_counter()
+        reopened = SemanticIndex(directory)
+        reopen = time.perf_counter() - started
+        size_mb = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)) / 2 ** 20
+
+        results = {
+            "BM25": evaluate(bm25.search, queries, args.k),
+            "Anlamsal": evaluate(reopened.search, queries, args.k),
+        }
+
+    print(f"Satır sayısı        : {len(past_df)}")
+    print(f"Sorgu sayısı        : {len(queries)} (k={args.k})")
+    print(f"Kurulum             : BM25 {bm25_build:.2f} sn, anlamsal {semantic_build:.2f} sn")
+    print(f"Artımlı ekleme      : {added} satır {incremental * 1000:.0f} ms")
+    print(f"Diskten açma        : {reopen * 1000:.0f} ms ({size_mb:.1f} MB)")
+    print(f"{'':20}{'recall@k':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+    for name, result in results.items():
+        print(f"{name:20}{result['recall']:>10.2%}{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Token bütçesinin OpenAI istem boyutuna etkisi: eski tek mesajlı istem ile bütçeli istemin karşılaştırması.
+
+Örnek tablosundan seçilen sorular için örnek indeksinde arama yapılır ve
+eski biçimde (ilk 3 örnek olduğu gibi) ve ``istem_butcesi.build_messages``
+ile kurulan istemlerin girdi tokenları yerel olarak sayılır. Uzun geçmiş
+cevapların etkisini görmek için ``--long-answers`` ile örnek cevaplarının bir
+kısmı çoğaltılarak uzatılabilir.
+
+Kullanım (depo kök dizininden)::
+
+    python benchmarks/istem_boyutu.py
+    python benchmarks/istem_boyutu.py --budget 500 --long-answers 0.3
+"""
+import os
+import sys
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from servisler import Config, read_past_data  # noqa: E402
+from ornek_indeksi import ExampleIndex, PRODUCT_COLUMN, QUESTION_COLUMN, ANSWER_COLUMN  # noqa: E402
+from istem_butcesi import build_messages, messages_tokens, SYSTEM_PROMPT, tiktoken  # noqa: E402
+
+
+def legacy_messages(product_name, question, examples):
+    """Bütçeleme öncesi istem: tek kullanıcı mesajı, ilk 3 örnek olduğu gibi."""
+    prompt = f"""
+    {SYSTEM_PROMPT}
+
+    Ürün: {product_name}
+    Soru: {question}
+    """
+    if examples:
+        prompt += "\n\nBenzer Geçmiş Sorular ve Cevaplarımız:\n"
+        for example_question, example_answer in examples[:3]:
+            prompt += f"- Soru: {example_question}\n  Cevap: {example_answer}\n"
+    return [{"role": "user", "content": prompt}]
+
+
+def summarize(values):
+    ordered = sorted(values)
+    return {
+        'ort': statistics.mean(ordered),
+        'p50': ordered[len(ordered) // 2],
+        'p99': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        'max': ordered[-1],
+    }
+
+
+def main(argv=None):
+    defaults = Config()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file", default="soru_cevap_ornekleri.xlsx")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--budget", type=int, default=defaults.prompt_token_budget)
+    parser.add_argument("--example-max-tokens", type=int, default=defaults.example_max_tokens)
+    parser.add_argument("--max-examples", type=int, default=defaults.max_examples)
+    parser.add_argument("--long-answers", type=float, default=0.0, help="Uzatılacak örnek cevaplarının oranı")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    past_df = read_past_data(args.file)
+    if past_df is None:
+        print(f"{args.file} okunamadı.")
+        return 1
+    rng = random.Random(args.seed)
+    if args.long_answers:
+        past_df = past_df.copy()
+        past_df[ANSWER_COLUMN] = [
+            " ".join([str(answer)] * rng.randint(4, 12)) if rng.random() < args.long_answers else answer
+            for answer in past_df[ANSWER_COLUMN]
+        ]
+    index = ExampleIndex(past_df)
+    sample = past_df.sample(n=min(args.queries, len(past_df)), random_state=args.seed)
+
+    model = defaults.openai_model
+    legacy, budgeted = [], []
+    totals = {'used': 0, 'truncated': 0, 'dropped': 0, 'duplicate': 0}
+    for _, row in sample.iterrows():
+        product_name, question = str(row[PRODUCT_COLUMN]), str(row[QUESTION_COLUMN])
+        examples, _ = index.search(product_name, question, k=max(args.max_examples * 2, 1))
+        legacy.append(messages_tokens(legacy_messages(product_name, question, examples), model))
+        _, stats = build_messages(product_name, question, examples, model, budget=args.budget,
+                                  example_max_tokens=args.example_max_tokens, max_examples=args.max_examples)
+        budgeted.append(stats['input_tokens'])
+        for outcome in totals:
+            totals[outcome] += stats[outcome]
+
+    print(f"Sayım               : {'tiktoken' if tiktoken else 'karakter tahmini'} ({model})")
+    print(f"Sorgu sayısı        : {len(sample)} (bütçe {args.budget}, örnek başına {args.example_max_tokens}, en fazla {args.max_examples} örnek)")
+    print(f"Örnekler            : {totals['used']} eklendi, {totals['truncated']} kısaltıldı, "
+          f"{totals['dropped']} bütçeye sığmadı, {totals['duplicate']} tekrar atlandı")
+    print(f"{'Girdi token':20}{'ort':>8}{'p50':>8}{'p99':>8}{'max':>8}")
+    for name, values in (("Eski istem", legacy), ("Bütçeli istem", budgeted)):
+        summary = summarize(values)
+        print(f"{name:20}{summary['ort']:>8.0f}{summary['p50']:>8}{summary['p99']:>8}{summary['max']:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
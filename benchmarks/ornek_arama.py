@@ -0,0 +1,85 @@
+"""Geçmiş örnek aramasında eski tam tarama ile indeksli aramanın karşılaştırması.
+
+Kullanım (depo kök dizininden)::
+
+    python benchmarks/ornek_arama.py                 # örnek dosyası olduğu gibi
+    python benchmarks/ornek_arama.py --scale 50      # satırları 50 kez çoğaltarak
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from servisler import read_past_data  # noqa: E402
+from ornek_indeksi import ExampleIndex  # noqa: E402
+
+
+def scan_search(past_df, product_name, question, k=3):
+    # safe_generate_answer içindeki eski yöntem: her soruda tüm tabloyu tarar.
+    mask = past_df['Ürün İsmi'].astype(str).str.contains(str(product_name), case=False, na=False)
+    examples = past_df[mask]
+    return list(examples.head(k)[['Soru Detayı', 'Onaylanan Cevap']].itertuples(index=False, name=None)), len(examples)
+
+
+def timed(fn, queries):
+    durations = []
+    for product_name, question in queries:
+        started = time.perf_counter()
+        fn(product_name, question)
+        durations.append((time.perf_counter() - started) * 1000)
+    durations.sort()
+    return {
+        'p50_ms': statistics.median(durations),
+        'p99_ms': durations[min(len(durations) - 1, int(len(durations) * 0.99))],
+        'mean_ms': statistics.fmean(durations),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file", default="soru_cevap_ornekleri.xlsx")
+    parser.add_argument("--scale", type=int, default=1, help="Tablonun kaç kez çoğaltılacağı")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    past_df = read_past_data(args.file)
+    if past_df is None:
+        print(f"{args.file} okunamadı.")
+        return 1
+    if args.scale > 1:
+        past_df = pd.concat([past_df] * args.scale, ignore_index=True)
+
+    rng = random.Random(args.seed)
+    sample = past_df.sample(n=min(args.queries, len(past_df)), random_state=args.seed)
+    # Ürün isimleri gerçek hayatta ilanlar arasında değişebildiği için ilk birkaç kelime kullanılır.
+    queries = [
+        (" ".join(str(row['Ürün İsmi']).split()[:rng.randint(2, 4)]), str(row['Soru Detayı']))
+        for _, row in sample.iterrows()
+    ]
+
+    started = time.perf_counter()
+    index = ExampleIndex(past_df)
+    build_seconds = time.perf_counter() - started
+
+    scan = timed(lambda p, q: scan_search(past_df, p, q), queries)
+    indexed = timed(lambda p, q: index.search(p, q), queries)
+
+    print(f"Satır sayısı      : {len(past_df)}")
+    print(f"Sorgu sayısı      : {len(queries)}")
+    print(f"İndeks kurulumu   : {build_seconds:.2f} sn")
+    print(f"{'':18}{'p50 (ms)':>10}{'p99 (ms)':>10}{'ort. (ms)':>11}")
+    for name, result in (("Tam tarama", scan), ("İndeks", indexed)):
+        print(f"{name:18}{result['p50_ms']:>10.3f}{result['p99_ms']:>10.3f}{result['mean_ms']:>11.3f}")
+    print(f"Hızlanma (p50)    : {scan['p50_ms'] / max(indexed['p50_ms'], 1e-9):.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
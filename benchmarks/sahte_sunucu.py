@@ -0,0 +1,318 @@
+"""Trendyol, Telegram ve OpenAI uç noktalarını taklit eden yerel test sunucusu.
+
+Gecikme, hata oranı, 429 oranı ve veri hacmi ayarlanabilir. Panel ya da arka
+plan işleyicisi aşağıdaki ortam değişkenleriyle bu sunucuya yönlendirilir::
+
+    python benchmarks/sahte_sunucu.py --port 8765 --stores 5 --questions 200
+
+    PANEL_TRENDYOL_API=http://127.0.0.1:8765 \\
+    PANEL_TELEGRAM_API=http://127.0.0.1:8765 \\
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python calisan.py
+
+Sayaçlar ``GET /__stats`` ile okunur, ``POST /__reset`` ile sıfırlanır.
+"""
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+PRODUCTS = [
+    "Şeffaf Kapaklı Saklama Kutusu", "Katlanabilir Çamaşır Sepeti", "Pamuklu Nevresim Takımı",
+    "Vakumlu Hurç 3'lü Set", "Bambu Banyo Rafı", "Kadife Kırlent Kılıfı", "Çok Amaçlı Düzenleyici",
+]
+QUESTIONS = [
+    "Ölçüleri nedir?", "Kargoya ne zaman verilir?", "Makinede yıkanabilir mi?", "Hangi kargo ile gönderiyorsunuz?",
+    "Katlanabiliyor mu?", "İndirim olacak mı?", "Rengi fotoğraftaki gibi mi?", "Kapağı sıkı kapanıyor mu?",
+    "Paketleme nasıl yapılıyor?", "Ürün eksik geldi ne yapmalıyım?",
+]
+
+ROUTES = [
+    ('trendyol_claims', 'GET', re.compile(r"^/integration/order/sellers/(?P<seller>[^/]+)/claims$")),
+    ('trendyol_approve', 'PUT', re.compile(r"^/integration/order/sellers/(?P<seller>[^/]+)/claims/(?P<id>[^/]+)/items/approve$")),
+    ('trendyol_questions', 'GET', re.compile(r"^/integration/qna/sellers/(?P<seller>[^/]+)/questions/filter$")),
+    ('trendyol_answer', 'POST', re.compile(r"^/integration/qna/sellers/(?P<seller>[^/]+)/questions/(?P<id>\d+)/answers$")),
+    ('telegram_updates', 'GET', re.compile(r"^/bot[^/]+/getUpdates$")),
+    ('telegram_send', 'POST', re.compile(r"^/bot[^/]+/sendMessage$")),
+    ('openai_chat', 'POST', re.compile(r"^/v1/chat/completions$")),
+]
+
+
+class FakeBackend:
+    """Sahte mağaza verileri, hata/gecikme ayarları ve istek sayaçları."""
+
+    def __init__(self, stores=3, questions=100, claims=20, latency_ms=50.0, jitter_ms=20.0,
+                 openai_latency_ms=400.0, error_rate=0.0, throttle_rate=0.0, seed=42):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.openai_latency_ms = openai_latency_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self.sellers = {}
+        self.updates = []
+        for number in range(1, stores + 1):
+            self.sellers[str(number)] = {'questions': {}, 'claims': {}}
+            self.add_questions(str(number), questions)
+            self.add_claims(str(number), claims)
+        self.reset_stats()
+
+    def seller_ids(self):
+        return list(self.sellers)
+
+    def _new_id(self):
+        self._next_id += 1
+        return self._next_id
+
+    def add_questions(self, seller_id, count):
+        now_ms = int(time.time() * 1000)
+        with self._lock:
+            for _ in range(count):
+                q_id = self._new_id()
+                self.sellers[seller_id]['questions'][q_id] = {
+                    'id': q_id,
+                    'productName': self.random.choice(PRODUCTS),
+                    'text': f"{self.random.choice(QUESTIONS)} ({q_id})",
+                    'creationDate': now_ms,
+                    'status': 'WAITING_FOR_ANSWER',
+                }
+
+    def add_claims(self, seller_id, count):
+        now_ms = int(time.time() * 1000)
+        with self._lock:
+            for _ in range(count):
+                claim_id = f"c{self._new_id()}"
+                self.sellers[seller_id]['claims'][claim_id] = {
+                    'id': claim_id,
+                    'orderNumber': str(self._new_id()),
+                    'claimDate': now_ms,
+                    'claimType': {'name': 'Vazgeçtim'},
+                    'status': 'WaitingInAction',
+                    'items': [{'claimItems': [{'id': f"{claim_id}-{i}"} for i in range(2)]}],
+                }
+
+    def add_reply(self, chat_id, original_text, text):
+        """Telegram'da bir bildirime operatör yanıtı gelmiş gibi güncelleme ekler."""
+        with self._lock:
+            self.updates.append({
+                'update_id': self._new_id(),
+                'message': {'chat': {'id': int(chat_id)}, 'from': {'username': 'operator'}, 'text': text,
+                            'reply_to_message': {'text': original_text}},
+            })
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls = {}
+            self.durations = {}
+            self.statuses = {}
+            self.sent_messages = []
+
+    def record(self, route, status, seconds):
+        with self._lock:
+            self.calls[route] = self.calls.get(route, 0) + 1
+            self.durations.setdefault(route, []).append(seconds * 1000)
+            self.statuses.setdefault(route, {}).setdefault(str(status), 0)
+            self.statuses[route][str(status)] += 1
+
+    def stats(self):
+        with self._lock:
+            result = {}
+            for route, durations in self.durations.items():
+                ordered = sorted(durations)
+                result[route] = {
+                    'calls': self.calls[route],
+                    'p50_ms': statistics.median(ordered),
+                    'p99_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+                    'statuses': dict(self.statuses[route]),
+                }
+            return result
+
+    def pending_questions(self):
+        with self._lock:
+            return sum(len(seller['questions']) for seller in self.sellers.values())
+
+    def pending_claims(self):
+        with self._lock:
+            return sum(len(seller['claims']) for seller in self.sellers.values())
+
+    # --- Uç noktalar ---
+
+    def _page(self, items, query, date_field):
+        start = int(query.get('startDate', [0])[0])
+        end = int(query.get('endDate', [2 ** 62])[0])
+        items = [item for item in items if start <= item[date_field] <= end]
+        page, size = int(query.get('page', [0])[0]), int(query.get('size', [50])[0])
+        total_pages = max(1, -(-len(items) // size))
+        return {'content': items[page * size:(page + 1) * size], 'page': page, 'size': size,
+                'totalElements': len(items), 'totalPages': total_pages}
+
+    def handle(self, route, match, query, body):
+        seller = self.sellers.get(match.groupdict().get('seller', ''), {'questions': {}, 'claims': {}})
+        if route == 'trendyol_claims':
+            with self._lock:
+                claims = list(seller['claims'].values())
+            return 200, self._page(claims, query, 'claimDate')
+        if route == 'trendyol_approve':
+            with self._lock:
+                removed = seller['claims'].pop(match.group('id'), None)
+            return (200, {}) if removed else (400, {'errors': [{'message': 'Talep bulunamadı'}]})
+        if route == 'trendyol_questions':
+            with self._lock:
+                questions = list(seller['questions'].values())
+            return 200, self._page(questions, query, 'creationDate')
+        if route == 'trendyol_answer':
+            with self._lock:
+                removed = seller['questions'].pop(int(match.group('id')), None)
+            return (200, {}) if removed else (400, {'errors': [{'message': 'Soru zaten cevaplanmış'}]})
+        if route == 'telegram_updates':
+            offset = int(query.get('offset', [0])[0])
+            with self._lock:
+                self.updates = [u for u in self.updates if u['update_id'] >= offset]
+                return 200, {'ok': True, 'result': list(self.updates)}
+        if route == 'telegram_send':
+            with self._lock:
+                self.sent_messages.append(body)
+            return 200, {'ok': True, 'result': {'message_id': self._new_id(), 'text': body.get('text', '')}}
+        if route == 'openai_chat':
+            prompt = " ".join(str(m.get('content', '')) for m in body.get('messages', []))
+            answer = "Merhaba, sorunuz için teşekkür ederiz. Ürünümüz açıklamada belirtilen özelliklere sahiptir."
+            return 200, {
+                'id': f"chatcmpl-{self._new_id()}", 'object': 'chat.completion', 'created': int(time.time()),
+                'model': body.get('model', 'test'),
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': answer}, 'finish_reason': 'stop'}],
+                'usage': {'prompt_tokens': len(prompt) // 3, 'completion_tokens': len(answer) // 3,
+                          'total_tokens': len(prompt) // 3 + len(answer) // 3},
+            }
+        return 404, {}
+
+    def delay(self, route):
+        base = self.openai_latency_ms if route == 'openai_chat' else self.latency_ms
+        jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        time.sleep(max(0.0, base + jitter) / 1000)
+
+    def fault(self, route):
+        """Ayarlanan oranlarda 429 ya da 500 döndürür; hata yoksa ``None``."""
+        roll = self.random.random()
+        if roll < self.throttle_rate:
+            if route.startswith('telegram'):
+                return 429, {'ok': False, 'error_code': 429, 'parameters': {'retry_after': 1}}
+            return 429, {'error': {'message': 'Rate limit', 'type': 'rate_limit_error'}}
+        if roll < self.throttle_rate + self.error_rate:
+            return 500, {'error': {'message': 'Sunucu hatası'}}
+        return None
+
+
+def make_handler(backend):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Başlık ve gövde ayrı paketlerde gittiğinde Nagle + gecikmeli ACK her yanıta ~40 ms ekler.
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, status, payload, headers=None):
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _dispatch(self, method):
+            started = time.perf_counter()
+            parts = urlsplit(self.path)
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            if parts.path == "/__stats":
+                return self._reply(200, backend.stats())
+            if parts.path == "/__reset" and method == "POST":
+                backend.reset_stats()
+                return self._reply(200, {})
+            for route, route_method, pattern in ROUTES:
+                match = pattern.match(parts.path)
+                if match and method == route_method:
+                    break
+            else:
+                return self._reply(404, {'error': 'bulunamadı'})
+
+            backend.delay(route)
+            result = backend.fault(route)
+            headers = {"Retry-After": "1"} if result and result[0] == 429 else None
+            if result is None:
+                try:
+                    body = json.loads(raw or b"{}")
+                except ValueError:
+                    body = {}
+                result = backend.handle(route, match, parse_qs(parts.query), body)
+            self._reply(*result, headers=headers)
+            backend.record(route, result[0], time.perf_counter() - started)
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def do_PUT(self):
+            self._dispatch("PUT")
+
+    return Handler
+
+
+def start_server(backend, host="127.0.0.1", port=0):
+    """Sunucuyu arka planda başlatır; ``(sunucu, temel_url)`` döndürür."""
+    server = ThreadingHTTPServer((host, port), make_handler(backend))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="sahte-sunucu", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def add_backend_arguments(parser):
+    parser.add_argument("--stores", type=int, default=3, help="Mağaza sayısı")
+    parser.add_argument("--questions", type=int, default=100, help="Mağaza başına bekleyen soru sayısı")
+    parser.add_argument("--claims", type=int, default=20, help="Mağaza başına onay bekleyen talep sayısı")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Trendyol/Telegram yanıt gecikmesi")
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--openai-latency-ms", type=float, default=400.0, help="OpenAI yanıt gecikmesi")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 döndürülecek isteklerin oranı")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="429 döndürülecek isteklerin oranı")
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def backend_from_args(args):
+    return FakeBackend(stores=args.stores, questions=args.questions, claims=args.claims, latency_ms=args.latency_ms,
+                       jitter_ms=args.jitter_ms, openai_latency_ms=args.openai_latency_ms, error_rate=args.error_rate,
+                       throttle_rate=args.throttle_rate, seed=args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_backend_arguments(parser)
+    args = parser.parse_args(argv)
+
+    backend = backend_from_args(args)
+    server, base_url = start_server(backend, args.host, args.port)
+    print(f"Sahte sunucu çalışıyor: {base_url}")
+    print(f"Satıcı kimlikleri (seller_id): {', '.join(backend.seller_ids())}")
+    print(f"  PANEL_TRENDYOL_API={base_url} PANEL_TELEGRAM_API={base_url} OPENAI_BASE_URL={base_url}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
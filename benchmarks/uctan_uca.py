@@ -0,0 +1,157 @@
+"""Sahte sunucuya karşı arka plan işleyicisinin uçtan uca yük testi.
+
+N mağaza × M soru ile tam yokla → karar ver → uygula döngüleri çalıştırılır;
+döngü süreleri, uç nokta başına çağrı sayıları ve p50/p99 gecikmeleri ile
+bellek kullanımı raporlanır. Değişikliklerin öncesi ve sonrası aynı
+parametrelerle çalıştırılıp ``--json`` çıktıları karşılaştırılabilir.
+
+Kullanım (depo kök dizininden)::
+
+    python benchmarks/uctan_uca.py --stores 5 --questions 100 --cycles 5
+    python benchmarks/uctan_uca.py --error-rate 0.05 --throttle-rate 0.02 --json sonuc.json
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import resource
+import tempfile
+import statistics
+import tracemalloc
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sahte_sunucu import add_backend_arguments, backend_from_args, start_server  # noqa: E402
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_backend_arguments(parser)
+    parser.add_argument("--cycles", type=int, default=5, help="Çalıştırılacak döngü sayısı")
+    parser.add_argument("--arrivals", type=int, default=5, help="Döngüler arasında mağaza başına gelen yeni soru sayısı")
+    parser.add_argument("--claim-arrivals", type=int, default=1, help="Döngüler arasında mağaza başına gelen yeni talep sayısı")
+    parser.add_argument("--workers", type=int, default=8, help="Eşzamanlı yoklanacak en fazla mağaza sayısı")
+    parser.add_argument("--deadline", type=int, default=45)
+    parser.add_argument("--full-sync-every", type=int, default=10)
+    parser.add_argument("--parallelism", type=int, default=4, help="Eşzamanlı OpenAI çağrısı")
+    parser.add_argument("--templates", action="store_true", help="Eşleşen şablonları otomatik uygula")
+    parser.add_argument("--json", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args(argv)
+
+    backend = backend_from_args(args)
+    server, base_url = start_server(backend)
+
+    # Modüller dosya yollarını ve adresleri içe aktarılırken okuduğu için ortam önce hazırlanır.
+    workdir = tempfile.mkdtemp(prefix="panel-yuk-testi-")
+    os.environ.update({
+        'PANEL_TRENDYOL_API': base_url,
+        'PANEL_TELEGRAM_API': base_url,
+        'OPENAI_BASE_URL': f"{base_url}/v1",
+        'PANEL_DURUM_DOSYASI': os.path.join(workdir, "durum.db"),
+        'PANEL_AYAR_DOSYASI': os.path.join(workdir, "ayarlar.json"),
+        'PANEL_LLM_ONBELLEGI': os.path.join(workdir, "llm.db"),
+        'PANEL_CEVAP_GUNLUGU': os.path.join(workdir, "cevap_gunlugu"),
+        'PANEL_ANLAMSAL_INDEKS': os.path.join(workdir, "anlamsal"),
+    })
+    import http_havuzu
+    import servisler
+    from calisan import Worker
+    from durum_deposu import StateStore
+    logging.getLogger().setLevel(logging.WARNING)
+
+    servisler.configure({
+        'OPENAI_API_KEY': 'yuk-testi',
+        'TELEGRAM_BOT_TOKEN': 'yuk-testi',
+        'TELEGRAM_CHAT_ID': '1',
+        'stores': [
+            {'name': f"Mağaza {seller_id}", 'seller_id': seller_id, 'api_key': 'k', 'api_secret': 's',
+             'auto_answer_questions': True, 'auto_approve_claims': True, 'send_notifications': True}
+            for seller_id in backend.seller_ids()
+        ],
+    })
+    servisler.save_config(servisler.Config(delay_minutes=0, generation_parallelism=args.parallelism,
+                                           template_auto_apply=args.templates))
+
+    initial_questions = backend.pending_questions()
+    initial_claims = backend.pending_claims()
+    arrived_questions = arrived_claims = 0
+
+    tracemalloc.start()
+    worker = Worker(servisler.STORES, StateStore(servisler.STATE_FILE), max_workers=args.workers,
+                    cycle_deadline=args.deadline, full_sync_every=args.full_sync_every)
+    cycle_times, flush_times = [], []
+    for cycle in range(args.cycles):
+        if cycle:
+            for seller_id in backend.seller_ids():
+                backend.add_questions(seller_id, args.arrivals)
+                backend.add_claims(seller_id, args.claim_arrivals)
+            arrived_questions += args.arrivals * len(backend.seller_ids())
+            arrived_claims += args.claim_arrivals * len(backend.seller_ids())
+        # Döngüler art arda çalıştığı için uyarlanabilir aralık beklenmez; her döngüde tüm mağazalar yoklanır.
+        worker.schedule.reset()
+        started = time.perf_counter()
+        try:
+            worker.telegram.poll_once(timeout=0)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logging.error(f"Telegram güncellemeleri alınamadı: {e}")
+        worker.run_cycle()
+        cycle_times.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        servisler.get_telegram_queue().flush(timeout=120)
+        flush_times.append(time.perf_counter() - started)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    worker.telegram.stop()
+    worker.executor.shutdown(wait=False, cancel_futures=True)
+    worker.scheduler.shutdown()
+    worker.approver.shutdown()
+    http_havuzu.close_sessions()
+    server.shutdown()
+
+    endpoints = backend.stats()
+    result = {
+        'parameters': vars(args),
+        'cycle_seconds': cycle_times,
+        'cycle_p50_seconds': statistics.median(cycle_times),
+        'cycle_p99_seconds': percentile(cycle_times, 0.99),
+        'telegram_flush_seconds': flush_times,
+        'questions_answered': initial_questions + arrived_questions - backend.pending_questions(),
+        'questions_total': initial_questions + arrived_questions,
+        'claims_approved': initial_claims + arrived_claims - backend.pending_claims(),
+        'claims_total': initial_claims + arrived_claims,
+        'telegram_messages': len(backend.sent_messages),
+        'endpoints': endpoints,
+        'python_peak_mb': peak_bytes / 2 ** 20,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+    print(f"Mağaza × soru       : {args.stores} × {args.questions} (+{args.arrivals}/döngü)")
+    print("Döngü süreleri (sn) : " + ", ".join(f"{t:.2f}" for t in cycle_times))
+    print(f"Döngü p50 / p99     : {result['cycle_p50_seconds']:.2f} / {result['cycle_p99_seconds']:.2f} sn")
+    print(f"Telegram boşaltma   : {sum(flush_times):.2f} sn ({result['telegram_messages']} mesaj)")
+    print(f"Cevaplanan sorular  : {result['questions_answered']}/{result['questions_total']}")
+    print(f"Onaylanan talepler  : {result['claims_approved']}/{result['claims_total']}")
+    print(f"Bellek (Python tepe): {result['python_peak_mb']:.1f} MB, RSS: {result['max_rss_mb']:.1f} MB")
+    print(f"{'Uç nokta':20}{'çağrı':>8}{'p50 (ms)':>10}{'p99 (ms)':>10}  durum kodları")
+    for route, data in sorted(endpoints.items()):
+        print(f"{route:20}{data['calls']:>8}{data['p50_ms']:>10.1f}{data['p99_ms']:>10.1f}  {data['statuses']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
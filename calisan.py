@@ -0,0 +1,510 @@
+"""Trendyol paneli için arka plan işleyicisi.
+
+Tüm mağazalar için yokla → karar ver → uygula döngüsünü Streamlit'ten bağımsız
+olarak çalıştırır ve durumunu ``calisan_durumu.db`` (SQLite) deposuna yazar.
+Her mağaza kendi geliş hızına göre uyarlanan aralıkla yoklanır; hata veren
+mağazalar geri çekilir (bkz. ``yoklama_zamanlayici``). Telegram yanıtları ayrı
+bir iş parçacığında uzun yoklama ile dinlenir. ``--shards`` ile mağazalar
+birden fazla sürece paylaştırılır (bkz. ``parcalama``).
+Dış çağrı ölçümleri ``http://127.0.0.1:9464/metrics`` adresinde yayınlanır.
+Panel (``streamlit run kontrol_paneli.py``) bu depoyu okur.
+
+Kullanım::
+
+    python calisan.py                # sürekli çalışır (başlangıçta 60 sn, mağaza başına 15-300 sn aralık)
+    python calisan.py --once         # tek döngü çalıştırır ve çıkar
+    python calisan.py --shards 4     # mağazaları 4 işleyici sürecine dağıtır
+"""
+import os
+import sys
+import time
+import logging
+import signal
+import argparse
+import tomllib
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+from datetime import datetime
+
+import requests
+
+import http_havuzu
+import olcumler
+import servisler
+from durum_deposu import StateStore, DEFAULT_TTL_DAYS
+from uretim_zamanlayici import GenerationScheduler
+from yoklama_zamanlayici import PollScheduler, DEFAULT_MIN_INTERVAL, DEFAULT_MAX_INTERVAL
+from telegram_dinleyici import TelegramListener
+from talep_onaylayici import ClaimApprover
+from parcalama import ShardCoordinator, preload_shared_data
+from servisler import (
+    Config, load_config, read_json_file, example_index_for, read_semantic_index, record_answer, get_answer_log, read_template_engine,
+    get_pending_claims, get_waiting_questions, send_answer,
+    safe_generate_answer, send_telegram_message, unique_questions, claim_item_ids,
+    format_question_notification, format_question_digest, auto_answer_remaining, high_water_mark,
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SECRETS_FILE = os.environ.get("PANEL_SECRETS_DOSYASI", os.path.join(".streamlit", "secrets.toml"))
+LEGACY_STATE_FILE = "calisan_durumu.json"
+# Trendyol tarih filtreleri en fazla iki haftalık aralık kabul eder.
+MAX_INCREMENTAL_WINDOW_MS = 14 * 24 * 60 * 60 * 1000
+MIN_SLEEP_SECONDS = 1
+
+
+def import_legacy_state(store: StateStore, file_path=LEGACY_STATE_FILE):
+    """Önceki sürümün JSON durum dosyasını boş bir depoya bir kez aktarır."""
+    legacy = read_json_file(file_path, None)
+    if not legacy or not store.is_empty():
+        return
+    store.set_value('last_update_id', legacy.get('last_update_id', 0))
+    for question_id in legacy.get('notified_question_ids', []):
+        store.try_mark_notified(question_id, '')
+    for name, value in (legacy.get('metrics') or {}).items():
+        store.increment_metric(name, value)
+    logging.info(f"{file_path} içeriği durum deposuna aktarıldı.")
+
+
+def load_secrets(file_path=SECRETS_FILE):
+    with open(file_path, "rb") as f:
+        return tomllib.load(f)
+
+
+class Worker:
+    def __init__(self, stores, state_store: StateStore, poll_interval=60, max_workers=8, cycle_deadline=45,
+                 full_sync_every=10, ttl_days=DEFAULT_TTL_DAYS, min_interval=DEFAULT_MIN_INTERVAL,
+                 max_interval=DEFAULT_MAX_INTERVAL, shard=None, listen_telegram=True, maintain_shared_data=True):
+        self.stores = stores
+        self.stores_map = {store['name']: store for store in stores}
+        self.db = state_store
+        self.poll_interval = poll_interval
+        self.cycle_deadline = cycle_deadline
+        self.full_sync_every = full_sync_every
+        self.ttl_days = ttl_days
+        self.worker_id = f"calisan-{os.getpid()}"
+        # Parçalı çalışmada durum anahtarları parça adıyla ayrılır; koordinatör bunları birleştirir.
+        self.key_suffix = f":{shard}" if shard else ""
+        self.listen_telegram = listen_telegram
+        self.maintain_shared_data = maintain_shared_data
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="yoklama")
+        self.scheduler = GenerationScheduler()
+        self.approver = ClaimApprover(state_store)
+        self.schedule = PollScheduler([store['name'] for store in stores], base_interval=poll_interval,
+                                      min_interval=min_interval, max_interval=max_interval)
+        self.next_answer_deadline = None
+        self.telegram = TelegramListener(state_store, self.stores_map, self.worker_id, self.add_event)
+
+    # --- Durum ---
+
+    def add_event(self, store_name, message, level="info"):
+        getattr(logging, level)(f"[{store_name}] {message}" if store_name else message)
+        self.db.add_event(store_name, message, level)
+
+    def heartbeat(self):
+        self.db.set_value(f"heartbeat{self.key_suffix}", time.time())
+        self.db.set_value(f"poll_interval{self.key_suffix}", self.poll_interval)
+        self.db.set_value(f"olcumler{self.key_suffix}", olcumler.REGISTRY.snapshot())
+        self.db.set_value(f"yoklama{self.key_suffix}", self.schedule.snapshot())
+
+    # --- Mağaza İşlemleri ---
+
+    def handle_claims(self, store, claims, full=True):
+        if claims is None:
+            return False
+
+        # Artımlı yoklamada önceki özetler korunur; tam eşitlemede liste yeniden kurulur.
+        known_ids = set() if full else self.db.claim_ids(store['name'])
+        summaries = {}
+        batch = []
+        for claim in claims:
+            if not (isinstance(claim, dict) and claim.get('id')): continue
+            claim_id = claim['id']
+            if str(claim_id) in known_ids: continue
+            known_ids.add(str(claim_id))
+            summary = {
+                'id': claim_id,
+                'order_number': claim.get('orderNumber'),
+                'reason': claim.get('claimType', {}).get('name', 'Belirtilmemiş'),
+                'status': claim.get('status'),
+                'auto_result': None,
+            }
+            summaries[str(claim_id)] = summary
+            if not store.get('auto_approve_claims'): continue
+
+            item_ids = claim_item_ids(claim)
+            if not item_ids:
+                summary['auto_result'] = "Onaylanacak ürün kalemi bulunamadı."
+                continue
+            batch.append((claim_id, item_ids))
+
+        if full:
+            self.db.cancel_claim_retries(store['name'], [claim['id'] for claim in claims if isinstance(claim, dict) and claim.get('id')])
+        if store.get('auto_approve_claims'):
+            # Geçici hatayla kalan ve yeniden deneme zamanı gelen talepler de aynı toplu işe eklenir.
+            queued = {str(claim_id) for claim_id, _ in batch}
+            batch.extend(retry for retry in self.db.due_claim_retries(store['name']) if retry[0] not in queued)
+        self.db.replace_claims(store['name'], list(summaries.values()), full)
+        if batch:
+            self.approve_claims(store, batch)
+        return True
+
+    def approve_claims(self, store, batch):
+        """Talepleri toplu onaylar; talep başına sonucu ve toplu iş özetini depoya yazar."""
+        result = self.approver.approve(store, batch)
+        for approval in result.results:
+            if approval.outcome == 'skipped':
+                continue
+            self.db.set_claim_result(approval.claim_id, approval.auto_result)
+            if approval.outcome == 'approved':
+                self.db.increment_metric('claims_approved_auto')
+            elif approval.outcome == 'failed':
+                self.add_event(store['name'], f"Talep {approval.claim_id} otomatik onayı başarısız: {approval.message}", level="error")
+        self.db.set_value(f"talep_onay:{store['name']}", result.to_dict())
+        if result.count('approved') or result.count('retry') or result.count('failed'):
+            self.add_event(store['name'], f"Toplu talep onayı: {result.summary()}",
+                           level="error" if result.count('failed') else "info")
+
+    def handle_questions(self, store, questions_data, config: Config, full=True):
+        if questions_data is None:
+            return False
+        questions_data = unique_questions(questions_data)
+        current_ids = {q['id'] for q in questions_data}
+
+        # Tam eşitlemelerde art arda listeden düşen sorular Trendyol üzerinden (panel veya web)
+        # cevaplanmıştır. Bildirim kayıtları TTL temizliğine kadar tutulur; soru listeye geri
+        # dönerse tekrar bildirilmez.
+        if full:
+            self.db.forget_missing_questions(store['name'], current_ids)
+
+        new_questions = []
+        for q in questions_data:
+            q_id = q['id']
+            self.db.track_question(store['name'], q_id, q.get('productName', ''), q.get('text', ''), q.get('creationDate'))
+            if store.get('send_notifications') and self.db.try_mark_notified(q_id, store['name']):
+                new_questions.append(q)
+        self.notify_questions(store, new_questions, config)
+        return True
+
+    def notify_questions(self, store, questions, config: Config):
+        if not questions:
+            return
+        threshold = config.telegram_digest_threshold
+        if threshold and len(questions) >= threshold:
+            for message in format_question_digest(store, questions):
+                send_telegram_message(message)
+        else:
+            for q in questions:
+                send_telegram_message(format_question_notification(store, q))
+
+    # --- Otomatik Cevap ---
+
+    def answer_due_questions(self, config: Config):
+        """Tüm mağazalardaki otomatik cevap adaylarını son tarihlerine göre eşzamanlı işler.
+
+        Son tarihi bir yoklama aralığı içinde dolacak sorular için cevap önceden
+        üretilip önbelleğe alınır; gönderim yalnızca süre dolduğunda yapılır.
+        """
+        now = time.time()
+        jobs = []
+        for store in self.stores:
+            if not store.get('auto_answer_questions'):
+                continue
+            for tracked in self.db.list_questions(store['name'], handled=False):
+                first_seen = datetime.fromtimestamp(tracked['first_seen'])
+                deadline = now + auto_answer_remaining(first_seen, config).total_seconds()
+                if deadline - now <= self.poll_interval:
+                    jobs.append((deadline, partial(self.auto_answer, store, tracked, config, deadline <= now)))
+        if jobs:
+            self.scheduler.run(jobs, max_parallel=config.generation_parallelism)
+
+    def auto_answer(self, store, tracked, config: Config, due):
+        q_id = tracked['id']
+        engine = read_template_engine()
+        keyword = engine.best_match(tracked['text']) if config.template_auto_apply else None
+        if not due:
+            if keyword is None:
+                safe_generate_answer(tracked['product_name'], tracked['text'], example_index_for(config), config=config, store_name=store['name'])
+            return
+        if not self.db.try_lock_question(q_id, self.worker_id):
+            return
+
+        if keyword is not None:
+            answer, reason = engine.templates[keyword], ""
+        else:
+            answer, reason = safe_generate_answer(tracked['product_name'], tracked['text'], example_index_for(config), config=config, store_name=store['name'])
+        if answer is None:
+            self.db.set_question_status(q_id, f"Otomatik cevap gönderilmedi: {reason}")
+            self.db.unlock_question(q_id, self.worker_id)
+            return
+        success, message = send_answer(store, q_id, answer)
+        if success:
+            source = f" (#{keyword} şablonu)" if keyword is not None else ""
+            self.db.mark_question_handled(q_id, 'auto', status=f"Otomatik gönderilen cevap{source}: {answer}")
+            self.add_event(store['name'], f"Soru {q_id} otomatik cevaplandı{source}.")
+            record_answer(store['name'], tracked['product_name'], tracked['text'], answer,
+                          'template' if keyword is not None else 'auto', time.time() - tracked['first_seen'])
+        else:
+            self.db.set_question_status(q_id, f"Cevap gönderilemedi: {message}")
+            self.db.unlock_question(q_id, self.worker_id)
+            self.add_event(store['name'], f"Soru {q_id} için cevap gönderilemedi: {message}", level="error")
+
+    def sync_plan(self, store, force_full=False):
+        """Mağazanın bu döngüde tam mı yoksa artımlı mı yoklanacağını belirler."""
+        sync = self.db.get_value(f"sync:{store['name']}", {})
+        oldest_allowed = time.time() * 1000 - MAX_INCREMENTAL_WINDOW_MS
+        full = (
+            force_full
+            or self.full_sync_every <= 1
+            or sync.get('cycles_since_full', self.full_sync_every) >= self.full_sync_every - 1
+            or not sync.get('questions_hwm') or sync['questions_hwm'] < oldest_allowed
+            or not sync.get('claims_hwm') or sync['claims_hwm'] < oldest_allowed
+        )
+        if full:
+            return True, None, None
+        return False, sync['claims_hwm'], sync['questions_hwm']
+
+    def update_sync(self, store, full, claims, questions_data):
+        if claims is None or questions_data is None:
+            return
+        sync = self.db.get_value(f"sync:{store['name']}", {})
+        # Hiç kayıt gelmezse işaret, yoklama aralığı kadar geriye çekilmiş şimdiki zamandır.
+        fallback = int(time.time() * 1000) - self.poll_interval * 1000
+        sync['claims_hwm'] = high_water_mark(claims, 'claimDate', sync.get('claims_hwm')) or fallback
+        sync['questions_hwm'] = high_water_mark(questions_data, 'creationDate', sync.get('questions_hwm')) or fallback
+        if full:
+            sync['cycles_since_full'] = 0
+            sync['last_full_sync'] = datetime.now().isoformat(timespec='seconds')
+        else:
+            sync['cycles_since_full'] = sync.get('cycles_since_full', 0) + 1
+        self.db.set_value(f"sync:{store['name']}", sync)
+
+    def fetch_store(self, store, claims_since, questions_since):
+        errors = []
+
+        def report(status, retry_after):
+            errors.append((status, retry_after))
+
+        claims = get_pending_claims(store, since=claims_since, on_error=report)
+        questions_data = get_waiting_questions(store, since=questions_since, on_error=report)
+        return claims, questions_data, errors
+
+    def fetch_all(self, stores, plans):
+        """Verilen mağazaları eşzamanlı yoklar; süre sınırını aşanlar bu döngüde atlanır."""
+        futures = {
+            self.executor.submit(self.fetch_store, store, *plans[store['name']][1:]): store['name']
+            for store in stores
+        }
+        if not futures:
+            return {}
+        done, not_done = wait(futures, timeout=self.cycle_deadline)
+        results = {}
+        for future in done:
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                logging.exception(f"{futures[future]} yoklanırken beklenmedik hata")
+                results[futures[future]] = e
+        for future in not_done:
+            results[futures[future]] = TimeoutError(f"Yoklama {self.cycle_deadline} sn içinde tamamlanamadı.")
+        return results
+
+    def count_arrivals(self, store_name, claims, questions_data):
+        """Depoda henüz olmayan soru ve talep sayısı (geliş hızı tahmini için)."""
+        new_questions = {q['id'] for q in unique_questions(questions_data)} - self.db.question_ids(store_name)
+        new_claims = {str(c['id']) for c in claims if isinstance(c, dict) and c.get('id')} - self.db.claim_ids(store_name)
+        return len(new_questions) + len(new_claims)
+
+    def update_deadlines(self, config: Config, now):
+        """Otomatik cevaplı mağazaların en yakın (gelecekteki) cevap son tarihini zamanlayıcıya bildirir."""
+        self.next_answer_deadline = None
+        for store in self.stores:
+            deadline = None
+            if store.get('auto_answer_questions'):
+                for tracked in self.db.list_questions(store['name'], handled=False):
+                    first_seen = datetime.fromtimestamp(tracked['first_seen'])
+                    due = now + auto_answer_remaining(first_seen, config, now=datetime.fromtimestamp(now)).total_seconds()
+                    if due > now and (deadline is None or due < deadline):
+                        deadline = due
+            self.schedule.set_deadline(store['name'], deadline)
+            if deadline is not None and (self.next_answer_deadline is None or deadline < self.next_answer_deadline):
+                self.next_answer_deadline = deadline
+
+    def run_cycle(self, now=None):
+        config = load_config()
+        now = time.time() if now is None else now
+        self.update_deadlines(config, now)
+        due = [store for store in self.stores if self.schedule.is_due(store['name'], now)]
+        # Son tarih nedeniyle erken yoklanan mağazada başka yerden cevaplanan sorular ancak tam eşitlemede görülür.
+        plans = {
+            store['name']: self.sync_plan(store, force_full=now < self.schedule.stores[store['name']].next_poll)
+            for store in due
+        }
+        results = self.fetch_all(due, plans)
+        for store in due:
+            name = store['name']
+            result = results[name]
+            full = plans[name][0]
+            if isinstance(result, Exception):
+                self.schedule.record_failure(name, result)
+                self.db.set_store_status(name, str(result))
+                continue
+            try:
+                claims, questions_data, errors = result
+                if claims is None or questions_data is None:
+                    retry_after = max((seconds for _, seconds in errors if seconds is not None), default=None)
+                    self.schedule.record_failure(name, ", ".join(str(status) for status, _ in errors), retry_after)
+                else:
+                    self.schedule.record_success(name, self.count_arrivals(name, claims, questions_data))
+                ok = self.handle_claims(store, claims, full) & self.handle_questions(store, questions_data, config, full)
+                self.update_sync(store, full, claims, questions_data)
+                self.db.set_store_status(name, None if ok else "Trendyol API isteği başarısız oldu.")
+            except Exception as e:
+                logging.exception(f"{name} işlenirken beklenmedik hata")
+                self.db.set_store_status(name, str(e))
+        if self.maintain_shared_data:
+            try:
+                get_answer_log().compact()
+            except (OSError, ValueError) as e:
+                logging.error(f"Cevap günlüğü arşivlenemedi: {e}")
+            if config.semantic_examples:
+                try:
+                    read_semantic_index(sync=True)
+                except (OSError, ValueError) as e:
+                    logging.error(f"Anlamsal örnek indeksi güncellenemedi: {e}")
+        self.answer_due_questions(config)
+        if self.maintain_shared_data:
+            self.db.prune(self.ttl_days)
+        self.heartbeat()
+
+    def seconds_until_next_cycle(self):
+        now = time.time()
+        wake_times = [self.schedule.next_wakeup() or now + self.poll_interval]
+        if self.next_answer_deadline is not None:
+            wake_times.append(self.next_answer_deadline)
+        # Panel işleyicinin canlılığını kalp atışından anladığı için en geç poll_interval'da bir uyanılır.
+        return min(max(min(wake_times) - now, MIN_SLEEP_SECONDS), self.poll_interval)
+
+    def shutdown(self):
+        self.telegram.stop()
+        if not servisler.get_telegram_queue().flush(timeout=30):
+            logging.warning("Bazı Telegram mesajları gönderilemeden çıkılıyor.")
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.scheduler.shutdown()
+        self.approver.shutdown()
+        http_havuzu.close_sessions()
+
+    def run_forever(self):
+        self.db.set_value(f"started_at{self.key_suffix}", time.time())
+        if self.listen_telegram:
+            self.telegram.start()
+        logging.info(f"Arka plan işleyicisi başladı ({len(self.stores)} mağaza, {self.poll_interval} sn aralık).")
+        while True:
+            self.run_cycle()
+            time.sleep(self.seconds_until_next_cycle())
+
+
+def run_shard(shard_name, stores, shard_count, secrets, worker_kwargs):
+    """Bir parçanın mağazalarını ayrı süreçte işler (``ShardCoordinator`` hedefi)."""
+    # Koordinatör parçaları SIGTERM ile durdurur; kuyruktaki mesajlar gönderilerek çıkılır.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    # "fork" ile başlayan süreç üst sürecin ölçümlerini devralır; tekrar raporlanmasınlar.
+    olcumler.REGISTRY.reset()
+    servisler.configure(secrets)
+    # Koordinatör de Telegram'a yazdığı için sınırlar parça sayısının bir fazlasına bölünür.
+    servisler.set_rate_limit_share(1 / (shard_count + 1))
+    preload_shared_data()
+    worker = Worker(stores, StateStore(servisler.STATE_FILE), shard=shard_name, listen_telegram=False,
+                    maintain_shared_data=False, **worker_kwargs)
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.shutdown()
+
+
+def run_sharded(args, secrets, state_store: StateStore, worker_kwargs):
+    servisler.set_rate_limit_share(1 / (args.shards + 1))
+    coordinator = ShardCoordinator(servisler.STORES, state_store, args.shards, run_shard,
+                                   target_kwargs={'secrets': secrets, 'worker_kwargs': worker_kwargs},
+                                   maintenance_interval=args.interval, ttl_days=args.ttl_days)
+    # Parçalar iş parçacığı açılmadan başlatılmalı; Telegram dinleyici ve ölçüm sunucusu sonra açılır.
+    coordinator.start()
+    telegram = TelegramListener(state_store, {store['name']: store for store in servisler.STORES},
+                                f"koordinator-{os.getpid()}", coordinator.add_event)
+    telegram.start()
+    if args.metrics_port:
+        try:
+            olcumler.serve(args.metrics_port, registry=coordinator)
+        except OSError as e:
+            logging.error(f"Ölçüm adresi başlatılamadı (port {args.metrics_port}): {e}")
+    try:
+        coordinator.run_forever()
+    except KeyboardInterrupt:
+        pass
+    telegram.stop()
+    coordinator.stop()
+    if not servisler.get_telegram_queue().flush(timeout=30):
+        logging.warning("Bazı Telegram mesajları gönderilemeden çıkılıyor.")
+    http_havuzu.close_sessions()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trendyol paneli arka plan işleyicisi")
+    parser.add_argument("--interval", type=int, default=60, help="Başlangıç yoklama aralığı (saniye)")
+    parser.add_argument("--min-interval", type=int, default=DEFAULT_MIN_INTERVAL, help="Yoğun mağazalar için en kısa yoklama aralığı (saniye)")
+    parser.add_argument("--max-interval", type=int, default=DEFAULT_MAX_INTERVAL, help="Sessiz mağazalar için en uzun yoklama aralığı (saniye)")
+    parser.add_argument("--workers", type=int, default=8, help="Eşzamanlı yoklanacak en fazla mağaza sayısı")
+    parser.add_argument("--deadline", type=int, default=45, help="Bir döngüde yoklamaya ayrılan en uzun süre (saniye)")
+    parser.add_argument("--full-sync-every", type=int, default=10, help="Kaç döngüde bir tüm sayfaların yeniden çekileceği (1 = her döngü)")
+    parser.add_argument("--ttl-days", type=int, default=DEFAULT_TTL_DAYS, help="İşlenmiş kimliklerin saklanacağı gün sayısı")
+    parser.add_argument("--metrics-port", type=int, default=olcumler.DEFAULT_PORT, help="/metrics adresinin yayınlanacağı yerel port (0 = kapalı)")
+    parser.add_argument("--shards", type=int, default=1, help="Mağazaların dağıtılacağı işleyici süreci sayısı (1 = tek süreç)")
+    parser.add_argument("--once", action="store_true", help="Tek döngü çalıştır ve çık")
+    args = parser.parse_args(argv)
+
+    try:
+        secrets = load_secrets()
+        servisler.configure(secrets)
+    except FileNotFoundError:
+        logging.error(f"Gizli bilgi dosyası bulunamadı: {SECRETS_FILE}")
+        return 1
+    except KeyError as e:
+        logging.error(f"'{e.args[0]}' adlı gizli bilgi (Secret) bulunamadı.")
+        return 1
+    if not servisler.STORES:
+        logging.error("Yapılandırılmış herhangi bir mağaza bulunamadı.")
+        return 1
+
+    state_store = StateStore(servisler.STATE_FILE)
+    import_legacy_state(state_store)
+    worker_kwargs = dict(poll_interval=args.interval, max_workers=args.workers, cycle_deadline=args.deadline,
+                         full_sync_every=args.full_sync_every, ttl_days=args.ttl_days,
+                         min_interval=args.min_interval, max_interval=args.max_interval)
+    if args.shards > 1 and not args.once:
+        return run_sharded(args, secrets, state_store, worker_kwargs)
+    worker = Worker(servisler.STORES, state_store, **worker_kwargs)
+    if args.metrics_port and not args.once:
+        try:
+            olcumler.serve(args.metrics_port)
+        except OSError as e:
+            logging.error(f"Ölçüm adresi başlatılamadı (port {args.metrics_port}): {e}")
+    if args.once:
+        try:
+            worker.telegram.poll_once(timeout=0)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logging.error(f"Telegram güncellemeleri alınamadı: {e}")
+        worker.run_cycle()
+    else:
+        try:
+            worker.run_forever()
+        except KeyboardInterrupt:
+            pass
+    worker.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
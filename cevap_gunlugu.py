@@ -0,0 +1,156 @@
+import os
+import json
+import time
+import logging
+from datetime import date
+
+import pandas as pd
+
+from veri_onbellegi import FRAME_FORMAT, _read_frame, _write_frame, _write_atomic
+
+# Gönderilen cevapların yalnızca sona eklenen günlüğü.
+#
+# Her gün için bir JSONL parçası (``cevaplar-2026-10-17.jsonl``) tutulur;
+# panel ve arka plan işleyicisi satırı tek bir ``O_APPEND`` yazmasıyla
+# eklediğinden aynı dosyaya eşzamanlı yazabilir. Kapanmış günlerin parçaları
+# işleyici tarafından sütunsal arşiv dosyalarında (pyarrow kuruluysa Parquet,
+# değilse pickle) birleştirilir; arşiv sayısı artınca arşivler de tek dosyada
+# toplanır. Okuyucular parça başına bayt konumu tutan bir ``LogCursor`` ile
+# yalnızca yeni kayıtları okur; arşive taşınan kayıtlar da parça adı ve konumu
+# saklandığı için ikinci kez okunmaz.
+
+LOG_DIR = os.environ.get("PANEL_CEVAP_GUNLUGU", "cevap_gunlugu")
+SEGMENT_PREFIX = "cevaplar-"
+ARCHIVE_PREFIX = "arsiv-"
+MAX_ARCHIVES = 8
+RECORD_FIELDS = ('time', 'store', 'product', 'question', 'answer', 'source', 'latency')
+
+
+class LogCursor:
+    def __init__(self, segments=None, archives=None):
+        # Parça adı -> okunmuş bayt sayısı; arşivler için okunmuş arşiv dosyaları.
+        self.segments = dict(segments or {})
+        self.archives = set(archives or ())
+
+    @classmethod
+    def from_dict(cls, data):
+        data = data or {}
+        return cls(data.get('segments'), data.get('archives'))
+
+    def to_dict(self):
+        return {'segments': self.segments, 'archives': sorted(self.archives)}
+
+
+class AnswerLog:
+    def __init__(self, directory=LOG_DIR):
+        self.directory = directory
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _list(self, prefix, suffix):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[len(prefix):-len(suffix)] for name in names if name.startswith(prefix) and name.endswith(suffix))
+
+    def segments(self):
+        return self._list(SEGMENT_PREFIX, ".jsonl")
+
+    def archives(self):
+        return self._list(ARCHIVE_PREFIX, f".{FRAME_FORMAT}")
+
+    def append(self, store, product_name, question, answer, source, latency=None):
+        """Gönderilen bir cevabı bugünün parçasına ekler."""
+        record = {
+            'time': time.time(),
+            'store': store,
+            'product': str(product_name or ""),
+            'question': str(question or ""),
+            'answer': str(answer),
+            'source': source,
+            'latency': None if latency is None else round(float(latency), 3),
+        }
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        os.makedirs(self.directory, exist_ok=True)
+        fd = os.open(self._path(f"{SEGMENT_PREFIX}{date.today().isoformat()}.jsonl"), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def _read_segment(self, segment, start=0):
+        """Parçadaki tamamlanmış satırları ``(kayıtlar, okunan_son_konum)`` olarak döndürür."""
+        with open(self._path(f"{SEGMENT_PREFIX}{segment}.jsonl"), "rb") as f:
+            f.seek(start)
+            data = f.read()
+        # Başka bir süreç o anda yazıyorsa son yarım satır sonraki okumaya bırakılır.
+        data = data[:data.rfind(b"\n") + 1]
+        records, offset = [], start
+        for line in data.splitlines(keepends=True):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logging.warning(f"Cevap günlüğünde bozuk satır atlandı ({segment}, konum {offset}).")
+            else:
+                records.append({**record, 'segment': segment, 'offset': offset})
+            offset += len(line)
+        return records, offset
+
+    def read_new(self, cursor: LogCursor):
+        """İmleçten sonra eklenen kayıtları döndürür ve imleci ilerletir."""
+        records = []
+        archives = self.archives()
+        for archive in archives:
+            if archive in cursor.archives:
+                continue
+            try:
+                frame = _read_frame(self._path(f"{ARCHIVE_PREFIX}{archive}.{FRAME_FORMAT}"))
+            except FileNotFoundError:
+                continue
+            for record in frame.to_dict("records"):
+                if record['offset'] >= cursor.segments.get(record['segment'], 0):
+                    records.append(record)
+                    cursor.segments[record['segment']] = record['offset'] + 1
+            cursor.archives.add(archive)
+        cursor.archives &= set(archives)
+        for segment in self.segments():
+            start = cursor.segments.get(segment, 0)
+            try:
+                new, end = self._read_segment(segment, start)
+            except FileNotFoundError:
+                # Bu arada arşive taşındı; bir sonraki okumada arşivden gelir.
+                continue
+            records.extend(new)
+            cursor.segments[segment] = end
+        return records
+
+    def compact(self, today=None):
+        """Kapanmış günlerin parçalarını arşive taşır; arşiv sayısı sınırı aşınca arşivleri birleştirir.
+
+        Yalnızca arka plan işleyicisi çağırır. Arşiv yazıldıktan sonra parçalar
+        silinir; arada okuyan süreçler kayıtları parça ya da arşivden bir kez okur.
+        """
+        today = (today or date.today()).isoformat()
+        closed = [segment for segment in self.segments() if segment < today]
+        if closed:
+            records = []
+            for segment in closed:
+                records.extend(self._read_segment(segment)[0])
+            self._write(f"{closed[0]}_{closed[-1]}", pd.DataFrame(records, columns=RECORD_FIELDS + ('segment', 'offset')))
+            for segment in closed:
+                os.remove(self._path(f"{SEGMENT_PREFIX}{segment}.jsonl"))
+            logging.info(f"Cevap günlüğü: {len(closed)} günlük parça arşivlendi ({len(records)} kayıt).")
+
+        archives = self.archives()
+        if len(archives) > MAX_ARCHIVES:
+            frames = [_read_frame(self._path(f"{ARCHIVE_PREFIX}{name}.{FRAME_FORMAT}")) for name in archives]
+            merged = f"{archives[0].split('_')[0]}_{archives[-1].split('_')[-1]}"
+            self._write(merged, pd.concat(frames, ignore_index=True))
+            for name in archives:
+                if name != merged:
+                    os.remove(self._path(f"{ARCHIVE_PREFIX}{name}.{FRAME_FORMAT}"))
+
+    def _write(self, name, frame):
+        _write_atomic(self._path(f"{ARCHIVE_PREFIX}{name}.{FRAME_FORMAT}"), lambda tmp_path: _write_frame(frame, tmp_path))
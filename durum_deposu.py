@@ -0,0 +1,386 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+# Panel ve arka plan işleyicisinin ortak kalıcı durumu (SQLite, WAL kipi).
+#
+# Her iş parçacığı kendi bağlantısını kullanır; WAL sayesinde panel okurken
+# işleyici yazabilir. "Bu soruyu ben cevaplıyorum" ve "bu bildirimi ben
+# gönderiyorum" gibi kararlar tek bir koşullu UPDATE/INSERT ile verilir, böylece
+# aynı anda çalışan oturumlar veya işleyiciler aynı kaydı iki kez işlemez.
+
+DEFAULT_TTL_DAYS = 30
+# Tek bir eksik liste yanıtı soruyu unutturmasın diye gereken ardışık tam eşitleme sayısı.
+MISSED_SYNCS_BEFORE_FORGET = 3
+MAX_EVENTS = 500
+
+METRIC_NAMES = (
+    'questions_answered_auto',
+    'questions_answered_manual',
+    'claims_approved_auto',
+    'total_response_time_seconds',
+    'response_count',
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    store TEXT NOT NULL,
+    product_name TEXT,
+    text TEXT,
+    created_at INTEGER,
+    first_seen REAL NOT NULL,
+    handled INTEGER NOT NULL DEFAULT 0,
+    answered_by TEXT,
+    answered_at REAL,
+    status TEXT,
+    lock_owner TEXT,
+    lock_until REAL,
+    missed_syncs INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_questions_store_handled ON questions (store, handled);
+CREATE INDEX IF NOT EXISTS idx_questions_answered_at ON questions (answered_at);
+
+CREATE TABLE IF NOT EXISTS claims (
+    id TEXT PRIMARY KEY,
+    store TEXT NOT NULL,
+    order_number TEXT,
+    reason TEXT,
+    status TEXT,
+    auto_result TEXT,
+    seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_claims_store ON claims (store);
+
+-- state: 'in_progress' (bir işleyici deniyor), 'retry' (geçici hata, next_attempt_at'te
+-- yeniden denenecek), 'approved' ya da 'failed' (kalıcı hata; bir daha denenmez).
+CREATE TABLE IF NOT EXISTS claim_approvals (
+    claim_id TEXT PRIMARY KEY,
+    store TEXT NOT NULL,
+    item_ids TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    lease_until REAL,
+    last_error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_claim_approvals_store ON claim_approvals (store, state);
+-- Eski sürümün tek denemelik kaydı; hâlâ bekleyen talepler yeniden denensin diye taşınmaz.
+DROP TABLE IF EXISTS claim_attempts;
+
+CREATE TABLE IF NOT EXISTS notifications (
+    question_id INTEGER PRIMARY KEY,
+    store TEXT NOT NULL,
+    sent_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_notifications_time ON notifications (sent_at);
+
+CREATE TABLE IF NOT EXISTS metrics (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS store_status (
+    store TEXT PRIMARY KEY,
+    last_poll REAL,
+    error TEXT
+);
+
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    time REAL NOT NULL,
+    store TEXT,
+    level TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class StateStore:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self.conn.executescript(SCHEMA)
+        with self.transaction() as conn:
+            # Eski veritabanlarına sonradan eklenen sütunlar.
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(questions)")}
+            if 'missed_syncs' not in columns:
+                conn.execute("ALTER TABLE questions ADD COLUMN missed_syncs INTEGER NOT NULL DEFAULT 0")
+            conn.executemany("INSERT OR IGNORE INTO metrics (name, value) VALUES (?, 0)", [(n,) for n in METRIC_NAMES])
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # --- Anahtar/Değer ---
+
+    def get_value(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return json.loads(row['value']) if row else default
+
+    def set_value(self, key, value):
+        self.conn.execute(
+            "INSERT INTO kv (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value, ensure_ascii=False, default=str)),
+        )
+
+    def is_empty(self):
+        return self.conn.execute(
+            "SELECT NOT EXISTS (SELECT 1 FROM kv) AND NOT EXISTS (SELECT 1 FROM questions)"
+        ).fetchone()[0] == 1
+
+    # --- Sorular ---
+
+    def track_question(self, store, question_id, product_name, text, created_at=None):
+        """Soruyu ilk kez görülüyorsa kaydeder; kayıtlı satırı döndürür."""
+        self.conn.execute(
+            "INSERT OR IGNORE INTO questions (id, store, product_name, text, created_at, first_seen) VALUES (?, ?, ?, ?, ?, ?)",
+            (question_id, store, product_name, text, created_at, time.time()),
+        )
+        return self.get_question(question_id)
+
+    def get_question(self, question_id):
+        row = self.conn.execute("SELECT * FROM questions WHERE id = ?", (question_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list_questions(self, store=None, handled=False):
+        query = "SELECT * FROM questions WHERE handled = ?"
+        params = [int(handled)]
+        if store is not None:
+            query += " AND store = ?"
+            params.append(store)
+        query += " ORDER BY first_seen"
+        return [dict(row) for row in self.conn.execute(query, params)]
+
+    def question_ids(self, store):
+        return {row[0] for row in self.conn.execute("SELECT id FROM questions WHERE store = ?", (store,))}
+
+    def try_lock_question(self, question_id, owner, lease_seconds=120):
+        """Soruyu cevaplamak için kilitler; başka bir süreç cevaplıyorsa ya da cevaplandıysa ``False``."""
+        now = time.time()
+        cursor = self.conn.execute(
+            "UPDATE questions SET lock_owner = ?, lock_until = ? "
+            "WHERE id = ? AND handled = 0 AND (lock_owner IS NULL OR lock_owner = ? OR lock_until < ?)",
+            (owner, now + lease_seconds, question_id, owner, now),
+        )
+        return cursor.rowcount == 1
+
+    def unlock_question(self, question_id, owner):
+        self.conn.execute(
+            "UPDATE questions SET lock_owner = NULL, lock_until = NULL WHERE id = ? AND lock_owner = ?",
+            (question_id, owner),
+        )
+
+    def mark_question_handled(self, question_id, answered_by, status=None):
+        """Soruyu cevaplandı olarak işaretler; zaten işaretliyse ``False`` döner ve metrik yazılmaz."""
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute("SELECT first_seen, handled FROM questions WHERE id = ?", (question_id,)).fetchone()
+            if row is None or row['handled']:
+                return False
+            conn.execute(
+                "UPDATE questions SET handled = 1, answered_by = ?, answered_at = ?, status = COALESCE(?, status), "
+                "lock_owner = NULL, lock_until = NULL WHERE id = ?",
+                (answered_by, now, status, question_id),
+            )
+            self._record_answer(conn, 'auto' if answered_by == 'auto' else 'manual', now - row['first_seen'])
+        return True
+
+    def set_question_status(self, question_id, status):
+        self.conn.execute("UPDATE questions SET status = ? WHERE id = ?", (status, question_id))
+
+    def forget_missing_questions(self, store, current_ids, max_missed=MISSED_SYNCS_BEFORE_FORGET):
+        """Tam eşitlemede listede olmayan soruları sayar; ``max_missed`` ardışık eşitlemede
+        görünmeyenleri siler ve kimliklerini döndürür. İşaretlenmemiş olanlar manuel cevap sayılır."""
+        now = time.time()
+        with self.transaction() as conn:
+            rows = conn.execute("SELECT id, first_seen, handled, missed_syncs FROM questions WHERE store = ?", (store,)).fetchall()
+            conn.executemany(
+                "UPDATE questions SET missed_syncs = 0 WHERE id = ?",
+                [(row['id'],) for row in rows if row['id'] in current_ids and row['missed_syncs']],
+            )
+            forgotten = []
+            for row in rows:
+                if row['id'] in current_ids:
+                    continue
+                if row['missed_syncs'] + 1 < max_missed:
+                    conn.execute("UPDATE questions SET missed_syncs = missed_syncs + 1 WHERE id = ?", (row['id'],))
+                    continue
+                if not row['handled']:
+                    self._record_answer(conn, 'manual', now - row['first_seen'])
+                conn.execute("DELETE FROM questions WHERE id = ?", (row['id'],))
+                forgotten.append(row['id'])
+        return forgotten
+
+    # --- Talepler ---
+
+    def replace_claims(self, store, summaries, full=True):
+        """Talep özetlerini yazar; yeni özette sonuç yoksa önceki otomatik onay sonucu korunur."""
+        now = time.time()
+        with self.transaction() as conn:
+            previous = {}
+            if full:
+                previous = {
+                    row[0]: row[1] for row in conn.execute(
+                        "SELECT id, auto_result FROM claims WHERE store = ? AND auto_result IS NOT NULL", (store,))
+                }
+                conn.execute("DELETE FROM claims WHERE store = ?", (store,))
+            conn.executemany(
+                "INSERT INTO claims (id, store, order_number, reason, status, auto_result, seen_at) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET order_number = excluded.order_number, reason = excluded.reason, "
+                "status = excluded.status, auto_result = COALESCE(excluded.auto_result, claims.auto_result), "
+                "seen_at = excluded.seen_at",
+                [(str(s['id']), store, s.get('order_number'), s.get('reason'), s.get('status'),
+                  s.get('auto_result') or previous.get(str(s['id'])), now) for s in summaries],
+            )
+
+    def list_claims(self, store):
+        return [dict(row) for row in self.conn.execute("SELECT * FROM claims WHERE store = ? ORDER BY seen_at", (store,))]
+
+    def claim_ids(self, store):
+        return {row[0] for row in self.conn.execute("SELECT id FROM claims WHERE store = ?", (store,))}
+
+    def try_begin_claim_approval(self, claim_id, store, item_ids, lease_seconds=120):
+        """Talebi onaylamak için kilitler ve önceki deneme sayısını döndürür.
+
+        Talep onaylandıysa, kalıcı hatayla bittiyse, yeniden deneme zamanı
+        gelmediyse ya da başka bir işleyici deniyorsa ``None`` döner.
+        """
+        now = time.time()
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO claim_approvals (claim_id, store, item_ids, state, lease_until, updated_at) "
+                "VALUES (?, ?, ?, 'in_progress', ?, ?) "
+                "ON CONFLICT(claim_id) DO UPDATE SET state = 'in_progress', item_ids = excluded.item_ids, "
+                "lease_until = excluded.lease_until, updated_at = excluded.updated_at "
+                "WHERE (claim_approvals.state = 'retry' AND claim_approvals.next_attempt_at <= ?) "
+                "OR (claim_approvals.state = 'in_progress' AND claim_approvals.lease_until < ?)",
+                (str(claim_id), store, json.dumps(item_ids), now + lease_seconds, now, now, now),
+            )
+            if cursor.rowcount != 1:
+                return None
+            return conn.execute("SELECT attempts FROM claim_approvals WHERE claim_id = ?", (str(claim_id),)).fetchone()[0]
+
+    def finish_claim_approval(self, claim_id, state, attempts, error=None, next_attempt_at=0):
+        self.conn.execute(
+            "UPDATE claim_approvals SET state = ?, attempts = ?, last_error = ?, next_attempt_at = ?, "
+            "lease_until = NULL, updated_at = ? WHERE claim_id = ?",
+            (state, attempts, error, next_attempt_at, time.time(), str(claim_id)),
+        )
+
+    def due_claim_retries(self, store, now=None):
+        """Yeniden deneme zamanı gelmiş talepleri ``(claim_id, item_ids)`` olarak döndürür."""
+        now = time.time() if now is None else now
+        return [
+            (row['claim_id'], json.loads(row['item_ids']))
+            for row in self.conn.execute(
+                "SELECT claim_id, item_ids FROM claim_approvals WHERE store = ? AND state = 'retry' AND next_attempt_at <= ? "
+                "ORDER BY next_attempt_at", (store, now))
+        ]
+
+    def cancel_claim_retries(self, store, pending_ids):
+        """Artık onay beklemeyen (başka yerden işlenmiş) taleplerin yeniden denemelerini siler."""
+        pending_ids = {str(claim_id) for claim_id in pending_ids}
+        stale = [
+            (row[0],) for row in self.conn.execute(
+                "SELECT claim_id FROM claim_approvals WHERE store = ? AND state = 'retry'", (store,))
+            if row[0] not in pending_ids
+        ]
+        self.conn.executemany("DELETE FROM claim_approvals WHERE claim_id = ?", stale)
+
+    def set_claim_result(self, claim_id, auto_result):
+        self.conn.execute("UPDATE claims SET auto_result = ? WHERE id = ?", (auto_result, str(claim_id)))
+
+    # --- Bildirimler ---
+
+    def try_mark_notified(self, question_id, store):
+        """Soru için bildirim daha önce gönderilmediyse kaydeder ve ``True`` döner."""
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO notifications (question_id, store, sent_at) VALUES (?, ?, ?)",
+            (question_id, store, time.time()),
+        )
+        return cursor.rowcount == 1
+
+    # --- Metrikler ---
+
+    @staticmethod
+    def _record_answer(conn, kind, response_seconds):
+        conn.execute("UPDATE metrics SET value = value + 1 WHERE name = ?", (f'questions_answered_{kind}',))
+        conn.execute("UPDATE metrics SET value = value + ? WHERE name = 'total_response_time_seconds'", (max(response_seconds, 0),))
+        conn.execute("UPDATE metrics SET value = value + 1 WHERE name = 'response_count'")
+
+    def increment_metric(self, name, amount=1):
+        self.conn.execute(
+            "INSERT INTO metrics (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def get_metrics(self):
+        return {row['name']: row['value'] for row in self.conn.execute("SELECT name, value FROM metrics")}
+
+    # --- Mağaza Durumu ve Olaylar ---
+
+    def set_store_status(self, store, error=None):
+        self.conn.execute(
+            "INSERT INTO store_status (store, last_poll, error) VALUES (?, ?, ?) "
+            "ON CONFLICT(store) DO UPDATE SET last_poll = excluded.last_poll, error = excluded.error",
+            (store, time.time(), error),
+        )
+
+    def get_store_status(self, store):
+        row = self.conn.execute("SELECT * FROM store_status WHERE store = ?", (store,)).fetchone()
+        return dict(row) if row else {}
+
+    def add_event(self, store, message, level="info"):
+        self.conn.execute(
+            "INSERT INTO events (time, store, level, message) VALUES (?, ?, ?, ?)",
+            (time.time(), store, level, message),
+        )
+
+    def recent_events(self, limit=100):
+        return [
+            {**dict(row), 'time': datetime.fromtimestamp(row['time']).isoformat(timespec='seconds')}
+            for row in self.conn.execute("SELECT time, store, level, message FROM events ORDER BY id DESC LIMIT ?", (limit,))
+        ]
+
+    # --- Temizlik ---
+
+    def prune(self, ttl_days=DEFAULT_TTL_DAYS):
+        """TTL süresini aşmış kimlikleri ve eski olayları siler."""
+        cutoff = time.time() - ttl_days * 24 * 60 * 60
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM notifications WHERE sent_at < ?", (cutoff,))
+            conn.execute("DELETE FROM claim_approvals WHERE state IN ('approved', 'failed') AND updated_at < ?", (cutoff,))
+            conn.execute("DELETE FROM questions WHERE handled = 1 AND answered_at < ?", (cutoff,))
+            conn.execute("DELETE FROM events WHERE id <= (SELECT MAX(id) FROM events) - ?", (MAX_EVENTS,))
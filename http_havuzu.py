@@ -0,0 +1,74 @@
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import olcumler
+
+# Mağaza başına tek bir keep-alive oturumu tutulur; kimlik bilgisi başlıkları
+# oturum oluşturulurken bir kez hesaplanır. Aynı sunucuya aynı anda açılan
+# istek sayısı MAX_CONNECTIONS_PER_HOST ile sınırlanır.
+
+MAX_CONNECTIONS_PER_HOST = 8
+REQUEST_TIMEOUT = 15
+
+_sessions = {}
+_host_limits = {}
+_lock = threading.Lock()
+
+
+def _new_session(headers=None):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONNECTIONS_PER_HOST)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def get_session(key, headers_factory=None):
+    """``key`` için paylaşılan oturumu döndürür, yoksa oluşturur.
+
+    ``headers_factory`` yalnızca oturum ilk kez oluşturulurken çağrılır.
+    """
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _new_session(headers_factory() if headers_factory else None)
+            _sessions[key] = session
+        return session
+
+
+def close_sessions():
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+@contextmanager
+def host_slot(url):
+    host = urlsplit(url).netloc
+    with _lock:
+        semaphore = _host_limits.get(host)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST)
+            _host_limits[host] = semaphore
+    with semaphore:
+        yield
+
+
+def request(session, method, url, **kwargs):
+    kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+    host = urlsplit(url).netloc
+    with host_slot(url):
+        try:
+            response = session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            olcumler.HTTP_RESPONSES.inc(host, "error")
+            raise
+    olcumler.HTTP_RESPONSES.inc(host, str(response.status_code))
+    return response
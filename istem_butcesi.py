@@ -0,0 +1,132 @@
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# OpenAI istemlerinin token bütçesi.
+#
+# İstem iki mesajdan oluşur: her çağrıda birebir aynı olan sistem mesajı ve
+# ürün, soru ve benzer örnekleri içeren kullanıcı mesajı. Örnekler arama
+# sırasıyla (en benzer önce) eklenir; aynı cevabı tekrarlayan örnekler
+# atlanır, uzun cevaplar kırpılır ve toplam girdi ``budget`` tokenı aşacaksa
+# kalan örnekler istem dışında bırakılır.
+#
+# Tokenlar tiktoken kuruluysa modelin kodlayıcısıyla, değilse karakter
+# sayısından tahminle sayılır.
+
+SYSTEM_PROMPT = (
+    "Sen Trendyol'da satış yapan bir mağazanın profesyonel müşteri temsilcisisin. "
+    "Müşteriden gelen soruyu, ürün bilgisine dayanarak nazik ve açıklayıcı bir şekilde cevapla."
+)
+EXAMPLES_HEADER = "Benzer Geçmiş Sorular ve Cevaplarımız:"
+NO_EXAMPLES_NOTE = "Lütfen genel e-ticaret nezaket kurallarına uygun, yardımsever bir cevap üret."
+# tiktoken yoksa: Türkçe metinde token başına ~3 karakter.
+CHARS_PER_TOKEN = 3
+# Sohbet biçiminin mesaj başına (rol, ayraçlar) ve cevap başlangıcı için eklediği tokenlar.
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_OVERHEAD_TOKENS = 3
+# Kırpıldıktan sonra bundan kısa kalacak örnek isteme eklenmez.
+MIN_EXAMPLE_TOKENS = 24
+TRUNCATION_MARK = "…"
+
+
+@lru_cache(maxsize=8)
+def _encoding(model):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text, model):
+    encoding = _encoding(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+def messages_tokens(messages, model):
+    """Sohbet mesajlarının girdi token sayısı (sağlayıcının saydığına yakın bir tahmin)."""
+    return REPLY_OVERHEAD_TOKENS + sum(
+        MESSAGE_OVERHEAD_TOKENS + count_tokens(message['content'], model) for message in messages
+    )
+
+
+def truncate_tokens(text, max_tokens, model):
+    """Metni en fazla ``max_tokens`` tokena kırpar; kırpılan metnin sonuna ``…`` eklenir."""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    max_tokens = max(max_tokens - 1, 0)
+    encoding = _encoding(model)
+    if encoding is None:
+        cut = text[:max_tokens * CHARS_PER_TOKEN]
+        # Kelimenin ortasında kesilmez.
+        if " " in cut:
+            cut = cut.rsplit(" ", 1)[0]
+    else:
+        cut = encoding.decode(encoding.encode(text)[:max_tokens])
+    return cut.rstrip() + TRUNCATION_MARK
+
+
+def _format_example(question, answer):
+    return f"- Soru: {question}\n  Cevap: {answer}\n"
+
+
+def build_messages(product_name, question, examples, model, budget, example_max_tokens, max_examples):
+    """Sistem ve kullanıcı mesajlarını girdi bütçesine sığacak şekilde kurar.
+
+    ``(mesajlar, istatistikler)`` döner; istatistikler isteme giren, kırpılan
+    ve bütçeye sığmadığı için atılan örnek sayılarını ve girdi token sayısını içerir.
+    """
+    base = f"Ürün: {product_name}\nSoru: {question}\n\n"
+    system = {"role": "system", "content": SYSTEM_PROMPT}
+    used_tokens = messages_tokens([system, {"role": "user", "content": base + EXAMPLES_HEADER + "\n"}], model)
+    remaining = budget - used_tokens
+    stats = {'used': 0, 'truncated': 0, 'dropped': 0, 'duplicate': 0}
+
+    lines = []
+    seen_answers = set()
+    for example_question, example_answer in examples:
+        if stats['used'] >= max_examples:
+            break
+        normalized = " ".join(str(example_answer).split()).casefold()
+        if normalized in seen_answers:
+            stats['duplicate'] += 1
+            continue
+        seen_answers.add(normalized)
+        short_question = truncate_tokens(str(example_question), max(example_max_tokens // 2, MIN_EXAMPLE_TOKENS), model)
+        answer = truncate_tokens(str(example_answer), example_max_tokens, model)
+        line = _format_example(short_question, answer)
+        cost = count_tokens(line, model)
+        if cost > remaining:
+            # Sığmayan cevap kalan bütçeye göre kısaltılır; çok kısa kalacaksa örnek atlanır.
+            overhead = count_tokens(_format_example(short_question, ""), model)
+            if remaining - overhead < MIN_EXAMPLE_TOKENS:
+                stats['dropped'] += 1
+                continue
+            answer = truncate_tokens(answer, remaining - overhead, model)
+            line = _format_example(short_question, answer)
+            cost = count_tokens(line, model)
+        if answer != str(example_answer) or short_question != str(example_question):
+            stats['truncated'] += 1
+        lines.append(line)
+        remaining -= cost
+        stats['used'] += 1
+
+    if lines:
+        content = base + EXAMPLES_HEADER + "\n" + "".join(lines)
+    else:
+        content = base + NO_EXAMPLES_NOTE
+    messages = [system, {"role": "user", "content": content}]
+    stats['input_tokens'] = messages_tokens(messages, model)
+    return messages, stats
+
+
+def estimate_cost(prompt_tokens, completion_tokens, cached_tokens, input_price, cached_input_price, output_price):
+    """Çağrının tahmini maliyeti (USD); fiyatlar 1 milyon token başınadır."""
+    uncached = max(prompt_tokens - cached_tokens, 0)
+    return (uncached * input_price + cached_tokens * cached_input_price + completion_tokens * output_price) / 1_000_000
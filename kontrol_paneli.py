@@ -1,507 +1,516 @@
-import streamlit as st
-import pandas as pd
-import requests
-import base64
-import openai
-import re
-import logging
-from datetime import datetime, timedelta
-from streamlit_autorefresh import st_autorefresh
-from dataclasses import dataclass, field
-
-# --- Logging ---
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
-# --- Konfigürasyon ---
-@dataclass
-class Config:
-    min_examples: int = 0
-    delay_minutes: int = 5
-    openai_model: str = "gpt-4o-mini"
-    openai_temperature: float = 0.4
-    openai_max_tokens: int = 150
-
-    def load_from_sidebar(self):
-        st.sidebar.header("Genel Ayarlar")
-        self.min_examples = st.sidebar.number_input(
-            "Otomatik cevap için min. örnek sayısı (0 = Örneksiz çalışır)", 
-            min_value=0, 
-            value=self.min_examples
-        )
-        self.delay_minutes = st.sidebar.number_input(
-            "Otomatik Cevap Gecikmesi (Dakika)", 
-            min_value=1, 
-            value=self.delay_minutes,
-            help="Soru geldikten sonra bu süre kadar beklenir, siz cevaplamazsanız bot cevaplar."
-        )
-        
-        st.sidebar.header("OpenAI Ayarları")
-        self.openai_model = st.sidebar.text_input("OpenAI Modeli", value=self.openai_model)
-        self.openai_temperature = st.sidebar.slider("Sıcaklık (Temperature)", 0.0, 1.0, self.openai_temperature)
-        self.openai_max_tokens = st.sidebar.number_input("Max Tokens", min_value=50, value=self.openai_max_tokens)
-        return self
-
-# --- Streamlit Arayüzü ve Ayarları ---
-st.set_page_config(layout="wide", page_title="Trendyol Panel")
-st.title("Trendyol Multi-Store Otomasyon Paneli")
-
-# --- Ortak API Bilgilerini Oku ---
-try:
-    openai.api_key = st.secrets["OPENAI_API_KEY"]
-    TELEGRAM_BOT_TOKEN = st.secrets.get("TELEGRAM_BOT_TOKEN")
-    if "AUTHORIZED_CHAT_IDS" in st.secrets:
-        AUTHORIZED_CHAT_IDS = st.secrets.get("AUTHORIZED_CHAT_IDS", [])
-    else:
-        chat_id = st.secrets.get("TELEGRAM_CHAT_ID")
-        AUTHORIZED_CHAT_IDS = [chat_id] if chat_id else []
-        
-    STORES = st.secrets.get("stores", [])
-except KeyError as e:
-    st.error(f"'{e.args[0]}' adlı gizli bilgi (Secret) bulunamadı. Lütfen 'Secrets' bölümünü kontrol edin.")
-    st.stop()
-
-if not STORES:
-    st.error("Yapılandırılmış herhangi bir mağaza bulunamadı. Lütfen secrets dosyanızı `[[stores]]` formatına göre düzenleyin.")
-    st.stop()
-if not AUTHORIZED_CHAT_IDS:
-    st.error("`TELEGRAM_CHAT_ID` veya `AUTHORIZED_CHAT_IDS` listesinde yetkili bir kullanıcı bulunamadı.")
-    st.stop()
-
-
-# Sayfa otomatik yenileme
-st_autorefresh(interval=60 * 1000, key="data_fetch_refresher")
-
-def initialize_session_state():
-    if 'processed_claims' not in st.session_state:
-        st.session_state.processed_claims = set()
-    if 'questions' not in st.session_state:
-        st.session_state.questions = {}
-    if 'last_update_id' not in st.session_state:
-        st.session_state.last_update_id = 0
-    if 'notified_question_ids' not in st.session_state:
-        st.session_state.notified_question_ids = set()
-    if 'metrics' not in st.session_state:
-        st.session_state.metrics = {
-            'questions_answered_auto': 0,
-            'questions_answered_manual': 0,
-            'claims_approved_auto': 0,
-            'total_response_time_seconds': 0,
-            'response_count': 0,
-        }
-
-# --- Ortak Fonksiyonlar ---
-
-def get_headers(api_key, api_secret):
-    credentials = f"{api_key}:{api_secret}"
-    encoded_credentials = base64.b64encode(credentials.encode()).decode()
-    return {"Authorization": f"Basic {encoded_credentials}", "Content-Type": "application/json", "User-Agent": "MultiStorePanel/1.0"}
-
-def send_telegram_message(message, chat_id=None):
-    if not TELEGRAM_BOT_TOKEN: return
-    
-    recipients = []
-    if chat_id:
-        recipients.append(chat_id)
-    else:
-        recipients.extend(AUTHORIZED_CHAT_IDS)
-
-    for recipient_id in set(recipients):
-        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-        payload = {'chat_id': recipient_id, 'text': message, 'parse_mode': 'Markdown'}
-        try:
-            response = requests.post(url, json=payload, timeout=10)
-            response.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Telegram mesajı gönderilemedi: {e}")
-
-@st.cache_data(ttl=600)
-def load_templates(file_path="cevap_sablonlari.xlsx"):
-    try:
-        df = pd.read_excel(file_path)
-        return pd.Series(df.sablon_metni.values, index=df.keyword).to_dict()
-    except FileNotFoundError:
-        return {}
-    except Exception as e:
-        st.sidebar.error(f"Şablon dosyası okunurken hata: {e}")
-        return {}
-
-def process_telegram_updates(stores_map, templates):
-    offset = st.session_state.last_update_id + 1
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getUpdates?offset={offset}&timeout=10"
-    try:
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
-        updates = response.json().get("result", [])
-        if not updates: return
-
-        for update in updates:
-            st.session_state.last_update_id = update.get("update_id")
-            
-            if 'message' not in update: continue
-            message = update['message']
-            chat_id = str(message['chat']['id'])
-            
-            if chat_id not in AUTHORIZED_CHAT_IDS:
-                continue
-
-            reply_text = message.get("text", "").strip()
-
-            if reply_text == "/sablonlar":
-                if templates:
-                    template_list_message = "📋 *Kullanılabilir Cevap Şablonları:*\n\n"
-                    for keyword in templates.keys():
-                        template_list_message += f"`#{keyword}`\n"
-                    template_list_message += "\n_(Bir soruya cevap verirken bu anahtar kelimeleri kullanabilirsiniz.)_"
-                else:
-                    template_list_message = "❌ Hiç cevap şablonu bulunamadı. Lütfen `cevap_sablonlari.xlsx` dosyasını kontrol edin."
-                send_telegram_message(template_list_message, chat_id=chat_id)
-                continue
-            
-            if 'reply_to_message' in message:
-                original_message = message['reply_to_message']
-                original_text = original_message.get("text", "")
-                
-                match_id = re.search(r"\(Soru ID: (\d+)\)", original_text)
-                match_store = re.search(r"🏪 Mağaza: (.+?)\n", original_text)
-
-                if match_id and match_store:
-                    question_id = int(match_id.group(1))
-                    store_name = match_store.group(1).strip()
-                    
-                    if store_name in stores_map:
-                        store = stores_map[store_name]
-                        final_answer = ""
-
-                        if reply_text.startswith("#"):
-                            keyword = reply_text[1:].lower()
-                            if keyword in templates:
-                                final_answer = templates[keyword]
-                            else:
-                                send_telegram_message(f"‼️ `{store_name}` için `#{keyword}` adında bir şablon bulunamadı.", chat_id=chat_id)
-                                continue
-                        else:
-                            final_answer = reply_text
-                        
-                        success, response_text = send_answer(store, question_id, final_answer)
-                        if success:
-                            msg = f"✅ `{store_name}` mağazası için (Soru ID: {question_id}) cevabı @{message.get('from', {}).get('username', chat_id)} tarafından gönderildi."
-                            st.success(msg)
-                            send_telegram_message(msg)
-                            if question_id in st.session_state.questions:
-                                st.session_state.questions[question_id]['handled'] = True
-                            st.rerun()
-                        else:
-                            msg = f"❌ `{store_name}` için cevap gönderilemedi: {response_text}"
-                            st.error(msg)
-                            send_telegram_message(msg, chat_id=chat_id)
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Telegram güncellemeleri alınamadı: {e}")
-    except Exception as e:
-        st.sidebar.error(f"Telegram güncellemeleri işlenirken hata: {e}")
-
-# --- DİĞER FONKSİYONLAR ---
-def get_pending_claims(store):
-    url = f"https://apigw.trendyol.com/integration/order/sellers/{store['seller_id']}/claims?claimItemStatus=WaitingInAction&size=50&page=0"
-    try:
-        headers = get_headers(store['api_key'], store['api_secret'])
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        return response.json().get('content', [])
-    except requests.exceptions.HTTPError as e:
-        logging.error(f"{store['name']} için talepler alınamadı (HTTP Hatası): {e.response.status_code} - {e.response.text}")
-    except requests.exceptions.RequestException as e:
-        logging.error(f"{store['name']} için talepler alınamadı (Bağlantı Hatası): {e}")
-    except Exception as e:
-        logging.error(f"{store['name']} için talepler alınırken beklenmedik bir hata oluştu: {e}")
-    return []
-
-def approve_claim_items(store, claim_id, claim_item_ids):
-    url = f"https://apigw.trendyol.com/integration/order/sellers/{store['seller_id']}/claims/{claim_id}/items/approve"
-    data = {"claimLineItemIdList": claim_item_ids, "params": {}}
-    try:
-        headers = get_headers(store['api_key'], store['api_secret'])
-        response = requests.put(url, headers=headers, json=data, timeout=15)
-        response.raise_for_status()
-        return True, response.text
-    except requests.exceptions.HTTPError as e:
-        error_message = f"HTTP Hatası: {e.response.status_code} - {e.response.text}"
-        logging.error(f"{store['name']} için talep onayı başarısız: {error_message}")
-        return False, error_message
-    except requests.exceptions.RequestException as e:
-        error_message = f"Bağlantı Hatası: {e}"
-        logging.error(f"{store['name']} için talep onayı başarısız: {error_message}")
-        return False, error_message
-    except Exception as e:
-        error_message = f"Beklenmedik bir hata oluştu: {e}"
-        logging.error(f"{store['name']} için talep onayı başarısız: {error_message}")
-        return False, error_message
-
-def load_past_data(file_path="soru_cevap_ornekleri.xlsx"):
-    try:
-        df = pd.read_excel(file_path)
-        return df[['Ürün İsmi', 'Soru Detayı', 'Onaylanan Cevap']]
-    except FileNotFoundError: return None
-    except Exception: return None
-
-def get_waiting_questions(store):
-    url = f"https://apigw.trendyol.com/integration/qna/sellers/{store['seller_id']}/questions/filter?status=WAITING_FOR_ANSWER"
-    try:
-        headers = get_headers(store['api_key'], store['api_secret'])
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        return response.json().get("content", [])
-    except requests.exceptions.HTTPError as e:
-        logging.error(f"{store['name']} için bekleyen sorular alınamadı (HTTP Hatası): {e.response.status_code} - {e.response.text}")
-    except requests.exceptions.RequestException as e:
-        logging.error(f"{store['name']} için bekleyen sorular alınamadı (Bağlantı Hatası): {e}")
-    except Exception as e:
-        logging.error(f"{store['name']} için bekleyen sorular alınırken beklenmedik bir hata oluştu: {e}")
-    return []
-
-def send_answer(store, question_id, answer_text):
-    url = f"https://apigw.trendyol.com/integration/qna/sellers/{store['seller_id']}/questions/{question_id}/answers"
-    data = {"text": answer_text}
-    try:
-        headers = get_headers(store['api_key'], store['api_secret'])
-        response = requests.post(url, headers=headers, json=data, timeout=15)
-        response.raise_for_status()
-        return True, response.text
-    except requests.exceptions.HTTPError as e:
-        error_message = f"HTTP Hatası: {e.response.status_code} - {e.response.text}"
-        logging.error(f"{store['name']} için cevap gönderilemedi: {error_message}")
-        return False, error_message
-    except requests.exceptions.RequestException as e:
-        error_message = f"Bağlantı Hatası: {e}"
-        logging.error(f"{store['name']} için cevap gönderilemedi: {error_message}")
-        return False, error_message
-    except Exception as e:
-        error_message = f"Beklenmedik bir hata oluştu: {e}"
-        logging.error(f"{store['name']} için cevap gönderilemedi: {error_message}")
-        return False, error_message
-
-def safe_generate_answer(product_name, question, past_df, config: Config):
-    if not openai.api_key: 
-        logging.error("OpenAI API anahtarı bulunamadı.")
-        return None, "OpenAI API anahtarı bulunamadı."
-    
-    examples = pd.DataFrame()
-    if past_df is not None and not past_df.empty:
-        mask = past_df['Ürün İsmi'].astype(str).str.contains(str(product_name), case=False, na=False)
-        examples = past_df[mask]
-    
-    if config.min_examples > 0 and len(examples) < config.min_examples:
-        return None, f"Örnek sayısı yetersiz ({len(examples)}/{config.min_examples})."
-    
-    prompt = f"""
-    Sen Trendyol'da satış yapan bir mağazanın profesyonel müşteri temsilcisisin.
-    Müşteriden gelen soruyu, ürün bilgisine dayanarak nazik ve açıklayıcı bir şekilde cevapla.
-    
-    Ürün: {product_name}
-    Soru: {question}
-    """
-    
-    if not examples.empty:
-        prompt += "\n\nBenzer Geçmiş Sorular ve Cevaplarımız:\n"
-        for idx, row in examples.head(3).iterrows():
-            prompt += f"- Soru: {row['Soru Detayı']}\n  Cevap: {row['Onaylanan Cevap']}\n"
-    else:
-        prompt += "\n\nLütfen genel e-ticaret nezaket kurallarına uygun, yardımsever bir cevap üret."
-
-    try:
-        client = openai.OpenAI(api_key=openai.api_key)
-        response = client.chat.completions.create(
-            model=config.openai_model, 
-            messages=[{"role": "user", "content": prompt}], 
-            max_tokens=config.openai_max_tokens, 
-            temperature=config.openai_temperature
-        )
-        answer = response.choices[0].message.content.strip()
-        return (answer, "")
-    except openai.APIError as e:
-        logging.error(f"OpenAI API Hatası: {e}")
-        return None, f"OpenAI API Hatası: {e}"
-    except Exception as e:
-        logging.error(f"OpenAI'den cevap üretilirken beklenmedik bir hata oluştu: {e}")
-        return None, f"Beklenmedik bir hata: {e}"
-
-def handle_claims(store):
-    st.subheader("Onay Bekleyen İade/Talepler")
-    claims = get_pending_claims(store)
-    if not claims: 
-        st.info("Onay bekleyen iade/talep bulunamadı.")
-    else:
-        st.write(f"**{len(claims)}** adet onay bekleyen talep var.")
-        for claim in claims:
-            if isinstance(claim, dict) and claim.get('id'):
-                claim_id = claim.get('id')
-                with st.expander(f"Sipariş No: {claim.get('orderNumber')} - Talep ID: {claim_id}", expanded=True):
-                    st.write(f"**Talep Nedeni:** {claim.get('claimType', {}).get('name', 'Belirtilmemiş')}")
-                    st.write(f"**Durum:** {claim.get('status')}")
-                    
-                    if store.get('auto_approve_claims'):
-                        if claim_id in st.session_state.processed_claims:
-                            st.warning("⚠️ Bu talep bu oturumda daha önce denendi. Döngüyü önlemek için otomatik onay pas geçiliyor. Lütfen manuel kontrol edin.")
-                        else:
-                            with st.spinner("Otomatik olarak onaylanıyor..."):
-                                item_ids = [item.get('id') for batch in claim.get('items', []) for item in batch.get('claimItems', [])]
-                                if item_ids:
-                                    st.session_state.processed_claims.add(claim_id)
-                                    success, message = approve_claim_items(store, claim_id, item_ids)
-                                    if success:
-                                        st.session_state.metrics['claims_approved_auto'] += 1
-                                        st.success("Talep başarıyla otomatik onaylandı.")
-                                        st.rerun()
-                                    else: 
-                                        st.error(f"Otomatik onay başarısız: {message}")
-                                else:
-                                    st.warning("Onaylanacak ürün kalemi bulunamadı.")
-
-def handle_questions(store, past_df, config: Config):
-    st.subheader("Cevap Bekleyen Müşteri Soruları")
-    
-    all_questions_raw = get_waiting_questions(store)
-    questions_data = []
-    seen_question_ids = set()
-    if all_questions_raw:
-        for q in all_questions_raw:
-            if isinstance(q, dict) and q.get("id"):
-                q_id = q["id"]
-                if q_id not in seen_question_ids:
-                    questions_data.append(q)
-                    seen_question_ids.add(q_id)
-    
-    if questions_data and store.get('send_notifications'):
-        for q in questions_data:
-            q_id = q.get("id")
-            if q_id not in st.session_state.notified_question_ids:
-                message = (
-                    f"🔔 *Yeni Soru!*\n\n"
-                    f"🏪 Mağaza: *{store['name']}*\n"
-                    f"📦 Ürün: {q.get('productName', '')}\n"
-                    f"❓ Soru: {q.get('text', '')}\n"
-                    f"(Soru ID: {q_id})\n\n"
-                    f"👇 *Cevaplamak için bu mesaja yanıt verin veya `#keyword` kullanın. Tüm şablonları görmek için `/sablonlar` yazın.*"
-                )
-                send_telegram_message(message)
-                st.session_state.notified_question_ids.add(q_id)
-    
-    if not questions_data: 
-        st.info("Cevap bekleyen soru bulunamadı.")
-    else:
-        st.write(f"**{len(questions_data)}** adet cevap bekleyen soru var.")
-        for q in questions_data:
-            q_id = q.get("id")
-
-            if q_id not in st.session_state.questions:
-                st.session_state.questions[q_id] = {'handled': False, 'timestamp': datetime.now()}
-            
-            if st.session_state.questions[q_id]['handled']:
-                continue
-
-            with st.expander(f"Soru ID: {q_id} - Ürün: {q.get('productName', '')[:30]}...", expanded=True):
-                st.markdown(f"**Soru:** *{q.get('text', '')}*")
-                is_auto_answer_active = store.get('auto_answer_questions', False)
-                
-                elapsed = datetime.now() - st.session_state.questions[q_id]['timestamp']
-                
-                if is_auto_answer_active:
-                    if config.delay_minutes == 0 or elapsed >= timedelta(minutes=config.delay_minutes):
-                        with st.spinner(f"Soru ID {q_id}: Otomatik cevap kontrol ediliyor..."):
-                            answer, reason = safe_generate_answer(q.get("productName", ""), q.get("text", ""), past_df, config=config)
-                            if answer is None: 
-                                st.warning(f"Otomatik cevap gönderilmedi: {reason}")
-                                continue
-                            st.info(f"Otomatik gönderilecek cevap:\n\n> {answer}")
-                            success, message = send_answer(store, q_id, answer)
-                            if success:
-                                st.session_state.metrics['questions_answered_auto'] += 1
-                                st.session_state.metrics['total_response_time_seconds'] += elapsed.total_seconds()
-                                st.session_state.metrics['response_count'] += 1
-                                st.success("Cevap başarıyla otomatik gönderildi.")
-                                st.session_state.questions[q_id]['handled'] = True
-                                st.rerun()
-                            else: 
-                                st.error(f"Cevap gönderilemedi: {message}")
-                    else:
-                        remaining_seconds = (timedelta(minutes=config.delay_minutes) - elapsed).total_seconds()
-                        st.warning(f"Bu soruya otomatik cevap yaklaşık **{int(remaining_seconds / 60)} dakika {int(remaining_seconds % 60)} saniye** içinde gönderilecek.")
-                else: 
-                    suggestion, reason = safe_generate_answer(q.get("productName", ""), q.get("text", ""), past_df, config=config)
-                    default_text = suggestion if suggestion is not None else ""
-                    if reason: st.info(f"Öneri üretilmedi: {reason}")
-                    
-                    cevap = st.text_area("Cevabınız:", value=default_text, key=f"textarea_{store['name']}_{q_id}")
-                    if st.button(f"Cevabı Gönder (ID: {q_id})", key=f"btn_{store['name']}_{q_id}"):
-                        if not cevap.strip(): st.error("Boş cevap gönderilemez.")
-                        else:
-                            success, message = send_answer(store, q_id, cevap)
-                            if success:
-                                st.session_state.metrics['questions_answered_manual'] += 1
-                                st.session_state.metrics['total_response_time_seconds'] += elapsed.total_seconds()
-                                st.session_state.metrics['response_count'] += 1
-                                st.success("Cevap başarıyla gönderildi.")
-                                st.session_state.questions[q_id]['handled'] = True
-                                st.rerun()
-                            else: 
-                                st.error(f"Cevap gönderilemedi: {message}")
-
-# --- UYGULAMA BAŞLANGIÇ NOKTASI ---
-
-initialize_session_state()
-config = Config().load_from_sidebar()
-
-# --- VERİ YÜKLEME VE ARKA PLAN İŞLEMLERİ ---
-templates = load_templates()
-past_df = load_past_data()
-stores_map = {store['name']: store for store in STORES}
-
-if not templates:
-    st.sidebar.warning("`cevap_sablonlari.xlsx` dosyası bulunamadı veya boş.")
-if past_df is not None:
-    st.sidebar.success(f"Soru-cevap örnekleri yüklendi ({len(past_df)} kayıt).")
-else:
-    st.sidebar.warning("`soru_cevap_ornekleri.xlsx` dosyası bulunamadı.")
-
-process_telegram_updates(stores_map, templates)
-
-# --- ANA SAYFA GÖVDESİ ---
-tab_titles = ["Dashboard"] + [s['name'] for s in STORES]
-tabs = st.tabs(tab_titles)
-
-with tabs[0]:
-    st.header("📊 Genel Bakış")
-    
-    metrics = st.session_state.metrics
-    
-    avg_response_time = (metrics['total_response_time_seconds'] / metrics['response_count']) if metrics['response_count'] > 0 else 0
-    
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("Otomatik Onaylanan Talep", metrics['claims_approved_auto'])
-    with col2:
-        st.metric("Otomatik Cevaplanan Soru", metrics['questions_answered_auto'])
-    with col3:
-        st.metric("Manuel Cevaplanan Soru", metrics['questions_answered_manual'])
-    with col4:
-        st.metric("Ortalama Cevap Süresi (sn)", f"{avg_response_time:.2f}")
-
-    st.subheader("Cevaplanan Soru Dağılımı")
-    chart_data = pd.DataFrame({
-        'Cevap Türü': ['Otomatik', 'Manuel'],
-        'Sayı': [metrics['questions_answered_auto'], metrics['questions_answered_manual']]
-    })
-    st.bar_chart(chart_data.set_index('Cevap Türü'))
-
-for i, store in enumerate(STORES):
-    with tabs[i+1]:
-        st.header(f"🏪 {store['name']} Mağazası Paneli")
-        st.markdown(
-            f"**İade Onaylama:** `{'Aktif' if store.get('auto_approve_claims') else 'Pasif'}` | "
-            f"**Soru Cevaplama:** `{'Aktif' if store.get('auto_answer_questions') else 'Pasif'}` | "
-            f"**Telegram Bildirim:** `{'Aktif' if store.get('send_notifications') else 'Pasif'}`"
-        )
-        col1, col2 = st.columns(2)
-        with col1:
-            handle_claims(store)
-        with col2:
-            handle_questions(store, past_df, config)
+import streamlit as st
+import pandas as pd
+import logging
+import uuid
+import math
+import time
+from datetime import datetime, timedelta
+from streamlit_autorefresh import st_autorefresh
+
+import servisler
+from veri_onbellegi import source_key
+from durum_deposu import StateStore
+from olcumler import histogram_quantile
+from ornek_indeksi import normalize
+from sablon_motoru import TemplateEngine
+from servisler import (
+    Config, load_config, save_config, read_template_engine, read_example_index, read_semantic_index,
+    send_answer, safe_generate_answer, auto_answer_remaining, get_answer_cache, record_answer,
+)
+
+# --- Logging ---
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Soru ve talep tablolarında sayfa başına gösterilen satır sayısı.
+PAGE_SIZE = 25
+
+# --- Konfigürasyon ---
+def load_config_from_sidebar(config: Config):
+    st.sidebar.header("Genel Ayarlar")
+    config.min_examples = st.sidebar.number_input(
+        "Otomatik cevap için min. örnek sayısı (0 = Örneksiz çalışır)",
+        min_value=0,
+        value=config.min_examples
+    )
+    config.delay_minutes = st.sidebar.number_input(
+        "Otomatik Cevap Gecikmesi (Dakika)",
+        min_value=1,
+        value=config.delay_minutes,
+        help="Soru geldikten sonra bu süre kadar beklenir, siz cevaplamazsanız bot cevaplar."
+    )
+    config.template_auto_apply = st.sidebar.checkbox(
+        "Eşleşen Şablonu Otomatik Uygula",
+        value=config.template_auto_apply,
+        help="Soru metninde bir şablon anahtar kelimesi geçiyorsa otomatik cevapta OpenAI yerine şablon gönderilir."
+    )
+    config.semantic_examples = st.sidebar.checkbox(
+        "Örnekleri Anlamsal Benzerlikle Ara",
+        value=config.semantic_examples,
+        help="Ürün adları ilanlar arasında farklı yazıldığında da benzer geçmiş soruları bulur. İndeksi arka plan işleyicisi kurar."
+    )
+
+    st.sidebar.header("OpenAI Ayarları")
+    config.openai_model = st.sidebar.text_input("OpenAI Modeli", value=config.openai_model)
+    config.openai_temperature = st.sidebar.slider("Sıcaklık (Temperature)", 0.0, 1.0, config.openai_temperature)
+    config.openai_max_tokens = st.sidebar.number_input("Max Tokens", min_value=50, value=config.openai_max_tokens)
+    config.prompt_token_budget = st.sidebar.number_input(
+        "Girdi Token Bütçesi",
+        min_value=200,
+        value=config.prompt_token_budget,
+        help="Sistem mesajı, soru ve örnekler dahil istemin en fazla token sayısı; sığmayan örnekler kısaltılır ya da çıkarılır."
+    )
+    config.example_max_tokens = st.sidebar.number_input("Örnek Başına En Fazla Token", min_value=30, value=config.example_max_tokens)
+    config.max_examples = st.sidebar.number_input("İstemdeki En Fazla Örnek", min_value=0, value=config.max_examples)
+    config.generation_parallelism = st.sidebar.number_input(
+        "Eşzamanlı Cevap Üretimi",
+        min_value=1,
+        value=config.generation_parallelism,
+        help="Arka plan işleyicisinin aynı anda yapabileceği en fazla OpenAI çağrısı."
+    )
+    config.openai_rpm_limit = st.sidebar.number_input("Dakikalık İstek Sınırı (RPM)", min_value=1, value=config.openai_rpm_limit)
+    config.openai_tpm_limit = st.sidebar.number_input("Dakikalık Token Sınırı (TPM)", min_value=1000, value=config.openai_tpm_limit)
+    config.openai_input_price = st.sidebar.number_input(
+        "Girdi Fiyatı (USD / 1M token)", min_value=0.0, value=config.openai_input_price, format="%.3f")
+    config.openai_cached_input_price = st.sidebar.number_input(
+        "Önbellekli Girdi Fiyatı (USD / 1M token)", min_value=0.0, value=config.openai_cached_input_price, format="%.3f")
+    config.openai_output_price = st.sidebar.number_input(
+        "Çıktı Fiyatı (USD / 1M token)", min_value=0.0, value=config.openai_output_price, format="%.3f")
+
+    st.sidebar.header("Telegram Ayarları")
+    config.telegram_digest_threshold = st.sidebar.number_input(
+        "Özet Bildirim Eşiği (0 = Kapalı)",
+        min_value=0,
+        value=config.telegram_digest_threshold,
+        help="Bir mağazada aynı anda bu sayıda veya daha fazla yeni soru gelirse tek tek bildirim yerine özet mesaj gönderilir."
+    )
+    return config
+
+# --- Streamlit Arayüzü ve Ayarları ---
+st.set_page_config(layout="wide", page_title="Trendyol Panel")
+st.title("Trendyol Multi-Store Otomasyon Paneli")
+
+# --- Ortak API Bilgilerini Oku ---
+try:
+    servisler.configure(st.secrets)
+    STORES = servisler.STORES
+except KeyError as e:
+    st.error(f"'{e.args[0]}' adlı gizli bilgi (Secret) bulunamadı. Lütfen 'Secrets' bölümünü kontrol edin.")
+    st.stop()
+
+if not STORES:
+    st.error("Yapılandırılmış herhangi bir mağaza bulunamadı. Lütfen secrets dosyanızı `[[stores]]` formatına göre düzenleyin.")
+    st.stop()
+if not servisler.AUTHORIZED_CHAT_IDS:
+    st.error("`TELEGRAM_CHAT_ID` veya `AUTHORIZED_CHAT_IDS` listesinde yetkili bir kullanıcı bulunamadı.")
+    st.stop()
+
+
+# Sayfa otomatik yenileme (yalnızca durum deposunu yeniden okur)
+st_autorefresh(interval=60 * 1000, key="data_fetch_refresher")
+
+def initialize_session_state():
+    # Soru kilitlerinde bu oturumu işleyiciden ve diğer oturumlardan ayırır.
+    if 'owner_id' not in st.session_state:
+        st.session_state.owner_id = f"panel-{uuid.uuid4().hex[:8]}"
+
+# --- Ortak Fonksiyonlar ---
+
+# Kaynak dosyanın anahtarı (mtime/boyut) değişmedikçe tüm oturumlar aynı nesneyi kullanır.
+@st.cache_resource(max_entries=1)
+def _load_template_engine(file_path, key):
+    return read_template_engine(file_path)
+
+def load_template_engine(file_path="cevap_sablonlari.xlsx"):
+    try:
+        return _load_template_engine(file_path, source_key(file_path))
+    except Exception as e:
+        st.sidebar.error(f"Şablon dosyası okunurken hata: {e}")
+        return TemplateEngine({})
+
+def load_example_index(file_path="soru_cevap_ornekleri.xlsx"):
+    # Süreç içinde zaten tek kopya tutulur; her çalıştırmada cevap günlüğündeki yeni cevaplar eklenir.
+    return read_example_index(file_path)
+
+@st.cache_resource
+def get_state_store():
+    return StateStore(servisler.STATE_FILE)
+
+def show_worker_status(db):
+    heartbeat = db.get_value('heartbeat')
+    if not heartbeat:
+        st.warning("Arka plan işleyicisi henüz çalışmadı. Otomasyonlar için `python calisan.py` komutunu çalıştırın.")
+        return
+    heartbeat = datetime.fromtimestamp(heartbeat)
+    age = datetime.now() - heartbeat
+    if age > timedelta(seconds=3 * (db.get_value('poll_interval') or 60)):
+        st.error(f"Arka plan işleyicisi yanıt vermiyor. Son çalışma: {heartbeat:%d.%m.%Y %H:%M:%S}")
+    else:
+        st.caption(f"Arka plan işleyicisi çalışıyor. Son çalışma: {heartbeat:%H:%M:%S}")
+
+def show_poll_schedule(plan):
+    """İşleyicinin bu mağaza için tuttuğu yoklama planını tek satırda gösterir."""
+    if not plan:
+        return
+    if plan.get('circuit_open_until') and plan['circuit_open_until'] > time.time():
+        st.warning(
+            f"Art arda {plan['failures']} hata nedeniyle mağaza "
+            f"{datetime.fromtimestamp(plan['circuit_open_until']):%H:%M:%S}'e kadar yoklanmayacak."
+        )
+    parts = [f"Sonraki yoklama: {datetime.fromtimestamp(plan['next_poll']):%H:%M:%S}",
+             f"aralık: {plan['interval']:.0f} sn"]
+    if plan.get('arrivals_per_hour') is not None:
+        parts.append(f"saatte ~{plan['arrivals_per_hour']:.1f} yeni kayıt")
+    st.caption(" | ".join(parts))
+
+def show_shards(shards):
+    """Parçalı çalışmada (``calisan.py --shards N``) her işleyici sürecinin mağazaları ve durumu."""
+    if not shards:
+        return
+    st.subheader("İşleyici Süreçleri")
+    rows = [
+        {
+            'Parça': name,
+            'PID': shard['pid'],
+            'Durum': "Çalışıyor" if shard['alive'] else "Durdu",
+            'Mağazalar': ", ".join(shard['stores']),
+            'Son Çalışma': f"{datetime.fromtimestamp(shard['heartbeat']):%H:%M:%S}" if shard.get('heartbeat') else "-",
+            'Yeniden Başlatma': shard['restarts'],
+        }
+        for name, shard in shards.items()
+    ]
+    st.dataframe(pd.DataFrame(rows), width="stretch", hide_index=True)
+
+def show_call_metrics(snapshot):
+    st.subheader("Dış Çağrı Ölçümleri")
+    if not snapshot:
+        st.info("Arka plan işleyicisi henüz ölçüm yayınlamadı.")
+        return
+    st.caption(f"Arka plan işleyicisinin başlangıcından beri, son güncelleme: {datetime.fromtimestamp(snapshot['taken_at']):%H:%M:%S}")
+    buckets = snapshot['buckets']
+
+    errors = {}
+    error_rows = []
+    for sample in snapshot.get('panel_calls_total', []):
+        labels = sample['labels']
+        if labels['outcome'] == 'ok': continue
+        key = (labels['operation'], labels['store'])
+        errors[key] = errors.get(key, 0) + sample['value']
+        error_rows.append({'İşlem': labels['operation'], 'Mağaza': labels['store'] or '-', 'Durum': labels['outcome'], 'Sayı': sample['value']})
+
+    rows = []
+    for sample in snapshot.get('panel_call_duration_seconds', []):
+        labels = sample['labels']
+        rows.append({
+            'İşlem': labels['operation'],
+            'Mağaza': labels['store'] or '-',
+            'Çağrı': sample['count'],
+            'Hata': errors.get((labels['operation'], labels['store']), 0),
+            'Ort. (ms)': round(sample['sum'] / sample['count'] * 1000, 1) if sample['count'] else 0,
+            'p50 (ms)': round((histogram_quantile(0.5, sample['counts'], buckets) or 0) * 1000, 1),
+            'p95 (ms)': round((histogram_quantile(0.95, sample['counts'], buckets) or 0) * 1000, 1),
+            'p99 (ms)': round((histogram_quantile(0.99, sample['counts'], buckets) or 0) * 1000, 1),
+        })
+    if rows:
+        st.dataframe(pd.DataFrame(rows).sort_values(['İşlem', 'Mağaza']), width="stretch", hide_index=True)
+    if error_rows:
+        st.markdown("**Hatalar (HTTP durum kodu / hata türü)**")
+        st.dataframe(pd.DataFrame(error_rows).sort_values('Sayı', ascending=False), width="stretch", hide_index=True)
+
+    tokens = {}
+    for sample in snapshot.get('panel_openai_tokens_total', []):
+        tokens[sample['labels']['kind']] = tokens.get(sample['labels']['kind'], 0) + sample['value']
+    calls = sum(sample['value'] for sample in snapshot.get('panel_calls_total', [])
+                if sample['labels']['operation'] == 'openai_completion' and sample['labels']['outcome'] == 'ok')
+    cost = sum(sample['value'] for sample in snapshot.get('panel_openai_cost_usd_total', []))
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("OpenAI Girdi Token", int(tokens.get('prompt', 0)),
+                  help=f"Çağrı başına {tokens.get('prompt', 0) / calls:.0f}" if calls else None)
+    with col2:
+        st.metric("OpenAI Çıktı Token", int(tokens.get('completion', 0)),
+                  help=f"Çağrı başına {tokens.get('completion', 0) / calls:.0f}" if calls else None)
+    with col3:
+        st.metric("Önbellekten Gelen Girdi", f"{tokens.get('cached', 0) / tokens['prompt']:.0%}" if tokens.get('prompt') else "-")
+    with col4:
+        st.metric("Tahmini Maliyet (USD)", f"{cost:.4f}", help=f"Çağrı başına {cost / calls:.6f} USD" if calls else None)
+    examples = {sample['labels']['outcome']: sample['value'] for sample in snapshot.get('panel_prompt_examples_total', [])}
+    if examples:
+        st.caption(
+            f"İstem örnekleri: {int(examples.get('used', 0))} eklendi, {int(examples.get('truncated', 0))} kısaltıldı, "
+            f"{int(examples.get('dropped', 0))} bütçeye sığmadı, {int(examples.get('duplicate', 0))} tekrar atlandı."
+        )
+
+def filter_and_sort(frame, key, search_columns, sort_options):
+    """Tabloyu arama kutusuna göre süzer ve seçilen sıralamayı uygular."""
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        query = st.text_input("Ara", key=f"search_{key}", placeholder="Kimlik, ürün veya metin")
+    with col2:
+        sort_label = st.selectbox("Sırala", list(sort_options), key=f"sort_{key}")
+    if query and not frame.empty:
+        needle = normalize(query)
+        mask = pd.Series(False, index=frame.index)
+        for column in search_columns:
+            mask |= frame[column].astype(str).map(normalize).str.contains(needle, regex=False)
+        frame = frame[mask]
+    columns, ascending = sort_options[sort_label]
+    return frame.sort_values(columns, ascending=ascending, kind="stable")
+
+def paginate(frame, key):
+    """Tablonun yalnızca seçili sayfasını döndürür; tarayıcıya en fazla PAGE_SIZE satır gider."""
+    pages = max(1, math.ceil(len(frame) / PAGE_SIZE))
+    page_key = f"page_{key}"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = st.number_input("Sayfa", min_value=1, max_value=pages, key=page_key) if pages > 1 else 1
+    st.caption(f"{len(frame)} kayıt, sayfa {page}/{pages}")
+    return frame.iloc[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+
+def question_frame(questions, config: Config, auto_answer=False):
+    now = datetime.now()
+    rows = []
+    for q in questions:
+        first_seen = datetime.fromtimestamp(q['first_seen'])
+        row = {
+            'Mağaza': q['store'],
+            'Soru ID': q['id'],
+            'Ürün': q.get('product_name') or '',
+            'Soru': q.get('text') or '',
+            'Bekleme (dk)': int((now - first_seen).total_seconds() // 60),
+            'Durum': q.get('status') or '',
+        }
+        if auto_answer:
+            remaining = auto_answer_remaining(first_seen, config, now).total_seconds()
+            row['Otomatik Cevap'] = f"{int(remaining // 60)} dk {int(remaining % 60)} sn" if remaining > 0 else "Sırada"
+        rows.append(row)
+    return pd.DataFrame(rows, columns=['Mağaza', 'Soru ID', 'Ürün', 'Soru', 'Bekleme (dk)', 'Durum'] + (['Otomatik Cevap'] if auto_answer else []))
+
+QUESTION_SORTS = {
+    "En eski önce": (['Bekleme (dk)'], False),
+    "En yeni önce": (['Bekleme (dk)'], True),
+    "Mağaza": (['Mağaza', 'Bekleme (dk)'], [True, False]),
+    "Ürün": (['Ürün', 'Bekleme (dk)'], [True, False]),
+}
+
+def show_waiting_questions(db, config: Config):
+    """Tüm mağazaların cevap bekleyen soruları (yalnızca okuma)."""
+    st.subheader("Cevap Bekleyen Sorular")
+    frame = question_frame(db.list_questions(handled=False), config)
+    if frame.empty:
+        st.info("Cevap bekleyen soru bulunamadı.")
+        return
+    frame = filter_and_sort(frame, "overview", ['Mağaza', 'Soru ID', 'Ürün', 'Soru'], QUESTION_SORTS)
+    st.dataframe(paginate(frame, "overview"), width="stretch", hide_index=True)
+
+@st.fragment
+def handle_claims(store, db):
+    st.subheader("Onay Bekleyen İade/Talepler")
+    claims = db.list_claims(store['name'])
+    last_batch = db.get_value(f"talep_onay:{store['name']}")
+    if last_batch:
+        st.caption(
+            f"Son toplu onay ({datetime.fromtimestamp(last_batch['time']):%H:%M:%S}): "
+            f"{last_batch['approved']} onaylandı, {last_batch['retry']} yeniden denenecek, "
+            f"{last_batch['failed']} başarısız, {last_batch['skipped']} atlandı."
+        )
+    if not claims:
+        st.info("Onay bekleyen iade/talep bulunamadı.")
+        return
+    st.write(f"**{len(claims)}** adet onay bekleyen talep var.")
+    frame = pd.DataFrame([
+        {
+            'Talep ID': claim['id'],
+            'Sipariş No': claim.get('order_number') or '',
+            'Talep Nedeni': claim.get('reason') or '',
+            'Durum': claim.get('status') or '',
+            'Otomatik Onay': claim.get('auto_result') or '',
+            'Görülme': datetime.fromtimestamp(claim['seen_at']),
+        }
+        for claim in claims
+    ])
+    key = f"claims_{store['name']}"
+    frame = filter_and_sort(frame, key, ['Talep ID', 'Sipariş No', 'Talep Nedeni', 'Otomatik Onay'], {
+        "En eski önce": (['Görülme'], True),
+        "En yeni önce": (['Görülme'], False),
+        "Talep nedeni": (['Talep Nedeni', 'Görülme'], True),
+    })
+    st.dataframe(paginate(frame, key), width="stretch", hide_index=True,
+                 column_config={'Görülme': st.column_config.DatetimeColumn(format="DD.MM.YYYY HH:mm")})
+
+def suggest_answer(store, q, example_index, templates, config: Config):
+    """Soru için önerilen cevabı bir kez üretir ve oturumda saklar."""
+    cache_key = f"suggestion_{store['name']}_{q['id']}"
+    if cache_key not in st.session_state:
+        keyword = templates.best_match(q.get("text", ""))
+        if keyword is not None:
+            st.session_state[cache_key] = (templates.templates[keyword], f"Önerilen şablon: `#{keyword}`")
+        else:
+            with st.spinner("Cevap önerisi hazırlanıyor..."):
+                suggestion, reason = safe_generate_answer(q.get("product_name", ""), q.get("text", ""), example_index, config=config, store_name=store['name'])
+            st.session_state[cache_key] = (suggestion or "", f"Öneri üretilmedi: {reason}" if reason else None)
+    return st.session_state[cache_key]
+
+def show_question_detail(store, db, q, example_index, templates, config: Config):
+    q_id = q['id']
+    st.markdown(f"**Soru ID {q_id}** - {q.get('product_name', '')}")
+    st.markdown(f"**Soru:** *{q.get('text', '')}*")
+    if q.get('status'):
+        st.info(q['status'])
+
+    if store.get('auto_answer_questions', False):
+        remaining_seconds = auto_answer_remaining(datetime.fromtimestamp(q['first_seen']), config).total_seconds()
+        if remaining_seconds > 0:
+            st.warning(f"Bu soruya otomatik cevap yaklaşık **{int(remaining_seconds / 60)} dakika {int(remaining_seconds % 60)} saniye** içinde gönderilecek.")
+        return
+
+    default_text, note = suggest_answer(store, q, example_index, templates, config)
+    if note: st.info(note)
+
+    cevap = st.text_area("Cevabınız:", value=default_text, key=f"textarea_{store['name']}_{q_id}")
+    if st.button(f"Cevabı Gönder (ID: {q_id})", key=f"btn_{store['name']}_{q_id}"):
+        if not cevap.strip(): st.error("Boş cevap gönderilemez.")
+        elif not db.try_lock_question(q_id, st.session_state.owner_id):
+            st.warning("Bu soru zaten cevaplandı veya başka bir oturumda cevaplanıyor.")
+        else:
+            success, message = send_answer(store, q_id, cevap)
+            if success:
+                db.mark_question_handled(q_id, 'manual')
+                record_answer(store['name'], q.get('product_name'), q.get('text'), cevap, 'manual', time.time() - q['first_seen'])
+                st.session_state.pop(f"suggestion_{store['name']}_{q_id}", None)
+                st.success("Cevap başarıyla gönderildi.")
+                st.rerun(scope="fragment")
+            else:
+                db.unlock_question(q_id, st.session_state.owner_id)
+                st.error(f"Cevap gönderilemedi: {message}")
+
+# Tablodaki etkileşimler (sayfa, arama, satır seçimi) yalnızca bu bölümü yeniden çalıştırır;
+# cevap önerisi yalnızca seçilen soru için üretilir.
+@st.fragment
+def handle_questions(store, db, example_index, templates, config: Config):
+    st.subheader("Cevap Bekleyen Müşteri Soruları")
+
+    questions_data = db.list_questions(store['name'], handled=False)
+    if not questions_data:
+        st.info("Cevap bekleyen soru bulunamadı.")
+        return
+    st.write(f"**{len(questions_data)}** adet cevap bekleyen soru var.")
+
+    key = f"questions_{store['name']}"
+    auto_answer = store.get('auto_answer_questions', False)
+    frame = question_frame(questions_data, config, auto_answer).drop(columns=['Mağaza'])
+    frame = filter_and_sort(frame, key, ['Soru ID', 'Ürün', 'Soru'], {
+        label: sort for label, sort in QUESTION_SORTS.items() if label != "Mağaza"
+    })
+    page = paginate(frame, key)
+    # Sayfadaki sorular değişince eski satır seçimi başka bir soruya kaymasın diye tablo anahtarı yenilenir.
+    selection = st.dataframe(page, width="stretch", hide_index=True,
+                             key=f"table_{key}_{hash(tuple(page['Soru ID']))}",
+                             on_select="rerun", selection_mode="single-row")
+    rows = selection.selection.rows
+    if not rows:
+        st.caption("Cevaplamak için tablodan bir soru seçin.")
+        return
+    selected_id = page.iloc[rows[0]]['Soru ID']
+    question = next((q for q in questions_data if q['id'] == selected_id), None)
+    if question is not None:
+        show_question_detail(store, db, question, example_index, templates, config)
+
+# --- UYGULAMA BAŞLANGIÇ NOKTASI ---
+
+initialize_session_state()
+stored_config = load_config()
+config = load_config_from_sidebar(Config.from_dict(stored_config.to_dict()))
+if config != stored_config:
+    save_config(config)
+
+# --- VERİ YÜKLEME ---
+templates = load_template_engine()
+example_index = load_example_index()
+db = get_state_store()
+
+if not templates:
+    st.sidebar.warning("`cevap_sablonlari.xlsx` dosyası bulunamadı veya boş.")
+if example_index is not None:
+    st.sidebar.success(f"Soru-cevap örnekleri yüklendi ({len(example_index)} kayıt).")
+else:
+    st.sidebar.warning("`soru_cevap_ornekleri.xlsx` dosyası bulunamadı.")
+if config.semantic_examples:
+    semantic_index = read_semantic_index()
+    if len(semantic_index):
+        example_index = semantic_index
+        st.sidebar.success(f"Anlamsal örnek indeksi kullanılıyor ({len(semantic_index)} kayıt).")
+    else:
+        st.sidebar.info("Anlamsal indeks henüz kurulmadı; işleyicinin ilk döngüsüne kadar ürün adı eşleşmesi kullanılıyor.")
+
+show_worker_status(db)
+
+# --- ANA SAYFA GÖVDESİ ---
+tab_titles = ["Dashboard"] + [s['name'] for s in STORES]
+tabs = st.tabs(tab_titles)
+
+with tabs[0]:
+    st.header("📊 Genel Bakış")
+
+    metrics = db.get_metrics()
+
+    avg_response_time = (metrics['total_response_time_seconds'] / metrics['response_count']) if metrics['response_count'] > 0 else 0
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Otomatik Onaylanan Talep", int(metrics['claims_approved_auto']))
+    with col2:
+        st.metric("Otomatik Cevaplanan Soru", int(metrics['questions_answered_auto']))
+    with col3:
+        st.metric("Manuel Cevaplanan Soru", int(metrics['questions_answered_manual']))
+    with col4:
+        st.metric("Ortalama Cevap Süresi (sn)", f"{avg_response_time:.2f}")
+
+    st.subheader("Cevaplanan Soru Dağılımı")
+    chart_data = pd.DataFrame({
+        'Cevap Türü': ['Otomatik', 'Manuel'],
+        'Sayı': [metrics['questions_answered_auto'], metrics['questions_answered_manual']]
+    })
+    st.bar_chart(chart_data.set_index('Cevap Türü'))
+
+    st.subheader("OpenAI Cevap Önbelleği")
+    cache_stats = get_answer_cache().stats()
+    lookups = cache_stats['hits'] + cache_stats['misses'] + cache_stats['shared']
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Önbellek İsabeti", cache_stats['hits'])
+    with col2:
+        st.metric("Önbellek Iskası (OpenAI Çağrısı)", cache_stats['misses'])
+    with col3:
+        st.metric("Paylaşılan Eşzamanlı İstek", cache_stats['shared'])
+    with col4:
+        st.metric("İsabet Oranı", f"{(cache_stats['hits'] + cache_stats['shared']) / lookups:.0%}" if lookups else "-")
+
+    show_shards(db.get_value('parcalar'))
+
+    show_call_metrics(db.get_value('olcumler'))
+
+    show_waiting_questions(db, config)
+
+    events = db.recent_events()
+    if events:
+        st.subheader("Son İşlemler")
+        st.dataframe(pd.DataFrame(events), width="stretch", hide_index=True)
+
+poll_schedule = db.get_value('yoklama') or {}
+for i, store in enumerate(STORES):
+    with tabs[i+1]:
+        st.header(f"🏪 {store['name']} Mağazası Paneli")
+        st.markdown(
+            f"**İade Onaylama:** `{'Aktif' if store.get('auto_approve_claims') else 'Pasif'}` | "
+            f"**Soru Cevaplama:** `{'Aktif' if store.get('auto_answer_questions') else 'Pasif'}` | "
+            f"**Telegram Bildirim:** `{'Aktif' if store.get('send_notifications') else 'Pasif'}`"
+        )
+        store_status = db.get_store_status(store['name'])
+        if store_status.get('error'):
+            st.error(f"Son yoklama başarısız: {store_status['error']}")
+        show_poll_schedule(poll_schedule.get(store['name']))
+        col1, col2 = st.columns(2)
+        with col1:
+            handle_claims(store, db)
+        with col2:
+            handle_questions(store, db, example_index, templates, config)
@@ -0,0 +1,169 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+# OpenAI cevapları için LRU + TTL önbelleği.
+#
+# Anahtar (model, sıcaklık, max_tokens, prompt özeti) ikilisidir. Aynı anahtar
+# için eşzamanlı gelen istekler tek bir OpenAI çağrısını paylaşır (single
+# flight). İsteğe bağlı olarak cevaplar bir SQLite dosyasında da saklanır; bu
+# sayede panel ve arka plan işleyicisi aynı önbelleği ve sayaçları paylaşır.
+
+CACHE_FILE = os.environ.get("PANEL_LLM_ONBELLEGI", "llm_onbellegi.db")
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+DEFAULT_MAX_ENTRIES = 2048
+
+
+def make_key(model, temperature, max_tokens, prompt):
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return f"{model}|{float(temperature):.3f}|{int(max_tokens)}|{digest}"
+
+
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+
+class AnswerCache:
+    def __init__(self, path=CACHE_FILE, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path or None
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.counters = {'hits': 0, 'misses': 0, 'shared': 0}
+        if self.path:
+            self._db().executescript(
+                "CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, answer TEXT NOT NULL, created_at REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS idx_answers_created ON answers (created_at);"
+                "CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL DEFAULT 0);"
+            )
+
+    def _db(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+        if self.path:
+            try:
+                self._db().execute(
+                    "INSERT INTO stats (name, value) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+                    (name,),
+                )
+            except sqlite3.Error as e:
+                logging.warning(f"LLM önbellek sayacı yazılamadı: {e}")
+
+    def _get_memory(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        answer, created_at = entry
+        if time.time() - created_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return answer
+
+    def _put_memory(self, key, answer, created_at):
+        self._entries[key] = (answer, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_disk(self, key):
+        if not self.path:
+            return None
+        try:
+            row = self._db().execute(
+                "SELECT answer, created_at FROM answers WHERE key = ? AND created_at > ?",
+                (key, time.time() - self.ttl_seconds),
+            ).fetchone()
+        except sqlite3.Error as e:
+            logging.warning(f"LLM önbelleği okunamadı: {e}")
+            return None
+        return row
+
+    def _put_disk(self, key, answer, created_at):
+        if not self.path:
+            return
+        try:
+            db = self._db()
+            db.execute(
+                "INSERT INTO answers (key, answer, created_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET answer = excluded.answer, created_at = excluded.created_at",
+                (key, answer, created_at),
+            )
+            db.execute("DELETE FROM answers WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        except sqlite3.Error as e:
+            logging.warning(f"LLM önbelleğine yazılamadı: {e}")
+
+    def get_or_compute(self, key, compute):
+        """Önbellekteki cevabı döndürür; yoksa ``compute()`` çağrılır.
+
+        ``compute`` ``(cevap, hata)`` döndürmelidir; yalnızca başarılı cevaplar saklanır.
+        """
+        with self._lock:
+            answer = self._get_memory(key)
+            if answer is None:
+                flight = self._inflight.get(key)
+                owner = flight is None
+                if owner:
+                    flight = self._inflight[key] = _InFlight()
+        if answer is not None:
+            self._count('hits')
+            return answer, ""
+        if not owner:
+            flight.event.wait()
+            self._count('shared')
+            return flight.result
+
+        try:
+            row = self._get_disk(key)
+            if row is not None:
+                self._count('hits')
+                flight.result = (row[0], "")
+                with self._lock:
+                    self._put_memory(key, row[0], row[1])
+                return flight.result
+
+            self._count('misses')
+            flight.result = compute()
+            if flight.result[0] is not None:
+                created_at = time.time()
+                with self._lock:
+                    self._put_memory(key, flight.result[0], created_at)
+                self._put_disk(key, flight.result[0], created_at)
+            return flight.result
+        except Exception as e:
+            flight.result = (None, f"Beklenmedik bir hata: {e}")
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def stats(self):
+        """İsabet/ıska sayaçları; kalıcı önbellekte tüm süreçlerin toplamı döner."""
+        if self.path:
+            try:
+                rows = self._db().execute("SELECT name, value FROM stats").fetchall()
+                totals = {'hits': 0, 'misses': 0, 'shared': 0}
+                totals.update(dict(rows))
+                return totals
+            except sqlite3.Error as e:
+                logging.warning(f"LLM önbellek sayaçları okunamadı: {e}")
+        with self._lock:
+            return dict(self.counters)
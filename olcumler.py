@@ -0,0 +1,242 @@
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Dış çağrılar için süreç içi ölçümler (sayaç ve gecikme histogramı).
+#
+# Değerler Prometheus metin biçiminde yerel bir ``/metrics`` adresinden
+# yayınlanır. Arka plan işleyicisi ayrıca her döngüde ``snapshot()`` çıktısını
+# durum deposuna yazar; panel Dashboard'u bu anlık görüntüyü gösterir.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DEFAULT_PORT = 9464
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [{'labels': dict(zip(self.label_names, labels)), 'value': value} for labels, value in self._values.items()]
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, *labels):
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            entry['counts'][bisect.bisect_left(self.buckets, seconds)] += 1
+            entry['sum'] += seconds
+            entry['count'] += 1
+
+    def samples(self):
+        with self._lock:
+            return [
+                {'labels': dict(zip(self.label_names, labels)), 'counts': list(entry['counts']),
+                 'sum': entry['sum'], 'count': entry['count']}
+                for labels, entry in self._values.items()
+            ]
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, help_text, label_names=()):
+        metric = Counter(name, help_text, label_names)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help_text, label_names, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def expose(self):
+        return expose_snapshot(self.snapshot(), self)
+
+    def reset(self):
+        """Tüm değerleri sıfırlar (çatallanan alt süreç üst sürecin sayılarını tekrar raporlamasın diye)."""
+        for metric in self.metrics:
+            metric.reset()
+
+    def snapshot(self):
+        snapshot = {metric.name: metric.samples() for metric in self.metrics}
+        snapshot['buckets'] = list(DEFAULT_BUCKETS)
+        snapshot['taken_at'] = time.time()
+        return snapshot
+
+
+REGISTRY = Registry()
+CALL_DURATION = REGISTRY.histogram(
+    "panel_call_duration_seconds", "Dış çağrıların süresi (Trendyol, OpenAI, Telegram, dosya yükleme).", ("operation", "store"))
+CALLS = REGISTRY.counter(
+    "panel_calls_total", "Dış çağrı sayısı; outcome başarılıysa 'ok', değilse HTTP durum kodu ya da hata türü.",
+    ("operation", "store", "outcome"))
+HTTP_RESPONSES = REGISTRY.counter(
+    "panel_http_responses_total", "Sunucu başına HTTP yanıtları (bağlantı hataları 'error').", ("host", "status"))
+OPENAI_TOKENS = REGISTRY.counter(
+    "panel_openai_tokens_total", "OpenAI token kullanımı; kind 'prompt', 'completion' ya da 'cached' (önbellekten gelen girdi).",
+    ("model", "kind"))
+OPENAI_COST = REGISTRY.counter(
+    "panel_openai_cost_usd_total", "Ayarlardaki fiyatlarla tahmini OpenAI maliyeti (USD).", ("model",))
+PROMPT_EXAMPLES = REGISTRY.counter(
+    "panel_prompt_examples_total", "İstem kurulurken örneklerin durumu: used, truncated, dropped (bütçe) ya da duplicate.",
+    ("outcome",))
+
+
+class _Call:
+    def __init__(self):
+        self.outcome = "ok"
+
+    def error(self, outcome="error"):
+        self.outcome = str(outcome)
+
+
+@contextmanager
+def track(operation, store=""):
+    """Bloğun süresini ve sonucunu kaydeder; hata yakalanan yerlerde ``call.error(durum)`` çağrılır."""
+    call = _Call()
+    started = time.perf_counter()
+    try:
+        yield call
+    except Exception as e:
+        call.error(type(e).__name__)
+        raise
+    finally:
+        CALL_DURATION.observe(time.perf_counter() - started, operation, store)
+        CALLS.inc(operation, store, call.outcome)
+
+
+def merge_snapshots(snapshots):
+    """Birden fazla sürecin ``snapshot()`` çıktısını etiket bazında toplar (parçalı çalışma için)."""
+    merged = {}
+    for snapshot in snapshots:
+        if not snapshot:
+            continue
+        for name, samples in snapshot.items():
+            if not isinstance(samples, list) or name == 'buckets':
+                continue
+            by_labels = merged.setdefault(name, {})
+            for sample in samples:
+                key = tuple(sorted(sample['labels'].items()))
+                entry = by_labels.get(key)
+                if entry is None:
+                    by_labels[key] = {**sample, 'counts': list(sample['counts'])} if 'counts' in sample else dict(sample)
+                elif 'counts' in sample:
+                    entry['counts'] = [a + b for a, b in zip(entry['counts'], sample['counts'])]
+                    entry['sum'] += sample['sum']
+                    entry['count'] += sample['count']
+                else:
+                    entry['value'] += sample['value']
+    result = {name: list(by_labels.values()) for name, by_labels in merged.items()}
+    result['buckets'] = list(DEFAULT_BUCKETS)
+    result['taken_at'] = time.time()
+    return result
+
+
+def expose_snapshot(snapshot, registry=REGISTRY):
+    """Anlık görüntüyü (``Registry.snapshot`` ya da ``merge_snapshots`` çıktısı) Prometheus metin biçimine çevirir.
+
+    Tek süreçli ve parçalı çalışmanın ``/metrics`` çıktısı bu tek yoldan
+    üretilir; tür, açıklama ve kova sınırları ``registry``'den alınır.
+    """
+    lines = []
+    for metric in registry.metrics:
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for sample in snapshot.get(metric.name, []):
+            labels = tuple(sample['labels'].get(name, "") for name in metric.label_names)
+            if metric.kind == "counter":
+                lines.append(f"{metric.name}{_format_labels(metric.label_names, labels)} {sample['value']}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric.buckets + (float("inf"),), sample['counts']):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{metric.name}_bucket{_format_labels(metric.label_names, labels, [('le', le)])} {cumulative}")
+            lines.append(f"{metric.name}_sum{_format_labels(metric.label_names, labels)} {sample['sum']}")
+            lines.append(f"{metric.name}_count{_format_labels(metric.label_names, labels)} {sample['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def histogram_quantile(quantile, counts, buckets=DEFAULT_BUCKETS):
+    """Kova sayılarından yaklaşık yüzdelik (sn); Prometheus'taki gibi kova içinde doğrusal ara değer."""
+    total = sum(counts)
+    if not total:
+        return None
+    rank = quantile * total
+    cumulative = 0
+    lower = 0.0
+    for bound, count in zip(list(buckets) + [buckets[-1]], counts):
+        if cumulative + count >= rank and count:
+            return lower + (bound - lower) * (rank - cumulative) / count
+        cumulative += count
+        lower = bound
+    return buckets[-1]
+
+
+def serve(port=DEFAULT_PORT, host="127.0.0.1", registry=REGISTRY):
+    """``/metrics`` adresini arka planda yayınlar; sunucu nesnesini döndürür."""
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            data = registry.expose().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="olcumler", daemon=True).start()
+    logging.info(f"Ölçümler http://{host}:{server.server_address[1]}/metrics adresinde yayınlanıyor.")
+    return server
@@ -0,0 +1,215 @@
+import re
+import math
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+
+# Geçmiş soru-cevap örnekleri için bellek içi arama indeksi.
+#
+# Ürün isimleri için normalize edilmiş kelime -> satır ters indeksi, soru
+# metinleri için kelimeler ve 5 harflik kökleri üzerinde BM25 ağırlıkları
+# yükleme sırasında bir kez hesaplanır; sonradan gönderilen cevaplar
+# ``extend`` ile yeniden kurulum olmadan eklenir. Sorgu başına yalnızca
+# sorgudaki terimlerin satır listeleri dolaşılır; tüm tablo taranmaz.
+
+PRODUCT_COLUMN = 'Ürün İsmi'
+QUESTION_COLUMN = 'Soru Detayı'
+ANSWER_COLUMN = 'Onaylanan Cevap'
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Türkçe eklemeli bir dil olduğundan kelimenin ilk 5 harfi basit ve etkili bir köktür.
+STEM_LENGTH = 5
+PRODUCT_CACHE_SIZE = 4096
+# İndeks yapısı değiştiğinde diskteki eski önbellekler kullanılmasın diye artırılır.
+INDEX_VERSION = 3
+
+_TURKISH_LOWER = str.maketrans({'İ': 'i', 'I': 'ı'})
+_ASCII_FOLD = str.maketrans('ığüşöçâîû', 'igusocaiu')
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def turkish_casefold(text):
+    """Türkçe büyük/küçük harf kurallarına göre küçültür (İ -> i, I -> ı)."""
+    return str(text).translate(_TURKISH_LOWER).lower()
+
+
+def normalize(text):
+    """Karşılaştırma için küçültür ve Türkçe karakterleri ASCII karşılıklarına indirger.
+
+    Müşteriler sıklıkla Türkçe karakter kullanmadan yazdığı için "şeffaf" ve
+    "seffaf" aynı terime düşer.
+    """
+    if text is None or (isinstance(text, float) and math.isnan(text)):
+        return ""
+    return turkish_casefold(text).translate(_ASCII_FOLD)
+
+
+def words(text):
+    return _WORD_RE.findall(normalize(text))
+
+
+def question_terms(text):
+    """Kelimeler ve kökleri ("kapaklı", "kapaklar" -> "~kapak")."""
+    terms = []
+    for word in words(text):
+        terms.append(word)
+        if len(word) > STEM_LENGTH:
+            terms.append(f"~{word[:STEM_LENGTH]}")
+    return terms
+
+
+class _IndexState:
+    """İndeksin bir anlık görüntüsü; yayımlandıktan sonra değiştirilmez (ürün önbelleği hariç)."""
+
+    def __init__(self, questions, answers, product_postings, term_postings, total_length):
+        self.questions = questions
+        self.answers = answers
+        self.product_postings = product_postings
+        self.term_postings = term_postings
+        self.total_length = total_length
+        self.product_cache = {}
+
+    def idf(self, term_rows):
+        return math.log(1 + (len(self.questions) - len(term_rows) + 0.5) / (len(term_rows) + 0.5))
+
+
+class ExampleIndex:
+    def __init__(self, df: pd.DataFrame):
+        df = df.reset_index(drop=True)
+        self._state = _IndexState((), (), {}, {}, 0.0)
+        self.extend(df[[PRODUCT_COLUMN, QUESTION_COLUMN, ANSWER_COLUMN]].itertuples(index=False, name=None))
+
+    def __len__(self):
+        return len(self._state.questions)
+
+    def extend(self, rows):
+        """``(ürün, soru, cevap)`` satırlarını indeksi yeniden kurmadan ekler.
+
+        Terim ağırlığının belge kısmı eklenirken o anki ortalama uzunlukla,
+        IDF kısmı sorgu anında güncel belge sayısıyla hesaplanır. Yeni satırlar
+        ayrı bir anlık görüntüde kurulup tek atamayla yayımlanır; aynı anda
+        arama yapan iş parçacıkları eski ya da yeni görüntüyü bütün olarak görür.
+        Eşzamanlı ``extend`` çağrıları çağıran tarafından sıralanmalıdır.
+        """
+        rows = list(rows)
+        if not rows:
+            return
+        old = self._state
+        start = len(old.questions)
+        doc_terms = [Counter(question_terms(question)) for _, question, _ in rows]
+        doc_lengths = np.asarray([sum(c.values()) for c in doc_terms], dtype=np.float32)
+        total_length = old.total_length + float(doc_lengths.sum())
+        avg_length = total_length / (start + len(rows)) or 1.0
+
+        product_rows = defaultdict(list)
+        term_rows = defaultdict(list)
+        term_freqs = defaultdict(list)
+        for offset, ((product_name, _, _), counts) in enumerate(zip(rows, doc_terms)):
+            for token in set(words(product_name)):
+                product_rows[token].append(start + offset)
+            for term, tf in counts.items():
+                term_rows[term].append(offset)
+                term_freqs[term].append(tf)
+
+        # Satır numaraları arttığı için birleştirilen listeler sıralı kalır; eski diziler değiştirilmez.
+        product_postings = dict(old.product_postings)
+        for token, new_rows in product_rows.items():
+            new_rows = np.asarray(new_rows, dtype=np.int32)
+            previous = product_postings.get(token)
+            product_postings[token] = new_rows if previous is None else np.concatenate([previous, new_rows])
+        term_postings = dict(old.term_postings)
+        for term, offsets in term_rows.items():
+            offsets = np.asarray(offsets, dtype=np.int32)
+            tf = np.asarray(term_freqs[term], dtype=np.float32)
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths[offsets] / avg_length)
+            weights = (tf * (BM25_K1 + 1) / (tf + norm)).astype(np.float32)
+            previous = term_postings.get(term)
+            term_postings[term] = (offsets + start, weights) if previous is None else (
+                np.concatenate([previous[0], offsets + start]), np.concatenate([previous[1], weights]))
+
+        self._state = _IndexState(
+            old.questions + tuple(question for _, question, _ in rows),
+            old.answers + tuple(answer for _, _, answer in rows),
+            product_postings, term_postings, total_length,
+        )
+
+    def product_rows(self, product_name, state=None):
+        """Ürün isminin tüm kelimelerini içeren satırlar (sıralı satır numaraları)."""
+        state = state or self._state
+        tokens = frozenset(words(product_name))
+        result = state.product_cache.get(tokens)
+        if result is not None:
+            return result
+
+        postings = [state.product_postings.get(token) for token in tokens]
+        if not tokens:
+            result = np.arange(len(state.questions), dtype=np.int32)
+        elif any(p is None for p in postings):
+            result = np.empty(0, dtype=np.int32)
+        else:
+            postings.sort(key=len)
+            result = postings[0]
+            for other in postings[1:]:
+                result = np.intersect1d(result, other, assume_unique=True)
+                if not len(result):
+                    break
+
+        cache = state.product_cache
+        if len(cache) >= PRODUCT_CACHE_SIZE:
+            cache.pop(next(iter(cache), None), None)
+        cache[tokens] = result
+        return result
+
+    def score(self, question, candidates, state=None):
+        state = state or self._state
+        query = Counter(question_terms(question))
+        # Aday küme büyükse tüm tablo üzerinde yoğun dizi ile toplamak daha ucuzdur.
+        if len(candidates) * 8 > len(state.questions):
+            scores = np.zeros(len(state.questions), dtype=np.float32)
+            for term, weight in query.items():
+                posting = state.term_postings.get(term)
+                if posting is not None:
+                    scores[posting[0]] += weight * state.idf(posting[0]) * posting[1]
+            return scores[candidates]
+
+        scores = np.zeros(len(candidates), dtype=np.float32)
+        for term, weight in query.items():
+            posting = state.term_postings.get(term)
+            if posting is None:
+                continue
+            term_rows, term_weights = posting
+            # Her iki dizi de sıralı olduğundan kesişim ikili arama ile bulunur.
+            positions = np.searchsorted(term_rows, candidates)
+            positions[positions == len(term_rows)] = 0
+            hit = term_rows[positions] == candidates
+            scores[hit] += weight * state.idf(term_rows) * term_weights[positions[hit]]
+        return scores
+
+    def search(self, product_name, question, k=3):
+        """Ürüne ait örnekler içinden soruya en benzer ``k`` tanesini döndürür.
+
+        ``([(soru, cevap), ...], ürüne ait toplam örnek sayısı)`` ikilisi döner.
+        """
+        # Arama boyunca aynı anlık görüntü kullanılır; eşzamanlı ``extend`` onu değiştirmez.
+        state = self._state
+        candidates = self.product_rows(product_name, state)
+        if not len(candidates):
+            return [], 0
+        scores = self.score(question, candidates, state)
+        if not scores.any():
+            top = np.arange(min(k, len(candidates)))
+        elif len(candidates) > k:
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(len(candidates))
+        # Eşit skorlarda dosyadaki sıra korunur.
+        top = top[np.lexsort((candidates[top], -scores[top]))]
+        return [(state.questions[i], state.answers[i]) for i in candidates[top]], len(candidates)
+
+
+def build_example_index(past_df):
+    if past_df is None:
+        return None
+    return ExampleIndex(past_df)
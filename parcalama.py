@@ -0,0 +1,193 @@
+import gc
+import time
+import bisect
+import logging
+import multiprocessing
+
+import olcumler
+from anlamsal_indeks import stable_hash
+from durum_deposu import StateStore, DEFAULT_TTL_DAYS
+from servisler import load_config, read_example_index, read_template_engine, read_semantic_index, get_answer_log
+
+# Mağazaların birden fazla işleyici sürecine paylaştırılması.
+#
+# Her mağaza adı tutarlı özet halkasında (consistent hashing) bir parçaya
+# düşer; parça sayısı değiştiğinde yalnızca yaklaşık 1/n mağaza yer değiştirir.
+# Her parça kendi mağazalarını ayrı bir süreçte yoklar ve işler, böylece bir
+# mağazanın yavaş çağrıları ya da JSON/DataFrame işleri diğerlerini aynı GIL
+# üzerinde bekletmez. Soru, talep ve bildirim kilitleri durum deposunda
+# tutulduğu için yeniden dağıtım sırasında iki süreç aynı işi yapmaz.
+#
+# Koordinatör örnek indeksini, şablon motorunu ve anlamsal indeksi süreçleri
+# başlatmadan önce bir kez yükler; "fork" destekleyen sistemlerde alt süreçler
+# bu belleği yazınca-kopyala ile paylaşır (anlamsal indeks vektörleri zaten
+# bellek eşlemelidir). Telegram dinleme, cevap günlüğü arşivleme, anlamsal
+# indeks eşitleme ve eski kayıtların temizlenmesi yalnızca koordinatörde
+# yapılır. Koordinatör parçaların kalp atışı, ölçüm ve yoklama planlarını
+# birleştirip panelin okuduğu anahtarlara yazar.
+
+VIRTUAL_NODES = 64
+AGGREGATE_INTERVAL = 5
+RESTART_DELAY_SECONDS = 10
+
+
+class HashRing:
+    def __init__(self, shard_names, virtual_nodes=VIRTUAL_NODES):
+        self._ring = sorted(
+            (stable_hash(f"{name}#{i}"), name) for name in shard_names for i in range(virtual_nodes)
+        )
+        self._keys = [key for key, _ in self._ring]
+
+    def shard_for(self, store_name):
+        i = bisect.bisect(self._keys, stable_hash(store_name)) % len(self._keys)
+        return self._ring[i][1]
+
+
+def shard_names(shard_count):
+    return [f"parca-{i + 1}" for i in range(shard_count)]
+
+
+def assign_stores(stores, shard_count):
+    """Mağazaları ada göre parçalara dağıtır: ``{parça adı: [mağaza, ...]}`` (boş parçalar dahil)."""
+    names = shard_names(shard_count)
+    ring = HashRing(names)
+    assignment = {name: [] for name in names}
+    for store in stores:
+        assignment[ring.shard_for(store['name'])].append(store)
+    return assignment
+
+
+def preload_shared_data(sync=False):
+    """Parçaların salt okunur kullandığı örnek ve şablon verisini bu süreçte yükler.
+
+    Önbellekte olan veri tekrar okunmaz; çatallanan alt süreçte çağrı bu yüzden maliyetsizdir.
+    """
+    read_template_engine()
+    read_example_index()
+    if load_config().semantic_examples:
+        read_semantic_index(sync=sync)
+
+
+class ShardCoordinator:
+    def __init__(self, stores, state_store: StateStore, shard_count, target, target_kwargs=None,
+                 maintenance_interval=60, ttl_days=DEFAULT_TTL_DAYS):
+        # ``target(shard_name, stores, shard_count, **target_kwargs)`` parça sürecinde çalışır.
+        self.db = state_store
+        self.assignment = {name: shard for name, shard in assign_stores(stores, shard_count).items() if shard}
+        self.shard_count = shard_count
+        self.target = target
+        self.target_kwargs = target_kwargs or {}
+        self.maintenance_interval = maintenance_interval
+        self.ttl_days = ttl_days
+        self.processes = {}
+        self.restarts = {name: 0 for name in self.assignment}
+        self.last_maintenance = 0.0
+        self._merged = {}
+        # Yeniden başlatmalar iş parçacıkları çalışırken yapıldığından "spawn" kullanılır.
+        self._restart_context = multiprocessing.get_context("spawn")
+
+    def add_event(self, store_name, message, level="info"):
+        getattr(logging, level)(f"[{store_name}] {message}" if store_name else message)
+        self.db.add_event(store_name, message, level)
+
+    def start(self):
+        """Ortak veriyi yükler ve parça süreçlerini başlatır; iş parçacığı açılmadan önce çağrılmalıdır."""
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        preload_shared_data(sync=True)
+        # Yüklenen nesneler çöp toplayıcıdan çıkarılır; alt süreçlerde sayfalar gereksiz yere kopyalanmaz.
+        gc.freeze()
+        for name in self.assignment:
+            self._start_shard(name, context)
+        logging.info(
+            f"{len(self.processes)} parça başlatıldı ({context.get_start_method()}): "
+            + ", ".join(f"{name}={len(stores)} mağaza" for name, stores in self.assignment.items())
+        )
+
+    def _start_shard(self, name, context):
+        process = context.Process(
+            target=self.target, name=name, daemon=True,
+            args=(name, self.assignment[name], self.shard_count), kwargs=self.target_kwargs,
+        )
+        process.start()
+        self.processes[name] = (process, time.time())
+
+    def supervise(self):
+        now = time.time()
+        for name, (process, started) in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            if now - started < RESTART_DELAY_SECONDS:
+                continue
+            self.restarts[name] += 1
+            self.add_event(None, f"{name} süreci durdu (çıkış kodu {process.exitcode}), yeniden başlatılıyor.", level="error")
+            self._start_shard(name, self._restart_context)
+
+    def maintain(self, now):
+        """Parçaların yapmadığı ortak bakım: günlük arşivleme, anlamsal indeks eşitleme, temizlik."""
+        if now - self.last_maintenance < self.maintenance_interval:
+            return
+        self.last_maintenance = now
+        try:
+            get_answer_log().compact()
+        except (OSError, ValueError) as e:
+            logging.error(f"Cevap günlüğü arşivlenemedi: {e}")
+        if load_config().semantic_examples:
+            try:
+                read_semantic_index(sync=True)
+            except (OSError, ValueError) as e:
+                logging.error(f"Anlamsal örnek indeksi güncellenemedi: {e}")
+        self.db.prune(self.ttl_days)
+
+    def aggregate(self):
+        """Parçaların kalp atışı, ölçüm ve yoklama planlarını panelin okuduğu anahtarlarda birleştirir."""
+        heartbeats, snapshots, schedules, shards = [], [olcumler.REGISTRY.snapshot()], {}, {}
+        poll_interval = None
+        for name, stores in self.assignment.items():
+            process, _ = self.processes[name]
+            heartbeat = self.db.get_value(f"heartbeat:{name}")
+            if heartbeat:
+                heartbeats.append(heartbeat)
+            snapshots.append(self.db.get_value(f"olcumler:{name}"))
+            schedules.update(self.db.get_value(f"yoklama:{name}") or {})
+            poll_interval = poll_interval or self.db.get_value(f"poll_interval:{name}")
+            shards[name] = {
+                'pid': process.pid,
+                'alive': process.is_alive(),
+                'stores': [store['name'] for store in stores],
+                'heartbeat': heartbeat,
+                'restarts': self.restarts[name],
+            }
+        self._merged = olcumler.merge_snapshots(snapshots)
+        # En geride kalan parçanın kalp atışı yazılır; tek bir parça takılsa da panel uyarır.
+        if len(heartbeats) == len(self.assignment):
+            self.db.set_value('heartbeat', min(heartbeats))
+        if poll_interval:
+            self.db.set_value('poll_interval', poll_interval)
+        self.db.set_value('olcumler', self._merged)
+        self.db.set_value('yoklama', schedules)
+        self.db.set_value('parcalar', shards)
+
+    def expose(self):
+        """``olcumler.serve`` için: tüm süreçlerin birleştirilmiş ölçümleri."""
+        return olcumler.expose_snapshot(self._merged or olcumler.REGISTRY.snapshot())
+
+    def run_forever(self):
+        self.db.set_value('started_at', time.time())
+        while True:
+            now = time.time()
+            self.supervise()
+            self.maintain(now)
+            self.aggregate()
+            time.sleep(AGGREGATE_INTERVAL)
+
+    def stop(self, timeout=30):
+        for process, _ in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.time() + timeout
+        for process, _ in self.processes.values():
+            process.join(max(deadline - time.time(), 0))
+            if process.is_alive():
+                process.kill()
+        self.db.set_value('parcalar', {})
@@ -0,0 +1,177 @@
+from collections import deque
+
+from ornek_indeksi import words
+
+# Cevap şablonları için derlenmiş arama yapısı.
+#
+# Anahtar kelimeler ornek_indeksi.normalize ile (Türkçe küçük harf + ASCII)
+# normalize edilip tek bir karakter trie'sine eklenir. Aynı trie üzerinde:
+#   * ``resolve``: Telegram'daki ``#keyword`` yanıtını tam, önek ve bulanık
+#     (Levenshtein) eşleşmeyle çözer,
+#   * ``find``: Aho-Corasick hata bağlantılarıyla soru metnini tek geçişte
+#     tarayıp geçen anahtar kelimeleri bulur.
+
+# Kısa anahtar kelimeler ("dik") başka kelimelerin içinde ("dikkat") yanlış
+# eşleşmesin diye yalnızca tam kelime olarak aranır; uzunlar ek alabilir
+# ("ölçü" -> "ölçüleri").
+MIN_SUFFIX_MATCH_LENGTH = 4
+
+
+def normalize_keyword(text):
+    return " ".join(words(text))
+
+
+def _max_distance(query):
+    return 1 if len(query) <= 4 else 2
+
+
+class _Node:
+    __slots__ = ('children', 'keyword', 'fail', 'outputs')
+
+    def __init__(self):
+        self.children = {}
+        self.keyword = None
+        self.fail = None
+        self.outputs = []
+
+
+class TemplateEngine:
+    def __init__(self, templates, listing=""):
+        self.templates = dict(templates)
+        self.listing = listing
+        self._build()
+
+    def __getstate__(self):
+        # Trie düğümleri iç içe olduğundan pickle birkaç düzine anahtarda
+        # özyineleme sınırını aşar; yalnızca kaynak veri saklanır.
+        return {'templates': self.templates, 'listing': self.listing}
+
+    def __setstate__(self, state):
+        self.templates = state['templates']
+        self.listing = state['listing']
+        self._build()
+
+    def _build(self):
+        self.root = _Node()
+        for keyword in self.templates:
+            key = normalize_keyword(keyword)
+            if not key:
+                continue
+            node = self.root
+            for char in key:
+                node = node.children.setdefault(char, _Node())
+            # Normalize hâli aynı olan iki satırdan ilki geçerlidir.
+            if node.keyword is None:
+                node.keyword = keyword
+                node.outputs.append((keyword, len(key)))
+        self._link()
+
+    def __len__(self):
+        return len(self.templates)
+
+    def __bool__(self):
+        return bool(self.templates)
+
+    def _link(self):
+        self.root.fail = self.root
+        queue = deque()
+        for child in self.root.children.values():
+            child.fail = self.root
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for char, child in node.children.items():
+                fail = node.fail
+                while fail is not self.root and char not in fail.children:
+                    fail = fail.fail
+                target = fail.children.get(char)
+                child.fail = target if target is not None and target is not child else self.root
+                child.outputs = child.outputs + child.fail.outputs
+                queue.append(child)
+
+    def _walk(self, key):
+        """``key``'in düğümünü (yoksa ``None``) ve yol üzerindeki en uzun anahtarı döndürür."""
+        node, longest = self.root, None
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return None, longest
+            if node.keyword is not None:
+                longest = node.keyword
+        return node, longest
+
+    def _collect(self, node):
+        found, stack = [], [node]
+        while stack:
+            current = stack.pop()
+            if current.keyword is not None:
+                found.append(current.keyword)
+            stack.extend(current.children.values())
+        return found
+
+    def _fuzzy(self, query):
+        # Trie üzerinde Levenshtein: ortak önekler için DP satırı bir kez hesaplanır.
+        limit = _max_distance(query)
+        results = []
+        first_row = list(range(len(query) + 1))
+        stack = [(child, char, first_row) for char, child in self.root.children.items()]
+        while stack:
+            node, char, previous = stack.pop()
+            row = [previous[0] + 1]
+            for i in range(1, len(query) + 1):
+                cost = 0 if query[i - 1] == char else 1
+                row.append(min(row[i - 1] + 1, previous[i] + 1, previous[i - 1] + cost))
+            if node.keyword is not None and row[-1] <= limit:
+                results.append((row[-1], node.keyword))
+            if min(row) <= limit:
+                stack.extend((child, next_char, row) for next_char, child in node.children.items())
+        if not results:
+            return []
+        best = min(distance for distance, _ in results)
+        return [keyword for distance, keyword in results if distance == best]
+
+    def resolve(self, keyword):
+        """``#keyword`` yanıtına uyan şablon anahtarlarını döndürür.
+
+        Önce tam eşleşme, yoksa önek, sonra ekli yazım ("#teşekkürler" ->
+        "teşekkür"), en son en yakın bulanık eşleşmeler denenir. Tek elemanlı
+        liste kesin sonuçtur; birden fazla eleman belirsizlik, boş liste
+        eşleşme olmadığı anlamına gelir.
+        """
+        query = normalize_keyword(keyword)
+        if not query:
+            return []
+        node, longest = self._walk(query)
+        if node is not None:
+            if node.keyword is not None:
+                return [node.keyword]
+            return sorted(self._collect(node))
+        if longest is not None and len(normalize_keyword(longest)) >= MIN_SUFFIX_MATCH_LENGTH:
+            return [longest]
+        return sorted(self._fuzzy(query))
+
+    def find(self, text):
+        """Metinde geçen anahtar kelimeleri ``(anahtar, başlangıç)`` olarak tek geçişte bulur."""
+        haystack = normalize_keyword(text)
+        matches = []
+        node = self.root
+        for position, char in enumerate(haystack):
+            while node is not self.root and char not in node.children:
+                node = node.fail
+            node = node.children.get(char, self.root)
+            for keyword, length in node.outputs:
+                start = position - length + 1
+                if start > 0 and haystack[start - 1] != " ":
+                    continue
+                end = position + 1
+                if length < MIN_SUFFIX_MATCH_LENGTH and end < len(haystack) and haystack[end] != " ":
+                    continue
+                matches.append((keyword, start))
+        return matches
+
+    def best_match(self, text):
+        """Soruya en uygun şablon anahtarı: en uzun (en belirgin) eşleşme, eşitlikte ilk geçen."""
+        matches = self.find(text)
+        if not matches:
+            return None
+        return min(matches, key=lambda item: (-len(normalize_keyword(item[0])), item[1]))[0]
@@ -0,0 +1,687 @@
+import os
+import re
+import json
+import time
+import base64
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, fields
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+
+import pandas as pd
+import requests
+import openai
+
+import http_havuzu
+import olcumler
+from ornek_indeksi import build_example_index, INDEX_VERSION, PRODUCT_COLUMN, QUESTION_COLUMN, ANSWER_COLUMN
+from anlamsal_indeks import SemanticIndex
+from cevap_gunlugu import AnswerLog, LogCursor, LOG_DIR as ANSWER_LOG_DIR
+from sablon_motoru import TemplateEngine
+from veri_onbellegi import load_frame, load_object, source_key, CACHE_DIR
+from llm_onbellegi import AnswerCache, make_key
+from istem_butcesi import build_messages, messages_tokens, estimate_cost
+from uretim_zamanlayici import RateLimiter, call_with_backoff
+from telegram_kuyrugu import OutboundQueue, GLOBAL_PER_SECOND, PRIVATE_CHAT_PER_MINUTE, GROUP_CHAT_PER_MINUTE
+
+# Bu modül Streamlit'e bağımlı değildir; hem panel (kontrol_paneli.py) hem de
+# arka plan işleyicisi (calisan.py) aynı API fonksiyonlarını buradan kullanır.
+
+STATE_FILE = os.environ.get("PANEL_DURUM_DOSYASI", "calisan_durumu.db")
+CONFIG_FILE = os.environ.get("PANEL_AYAR_DOSYASI", "panel_ayarlari.json")
+# Yük testlerinde benchmarks/sahte_sunucu.py'ye yönlendirmek için değiştirilebilir.
+# OpenAI istemcisi aynı amaçla OPENAI_BASE_URL ortam değişkenini kendisi okur.
+TRENDYOL_API_URL = os.environ.get("PANEL_TRENDYOL_API", "https://apigw.trendyol.com")
+TELEGRAM_API_URL = os.environ.get("PANEL_TELEGRAM_API", "https://api.telegram.org")
+
+TELEGRAM_BOT_TOKEN = None
+AUTHORIZED_CHAT_IDS = []
+STORES = []
+
+# Özet bildirimde mesaj başına en fazla soru sayısı (Telegram mesajları 4096 karakterle sınırlı).
+DIGEST_MAX_ITEMS = 10
+# Mesaj Markdown işlenmeden (düz metin) gönderildiyse sıra numarası ``*2.*`` biçiminde kalır.
+DIGEST_ITEM_PATTERN = re.compile(r"^\*?(\d+)\.\*? .*\(Soru ID: (\d+)\)$", re.M)
+STORE_LINE_PATTERN = re.compile(r"🏪 Mağaza: (.+?)\n")
+MARKDOWN_SPECIAL = re.compile(r"([_*`\[])")
+
+# Şablon motorunun yapısı değiştiğinde diskteki eski önbellekler kullanılmasın diye artırılır.
+TEMPLATE_ENGINE_VERSION = 2
+
+SEMANTIC_INDEX_DIR = os.environ.get("PANEL_ANLAMSAL_INDEKS", os.path.join(CACHE_DIR, "anlamsal"))
+
+# Parçalı çalışmada (bkz. ``parcalama``) her süreç OpenAI ve Telegram hız sınırlarının bu payını kullanır.
+_rate_limit_share = 1.0
+_telegram_queue = None
+_telegram_queue_lock = threading.Lock()
+_semantic_index = None
+_semantic_index_lock = threading.Lock()
+_answer_log = None
+# (indeks, günlük imleci): BM25 indeksinin cevap günlüğünde nereye kadar okuduğu.
+_example_log = None
+_example_log_lock = threading.Lock()
+
+EXAMPLE_COLUMNS = [PRODUCT_COLUMN, QUESTION_COLUMN, ANSWER_COLUMN]
+
+
+# --- Konfigürasyon ---
+@dataclass
+class Config:
+    min_examples: int = 0
+    delay_minutes: int = 5
+    # Soru metninde bir şablon anahtar kelimesi geçiyorsa otomatik cevapta OpenAI yerine şablon kullanılır.
+    template_auto_apply: bool = False
+    openai_model: str = "gpt-4o-mini"
+    openai_temperature: float = 0.4
+    openai_max_tokens: int = 150
+    # İstemin (sistem mesajı, soru ve örnekler) en fazla girdi token sayısı; örnekler buna sığacak kadar eklenir.
+    prompt_token_budget: int = 800
+    # Tek bir örnek cevabının kırpılacağı token sayısı ve isteme eklenecek en fazla örnek.
+    example_max_tokens: int = 120
+    max_examples: int = 3
+    # Maliyet tahmini için 1 milyon token başına USD fiyatları (varsayılanlar gpt-4o-mini).
+    openai_input_price: float = 0.15
+    openai_cached_input_price: float = 0.075
+    openai_output_price: float = 0.60
+    generation_parallelism: int = 4
+    openai_rpm_limit: int = 500
+    openai_tpm_limit: int = 200000
+    # Bir döngüde mağaza başına bu sayıda veya daha fazla yeni soru gelirse tek bir özet mesaj gönderilir (0 = kapalı).
+    telegram_digest_threshold: int = 3
+    # Örnekler ürün adı eşleşmesi (BM25) yerine anlamsal vektör benzerliğiyle aranır.
+    semantic_examples: bool = False
+
+    @classmethod
+    def from_dict(cls, data):
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (data or {}).items() if k in known})
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def configure(secrets):
+    """Panel ve işleyicinin ortak gizli bilgilerini (secrets) modüle yükler.
+
+    Eksik zorunlu anahtarlarda ``KeyError`` fırlatır.
+    """
+    global TELEGRAM_BOT_TOKEN, AUTHORIZED_CHAT_IDS, STORES
+    openai.api_key = secrets["OPENAI_API_KEY"]
+    TELEGRAM_BOT_TOKEN = secrets.get("TELEGRAM_BOT_TOKEN")
+    if "AUTHORIZED_CHAT_IDS" in secrets:
+        AUTHORIZED_CHAT_IDS = [str(c) for c in secrets.get("AUTHORIZED_CHAT_IDS", [])]
+    else:
+        chat_id = secrets.get("TELEGRAM_CHAT_ID")
+        AUTHORIZED_CHAT_IDS = [str(chat_id)] if chat_id else []
+    STORES = list(secrets.get("stores", []))
+
+
+# --- Kalıcı Dosyalar ---
+
+def read_json_file(file_path, default=None):
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except (OSError, ValueError) as e:
+        logging.error(f"{file_path} okunamadı: {e}")
+        return default
+
+
+def write_json_file(file_path, data):
+    # Okuyucular yarım yazılmış bir dosya görmesin diye önce geçici dosyaya yazılır.
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, file_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_config(file_path=CONFIG_FILE):
+    return Config.from_dict(read_json_file(file_path, {}))
+
+
+def save_config(config: Config, file_path=CONFIG_FILE):
+    write_json_file(file_path, config.to_dict())
+
+
+# --- Ortak Fonksiyonlar ---
+
+def get_headers(api_key, api_secret):
+    credentials = f"{api_key}:{api_secret}"
+    encoded_credentials = base64.b64encode(credentials.encode()).decode()
+    return {"Authorization": f"Basic {encoded_credentials}", "Content-Type": "application/json", "User-Agent": "MultiStorePanel/1.0"}
+
+def store_session(store):
+    # Kimlik bilgisi başlıkları oturum başına bir kez hesaplanır.
+    return http_havuzu.get_session(
+        f"trendyol:{store['name']}",
+        lambda: get_headers(store['api_key'], store['api_secret']),
+    )
+
+def _post_telegram_message(chat_id, text, parse_mode):
+    url = f"{TELEGRAM_API_URL}/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+    payload = {'chat_id': chat_id, 'text': text}
+    if parse_mode:
+        payload['parse_mode'] = parse_mode
+    with olcumler.track("telegram_send") as call:
+        try:
+            response = http_havuzu.request(http_havuzu.get_session("telegram"), "POST", url, json=payload, timeout=10)
+        except requests.exceptions.RequestException:
+            call.error("connection")
+            raise
+        if response.status_code != 200:
+            call.error(response.status_code)
+        return response
+
+def set_rate_limit_share(share):
+    """Hesap ve bot genelindeki hız sınırlarının bu sürece düşen payını (0-1] ayarlar."""
+    global _rate_limit_share
+    _rate_limit_share = min(max(float(share), 0.01), 1.0)
+
+def get_telegram_queue():
+    global _telegram_queue
+    with _telegram_queue_lock:
+        if _telegram_queue is None:
+            _telegram_queue = OutboundQueue(
+                _post_telegram_message,
+                per_second=max(1, int(GLOBAL_PER_SECOND * _rate_limit_share)),
+                private_per_minute=max(1, int(PRIVATE_CHAT_PER_MINUTE * _rate_limit_share)),
+                group_per_minute=max(1, int(GROUP_CHAT_PER_MINUTE * _rate_limit_share)),
+            )
+        return _telegram_queue
+
+def send_telegram_message(message, chat_id=None):
+    """Mesajı giden kuyruğa ekler; gönderim arka planda hız sınırlarına uyularak yapılır."""
+    if not TELEGRAM_BOT_TOKEN: return
+
+    recipients = []
+    if chat_id:
+        recipients.append(chat_id)
+    else:
+        recipients.extend(AUTHORIZED_CHAT_IDS)
+
+    queue = get_telegram_queue()
+    for recipient_id in set(recipients):
+        queue.put(recipient_id, message)
+
+def read_templates(file_path="cevap_sablonlari.xlsx"):
+    try:
+        df = load_frame(file_path, name="sablonlar")
+    except FileNotFoundError:
+        return {}
+    df = df.dropna(subset=['keyword', 'sablon_metni'])
+    return {str(keyword).strip(): text for keyword, text in zip(df.keyword, df.sablon_metni) if str(keyword).strip()}
+
+def read_template_engine(file_path="cevap_sablonlari.xlsx"):
+    """Şablonları ve hazır ``/sablonlar`` listesini içeren ``TemplateEngine``; kaynak değişmedikçe yeniden kurulmaz."""
+    def build():
+        templates = read_templates(file_path)
+        return TemplateEngine(templates, listing=format_template_list(templates))
+    try:
+        return load_object(file_path, build, name=f"sablon-motoru-v{TEMPLATE_ENGINE_VERSION}")
+    except FileNotFoundError:
+        return TemplateEngine({}, listing=format_template_list({}))
+
+def read_example_index(file_path="soru_cevap_ornekleri.xlsx"):
+    """BM25 örnek indeksi; cevap günlüğüne eklenen yeni cevaplar her çağrıda indekse eklenir.
+
+    Örnek dosyası yoksa yalnızca günlükteki cevaplardan kurulur; ikisi de boşsa ``None``.
+    """
+    global _example_log
+    try:
+        index = load_object(file_path, lambda: build_example_index(read_past_data(file_path)), name=f"indeks-v{INDEX_VERSION}")
+    except FileNotFoundError:
+        index = None
+    with _example_log_lock:
+        if _example_log is None or (index is not None and _example_log[0] is not index):
+            # Örnek dosyası değişince yeni indeks günlüğü baştan okur.
+            base = index if index is not None else build_example_index(pd.DataFrame(columns=EXAMPLE_COLUMNS))
+            _example_log = (base, LogCursor())
+        index, cursor = _example_log
+        index.extend(_logged_examples(get_answer_log().read_new(cursor)))
+    return index if len(index) else None
+
+def read_semantic_index(file_path="soru_cevap_ornekleri.xlsx", sync=False):
+    """Diskteki anlamsal örnek indeksini açar; ``sync`` ise örnek dosyasındaki ve cevap günlüğündeki yeni satırları ekler.
+
+    İndekse yalnızca arka plan işleyicisi yazar (``sync=True``); panel salt
+    okur ve her çağrıda işleyicinin eklediği satırları görür.
+    """
+    global _semantic_index
+    with _semantic_index_lock:
+        if _semantic_index is None:
+            _semantic_index = SemanticIndex(SEMANTIC_INDEX_DIR)
+    _semantic_index.refresh()
+    if sync:
+        key = source_key(file_path)
+        past_df = read_past_data(file_path) if key is not None else None
+        if past_df is not None:
+            _semantic_index.sync_frame(past_df, key)
+        previous = _semantic_index.meta.get('log_cursor')
+        cursor = LogCursor.from_dict(previous)
+        rows = _logged_examples(get_answer_log().read_new(cursor))
+        if rows or cursor.to_dict() != previous:
+            _semantic_index.add(rows, source='cevap', meta={'log_cursor': cursor.to_dict()})
+    return _semantic_index
+
+def example_index_for(config: Config, sync=False):
+    """Ayara göre anlamsal ya da BM25 örnek indeksi; anlamsal indeks henüz boşsa BM25'e düşülür."""
+    if config.semantic_examples:
+        index = read_semantic_index(sync=sync)
+        if len(index):
+            return index
+    return read_example_index()
+
+def get_answer_log():
+    global _answer_log
+    if _answer_log is None:
+        _answer_log = AnswerLog(ANSWER_LOG_DIR)
+    return _answer_log
+
+def _logged_examples(records):
+    return [
+        (record['product'], record['question'], record['answer'])
+        for record in records if str(record['question']).strip() and str(record['answer']).strip()
+    ]
+
+def record_answer(store_name, product_name, question, answer, source, latency=None):
+    """Gönderilen cevabı cevap günlüğüne ekler; örnek indeksleri sonraki aramalarda bu cevabı da kullanır.
+
+    ``source``: 'auto', 'template', 'manual' ya da 'telegram'; ``latency``:
+    sorunun ilk görülmesinden cevaba kadar geçen süre (sn).
+    """
+    try:
+        get_answer_log().append(store_name, product_name, question, answer, source, latency)
+    except OSError as e:
+        logging.error(f"Cevap günlüğe yazılamadı: {e}")
+
+def read_past_data(file_path="soru_cevap_ornekleri.xlsx"):
+    try:
+        return load_frame(file_path, lambda path: pd.read_excel(path)[EXAMPLE_COLUMNS], name="ornekler")
+    except FileNotFoundError: return None
+    except Exception: return None
+
+# --- Trendyol API ---
+
+PAGE_SIZE = 50
+MAX_PAGES = 100
+
+_page_executor = None
+
+def _page_pool():
+    global _page_executor
+    if _page_executor is None:
+        _page_executor = ThreadPoolExecutor(max_workers=http_havuzu.MAX_CONNECTIONS_PER_HOST, thread_name_prefix="sayfa")
+    return _page_executor
+
+def fetch_page(store, url, params, page):
+    response = http_havuzu.request(store_session(store), "GET", url, params={**params, 'page': page, 'size': PAGE_SIZE})
+    response.raise_for_status()
+    return response.json()
+
+def iter_pages(store, url, params):
+    """Sonuç sayfalarının ``content`` listelerini sırayla üretir.
+
+    İlk sayfadan toplam sayfa sayısı öğrenildikten sonra kalan sayfalar
+    paralel olarak istenir. Herhangi bir sayfa alınamazsa hata fırlatılır.
+    """
+    first = fetch_page(store, url, params, 0)
+    yield first.get('content', [])
+    total_pages = min(first.get('totalPages') or 1, MAX_PAGES)
+    futures = [_page_pool().submit(fetch_page, store, url, params, page) for page in range(1, total_pages)]
+    for future in futures:
+        yield future.result().get('content', [])
+
+def date_range_params(since):
+    """Artımlı yoklama için ``since`` (ms) ile şimdiki zaman arasını kapsayan parametreler."""
+    if since is None:
+        return {}
+    return {'startDate': int(since), 'endDate': int(time.time() * 1000)}
+
+def high_water_mark(items, field, current=None):
+    values = [item.get(field) for item in items if isinstance(item, dict) and item.get(field)]
+    if current:
+        values.append(current)
+    return max(values) if values else None
+
+def parse_retry_after(value):
+    """``Retry-After`` başlığını saniyeye çevirir (sayı ya da HTTP tarihi); geçersizse ``None``."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _report_error(on_error, status, response=None):
+    if on_error is not None:
+        on_error(status, parse_retry_after(response.headers.get('Retry-After')) if response is not None else None)
+
+def get_pending_claims(store, since=None, on_error=None):
+    """Onay bekleyen talepleri döndürür; istek başarısız olursa ``None``.
+
+    ``since`` (ms) verilirse yalnızca bu tarihten sonra oluşturulan talepler istenir.
+    ``on_error(durum, retry_after)`` verilirse hata ayrıntısı (HTTP durum kodu
+    ve ``Retry-After`` saniyesi) ona bildirilir.
+    """
+    url = f"{TRENDYOL_API_URL}/integration/order/sellers/{store['seller_id']}/claims"
+    params = {'claimItemStatus': 'WaitingInAction', **date_range_params(since)}
+    with olcumler.track("trendyol_claims", store['name']) as call:
+        try:
+            claims = []
+            for content in iter_pages(store, url, params):
+                claims.extend(content)
+            return claims
+        except requests.exceptions.HTTPError as e:
+            call.error(e.response.status_code)
+            _report_error(on_error, e.response.status_code, e.response)
+            logging.error(f"{store['name']} için talepler alınamadı (HTTP Hatası): {e.response.status_code} - {e.response.text}")
+        except requests.exceptions.RequestException as e:
+            call.error("connection")
+            _report_error(on_error, "connection")
+            logging.error(f"{store['name']} için talepler alınamadı (Bağlantı Hatası): {e}")
+        except Exception as e:
+            call.error()
+            _report_error(on_error, "error")
+            logging.error(f"{store['name']} için talepler alınırken beklenmedik bir hata oluştu: {e}")
+    return None
+
+def approve_claim_items(store, claim_id, claim_item_ids, on_error=None):
+    """Talep kalemlerini onaylar; ``(başarılı_mı, mesaj)`` döndürür.
+
+    ``on_error(durum, retry_after)`` verilirse hata ayrıntısı ona bildirilir.
+    """
+    url = f"{TRENDYOL_API_URL}/integration/order/sellers/{store['seller_id']}/claims/{claim_id}/items/approve"
+    data = {"claimLineItemIdList": claim_item_ids, "params": {}}
+    with olcumler.track("trendyol_approve", store['name']) as call:
+        try:
+            response = http_havuzu.request(store_session(store), "PUT", url, json=data)
+            response.raise_for_status()
+            return True, response.text
+        except requests.exceptions.HTTPError as e:
+            call.error(e.response.status_code)
+            _report_error(on_error, e.response.status_code, e.response)
+            error_message = f"HTTP Hatası: {e.response.status_code} - {e.response.text}"
+            logging.error(f"{store['name']} için talep onayı başarısız: {error_message}")
+            return False, error_message
+        except requests.exceptions.RequestException as e:
+            call.error("connection")
+            _report_error(on_error, "connection")
+            error_message = f"Bağlantı Hatası: {e}"
+            logging.error(f"{store['name']} için talep onayı başarısız: {error_message}")
+            return False, error_message
+        except Exception as e:
+            call.error()
+            _report_error(on_error, "")
+            error_message = f"Beklenmedik bir hata oluştu: {e}"
+            logging.error(f"{store['name']} için talep onayı başarısız: {error_message}")
+            return False, error_message
+
+def get_waiting_questions(store, since=None, on_error=None):
+    """Cevap bekleyen soruları döndürür; istek başarısız olursa ``None``.
+
+    ``since`` (ms) verilirse yalnızca bu tarihten sonra sorulan sorular istenir.
+    ``on_error(durum, retry_after)`` verilirse hata ayrıntısı (HTTP durum kodu
+    ve ``Retry-After`` saniyesi) ona bildirilir.
+    """
+    url = f"{TRENDYOL_API_URL}/integration/qna/sellers/{store['seller_id']}/questions/filter"
+    params = {'status': 'WAITING_FOR_ANSWER', **date_range_params(since)}
+    with olcumler.track("trendyol_questions", store['name']) as call:
+        try:
+            questions = []
+            for content in iter_pages(store, url, params):
+                questions.extend(content)
+            return questions
+        except requests.exceptions.HTTPError as e:
+            call.error(e.response.status_code)
+            _report_error(on_error, e.response.status_code, e.response)
+            logging.error(f"{store['name']} için bekleyen sorular alınamadı (HTTP Hatası): {e.response.status_code} - {e.response.text}")
+        except requests.exceptions.RequestException as e:
+            call.error("connection")
+            _report_error(on_error, "connection")
+            logging.error(f"{store['name']} için bekleyen sorular alınamadı (Bağlantı Hatası): {e}")
+        except Exception as e:
+            call.error()
+            _report_error(on_error, "error")
+            logging.error(f"{store['name']} için bekleyen sorular alınırken beklenmedik bir hata oluştu: {e}")
+    return None
+
+def send_answer(store, question_id, answer_text):
+    url = f"{TRENDYOL_API_URL}/integration/qna/sellers/{store['seller_id']}/questions/{question_id}/answers"
+    data = {"text": answer_text}
+    with olcumler.track("trendyol_answer", store['name']) as call:
+        try:
+            response = http_havuzu.request(store_session(store), "POST", url, json=data)
+            response.raise_for_status()
+            return True, response.text
+        except requests.exceptions.HTTPError as e:
+            call.error(e.response.status_code)
+            error_message = f"HTTP Hatası: {e.response.status_code} - {e.response.text}"
+            logging.error(f"{store['name']} için cevap gönderilemedi: {error_message}")
+            return False, error_message
+        except requests.exceptions.RequestException as e:
+            call.error("connection")
+            error_message = f"Bağlantı Hatası: {e}"
+            logging.error(f"{store['name']} için cevap gönderilemedi: {error_message}")
+            return False, error_message
+        except Exception as e:
+            call.error()
+            error_message = f"Beklenmedik bir hata oluştu: {e}"
+            logging.error(f"{store['name']} için cevap gönderilemedi: {error_message}")
+            return False, error_message
+
+# --- OpenAI ---
+
+_openai_client = None
+_answer_cache = None
+_openai_client_lock = threading.Lock()
+_rate_limiter = RateLimiter(Config.openai_rpm_limit, Config.openai_tpm_limit)
+
+def safe_generate_answer(product_name, question, example_index, config: Config, store_name=""):
+    if not openai.api_key:
+        logging.error("OpenAI API anahtarı bulunamadı.")
+        return None, "OpenAI API anahtarı bulunamadı."
+
+    examples = []
+    match_count = 0
+    if example_index is not None and len(example_index):
+        # Bütçeye sığmayan ya da tekrarlanan örneklerin yerine geçebilsin diye fazladan aday alınır.
+        examples, match_count = example_index.search(str(product_name), str(question), k=max(config.max_examples * 2, 1))
+
+    if config.min_examples > 0 and match_count < config.min_examples:
+        return None, f"Örnek sayısı yetersiz ({match_count}/{config.min_examples})."
+
+    messages, stats = build_messages(
+        product_name, question, examples, config.openai_model,
+        budget=config.prompt_token_budget, example_max_tokens=config.example_max_tokens, max_examples=config.max_examples,
+    )
+
+    def compute():
+        # Örnek istatistikleri yalnızca gerçekten OpenAI'ye giden istemler için sayılır (önbellek isabetleri hariç).
+        for outcome in ('used', 'truncated', 'dropped', 'duplicate'):
+            if stats[outcome]:
+                olcumler.PROMPT_EXAMPLES.inc(outcome, amount=stats[outcome])
+        return complete_prompt(messages, config)
+
+    key = make_key(config.openai_model, config.openai_temperature, config.openai_max_tokens,
+                   json.dumps(messages, ensure_ascii=False))
+    with olcumler.track("answer_generation", store_name) as call:
+        answer, reason = get_answer_cache().get_or_compute(key, compute)
+        if answer is None:
+            call.error()
+    return answer, reason
+
+def get_openai_client():
+    """Bağlantı havuzunu tekrar kullanmak için tek bir istemci paylaşılır."""
+    global _openai_client
+    with _openai_client_lock:
+        if _openai_client is None or _openai_client.api_key != openai.api_key:
+            # Yeniden deneme ve geri çekilme call_with_backoff tarafından yönetilir.
+            _openai_client = openai.OpenAI(api_key=openai.api_key, max_retries=0)
+        return _openai_client
+
+def get_answer_cache():
+    global _answer_cache
+    with _openai_client_lock:
+        if _answer_cache is None:
+            _answer_cache = AnswerCache()
+        return _answer_cache
+
+def openai_retry_after(error):
+    response = getattr(error, 'response', None)
+    return parse_retry_after(response.headers.get('retry-after')) if response is not None else None
+
+def report_usage(usage, config: Config, estimated_tokens, seconds):
+    """Çağrının girdi/çıktı tokenlarını ve tahmini maliyetini ölçümlere ve günlüğe yazar."""
+    details = getattr(usage, 'prompt_tokens_details', None)
+    cached = getattr(details, 'cached_tokens', None) or 0
+    cost = estimate_cost(usage.prompt_tokens, usage.completion_tokens, cached, config.openai_input_price,
+                         config.openai_cached_input_price, config.openai_output_price)
+    olcumler.OPENAI_TOKENS.inc(config.openai_model, "prompt", amount=usage.prompt_tokens)
+    olcumler.OPENAI_TOKENS.inc(config.openai_model, "completion", amount=usage.completion_tokens)
+    olcumler.OPENAI_TOKENS.inc(config.openai_model, "cached", amount=cached)
+    olcumler.OPENAI_COST.inc(config.openai_model, amount=cost)
+    logging.info(
+        f"OpenAI çağrısı ({config.openai_model}): {usage.prompt_tokens} girdi token "
+        f"({cached} önbellekten, yerel tahmin {estimated_tokens}), {usage.completion_tokens} çıktı token, "
+        f"~{cost:.6f} USD, {seconds:.2f} sn."
+    )
+
+def complete_prompt(messages, config: Config):
+    _rate_limiter.configure(config.openai_rpm_limit * _rate_limit_share, config.openai_tpm_limit * _rate_limit_share)
+    estimated_tokens = messages_tokens(messages, config.openai_model)
+    with olcumler.track("openai_completion") as call:
+        try:
+            started = time.monotonic()
+            response = call_with_backoff(
+                lambda: get_openai_client().chat.completions.create(
+                    model=config.openai_model,
+                    messages=messages,
+                    max_tokens=config.openai_max_tokens,
+                    temperature=config.openai_temperature
+                ),
+                _rate_limiter,
+                estimated_tokens + config.openai_max_tokens,
+                is_rate_limited=lambda e: isinstance(e, openai.RateLimitError),
+                retry_after=openai_retry_after,
+            )
+            if response.usage is not None:
+                report_usage(response.usage, config, estimated_tokens, time.monotonic() - started)
+            answer = response.choices[0].message.content.strip()
+            return (answer, "")
+        except openai.APIError as e:
+            call.error(getattr(e, "status_code", None) or "api_error")
+            logging.error(f"OpenAI API Hatası: {e}")
+            return None, f"OpenAI API Hatası: {e}"
+        except Exception as e:
+            call.error()
+            logging.error(f"OpenAI'den cevap üretilirken beklenmedik bir hata oluştu: {e}")
+            return None, f"Beklenmedik bir hata: {e}"
+
+# --- Karar Yardımcıları ---
+
+def unique_questions(all_questions_raw):
+    questions_data = []
+    seen_question_ids = set()
+    for q in all_questions_raw or []:
+        if isinstance(q, dict) and q.get("id"):
+            q_id = q["id"]
+            if q_id not in seen_question_ids:
+                questions_data.append(q)
+                seen_question_ids.add(q_id)
+    return questions_data
+
+def claim_item_ids(claim):
+    return [item.get('id') for batch in claim.get('items', []) for item in batch.get('claimItems', [])]
+
+def escape_markdown(text):
+    """Müşteri ve ürün metinlerindeki Markdown karakterlerini kaçırır; mesaj biçimlendirmesi bozulmaz."""
+    return MARKDOWN_SPECIAL.sub(r"\\\1", str(text or ""))
+
+def _unescape_markdown(text):
+    # Mesaj düz metin olarak ulaştıysa kaçış karakterleri metinde kalır.
+    return re.sub(r"\\([_*`\[])", r"\1", text.strip())
+
+def format_question_notification(store, q):
+    return (
+        f"🔔 *Yeni Soru!*\n\n"
+        f"🏪 Mağaza: {escape_markdown(store['name'])}\n"
+        f"📦 Ürün: {escape_markdown(q.get('productName', ''))}\n"
+        f"❓ Soru: {escape_markdown(q.get('text', ''))}\n"
+        f"(Soru ID: {q['id']})\n\n"
+        f"👇 *Cevaplamak için bu mesaja yanıt verin veya `#keyword` kullanın. Tüm şablonları görmek için `/sablonlar` yazın.*"
+    )
+
+def _shorten(text, limit):
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+def format_question_digest(store, questions):
+    """Yeni soruları ``DIGEST_MAX_ITEMS``'lık özet mesajlara böler; mesaj metinlerinin listesini döndürür."""
+    messages = []
+    for start in range(0, len(questions), DIGEST_MAX_ITEMS):
+        chunk = questions[start:start + DIGEST_MAX_ITEMS]
+        lines = [
+            f"🗂 *{len(chunk)} Yeni Soru*\n",
+            f"🏪 Mağaza: {escape_markdown(store['name'])}\n",
+        ]
+        for number, q in enumerate(chunk, start=1):
+            lines.append(
+                f"*{number}.* {escape_markdown(_shorten(q.get('productName', ''), 60))} — "
+                f"{escape_markdown(_shorten(q.get('text', ''), 250))} (Soru ID: {q['id']})"
+            )
+        lines.append("\n👇 *Cevaplamak için bu mesaja `sıra no + cevap` şeklinde yanıt verin (ör. `2 Merhaba...` veya `2 #keyword`).*")
+        messages.append("\n".join(lines))
+    return messages
+
+def auto_answer_remaining(first_seen, config: Config, now=None):
+    """Otomatik cevaba kalan süreyi döndürür; süre dolduysa ``timedelta(0)``."""
+    now = now or datetime.now()
+    if config.delay_minutes == 0:
+        return timedelta(0)
+    remaining = timedelta(minutes=config.delay_minutes) - (now - first_seen)
+    return max(remaining, timedelta(0))
+
+def parse_question_reply(original_text):
+    """Bildirim mesajından ``(question_id, store_name)`` çıkarır; bulunamazsa ``None``."""
+    match_id = re.search(r"\(Soru ID: (\d+)\)", original_text)
+    match_store = STORE_LINE_PATTERN.search(original_text)
+    if not (match_id and match_store):
+        return None
+    return int(match_id.group(1)), _unescape_markdown(match_store.group(1))
+
+def is_question_digest(original_text):
+    return DIGEST_ITEM_PATTERN.search(original_text) is not None
+
+def parse_digest_reply(original_text, reply_text):
+    """Özet mesaja verilen ``"2 cevap"`` yanıtından ``(question_id, store_name, cevap)`` çıkarır; bulunamazsa ``None``."""
+    items = dict(DIGEST_ITEM_PATTERN.findall(original_text))
+    match_store = STORE_LINE_PATTERN.search(original_text)
+    match_reply = re.match(r"(\d+)[.):]?\s+(.+)", reply_text, re.S)
+    if not (match_store and match_reply) or match_reply.group(1) not in items:
+        return None
+    return int(items[match_reply.group(1)]), _unescape_markdown(match_store.group(1)), match_reply.group(2).strip()
+
+def format_template_list(templates):
+    if templates:
+        template_list_message = "📋 *Kullanılabilir Cevap Şablonları:*\n\n"
+        for keyword in templates.keys():
+            template_list_message += f"`#{keyword}`\n"
+        template_list_message += "\n_(Bir soruya cevap verirken bu anahtar kelimeleri kullanabilirsiniz.)_"
+    else:
+        template_list_message = "❌ Hiç cevap şablonu bulunamadı. Lütfen `cevap_sablonlari.xlsx` dosyasını kontrol edin."
+    return template_list_message
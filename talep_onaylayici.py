@@ -0,0 +1,140 @@
+import time
+import random
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from servisler import approve_claim_items
+from uretim_zamanlayici import backoff_delay
+
+# İade/talep onaylarının toplu işlenmesi.
+#
+# Bir mağazanın onaylanacak tüm talepleri aynı döngüde eşzamanlı gönderilir.
+# Geçici hatalar (bağlantı, 408, 429, 5xx) önce döngü içinde kısa geri
+# çekilmeyle, sonra sonraki döngülerde üstel artan aralıkla yeniden denenir;
+# kalıcı hatalar (diğer 4xx) bir daha denenmez. Her talebin durumu durum
+# deposundaki ``claim_approvals`` tablosunda tutulduğu için onaylanan talep
+# ikinci kez gönderilmez ve aynı talebi iki işleyici aynı anda denemez.
+
+APPROVAL_PARALLELISM = 4
+# Döngü içindeki deneme sayısı; bekleme süresi daha uzunsa sonraki döngüye bırakılır.
+IN_CYCLE_ATTEMPTS = 3
+MAX_IN_CYCLE_WAIT_SECONDS = 5
+# Toplam deneme sınırı; aşılırsa talep kalıcı hatayla bırakılır.
+MAX_ATTEMPTS = 8
+RETRY_BASE_SECONDS = 60
+MAX_RETRY_SECONDS = 60 * 60
+TRANSIENT_STATUSES = {408, 425, 429}
+
+
+def is_transient(status):
+    """Bağlantı hataları, 408/425/429 ve 5xx yeniden denenir; diğer HTTP hataları kalıcıdır."""
+    if not isinstance(status, int):
+        return True
+    return status in TRANSIENT_STATUSES or status >= 500
+
+
+def retry_delay(attempts, retry_after=None):
+    """``attempts`` başarısız denemeden sonra sonraki döngüde yeniden denemeye kadar beklenecek süre."""
+    delay = min(MAX_RETRY_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+    if retry_after is not None:
+        delay = max(delay, float(retry_after))
+    return delay
+
+
+class ApprovalResult:
+    def __init__(self, claim_id, outcome, attempts=0, message=""):
+        self.claim_id = claim_id
+        # 'approved', 'retry', 'failed' ya da 'skipped' (onaylanmış/başka işleyicide/zamanı gelmemiş).
+        self.outcome = outcome
+        self.attempts = attempts
+        self.message = message
+
+    @property
+    def auto_result(self):
+        if self.outcome == 'approved':
+            return "Talep başarıyla otomatik onaylandı."
+        if self.outcome == 'retry':
+            return f"Otomatik onay geçici olarak başarısız ({self.attempts}. deneme), yeniden denenecek: {self.message}"
+        if self.outcome == 'failed':
+            return f"Otomatik onay başarısız: {self.message}"
+        return None
+
+
+class BatchResult:
+    def __init__(self, store_name, results, seconds):
+        self.store_name = store_name
+        self.results = results
+        self.seconds = seconds
+
+    def count(self, outcome):
+        return sum(1 for result in self.results if result.outcome == outcome)
+
+    def summary(self):
+        return (
+            f"{len(self.results)} talep işlendi: {self.count('approved')} onaylandı, "
+            f"{self.count('retry')} yeniden denenecek, {self.count('failed')} başarısız, "
+            f"{self.count('skipped')} atlandı ({self.seconds:.1f} sn)."
+        )
+
+    def to_dict(self):
+        return {
+            'time': time.time(),
+            'seconds': self.seconds,
+            **{outcome: self.count(outcome) for outcome in ('approved', 'retry', 'failed', 'skipped')},
+        }
+
+
+class ClaimApprover:
+    def __init__(self, db, parallelism=APPROVAL_PARALLELISM, in_cycle_attempts=IN_CYCLE_ATTEMPTS,
+                 max_attempts=MAX_ATTEMPTS):
+        self.db = db
+        self.in_cycle_attempts = in_cycle_attempts
+        self.max_attempts = max_attempts
+        self.executor = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="talep-onay")
+
+    def approve(self, store, claims):
+        """``(claim_id, item_ids)`` çiftlerini eşzamanlı onaylar ve bir ``BatchResult`` döndürür."""
+        started = time.monotonic()
+        futures = [self.executor.submit(self._approve_one, store, claim_id, item_ids) for claim_id, item_ids in claims]
+        results = []
+        for future, (claim_id, _) in zip(futures, claims):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logging.exception(f"[{store['name']}] Talep {claim_id} onaylanırken beklenmedik hata")
+                self.db.finish_claim_approval(claim_id, 'retry', 1, str(e), time.time() + retry_delay(1))
+                results.append(ApprovalResult(claim_id, 'retry', 1, str(e)))
+        return BatchResult(store['name'], results, time.monotonic() - started)
+
+    def _approve_one(self, store, claim_id, item_ids):
+        attempts = self.db.try_begin_claim_approval(claim_id, store['name'], item_ids)
+        if attempts is None:
+            return ApprovalResult(claim_id, 'skipped')
+        for attempt in range(self.in_cycle_attempts):
+            errors = []
+            success, message = approve_claim_items(
+                store, claim_id, item_ids, on_error=lambda status, retry_after: errors.append((status, retry_after)))
+            attempts += 1
+            if success:
+                self.db.finish_claim_approval(claim_id, 'approved', attempts)
+                return ApprovalResult(claim_id, 'approved', attempts)
+            status, retry_after = errors[-1] if errors else ("", None)
+            if not is_transient(status):
+                if attempts > 1:
+                    # Önceki deneme sunucuya ulaşıp yanıtı kaybolmuş olabilir; talep zaten onaylanmış olabilir.
+                    message += " (Önceki deneme işlenmiş olabilir, lütfen manuel kontrol edin.)"
+                self.db.finish_claim_approval(claim_id, 'failed', attempts, message)
+                return ApprovalResult(claim_id, 'failed', attempts, message)
+            if attempts >= self.max_attempts:
+                message = f"{attempts} denemeden sonra vazgeçildi: {message}"
+                self.db.finish_claim_approval(claim_id, 'failed', attempts, message)
+                return ApprovalResult(claim_id, 'failed', attempts, message)
+            wait_seconds = backoff_delay(attempt, retry_after)
+            if attempt + 1 >= self.in_cycle_attempts or wait_seconds > MAX_IN_CYCLE_WAIT_SECONDS:
+                break
+            time.sleep(wait_seconds)
+        self.db.finish_claim_approval(claim_id, 'retry', attempts, message, time.time() + retry_delay(attempts, retry_after))
+        return ApprovalResult(claim_id, 'retry', attempts, message)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
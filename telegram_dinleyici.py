@@ -0,0 +1,168 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+
+import http_havuzu
+import olcumler
+import servisler
+from durum_deposu import StateStore
+from uretim_zamanlayici import backoff_delay
+from servisler import (
+    read_template_engine, send_answer, send_telegram_message, parse_question_reply,
+    is_question_digest, parse_digest_reply, record_answer,
+)
+
+# Telegram'dan gelen yanıtları uzun yoklama (long polling) ile dinler.
+#
+# getUpdates isteği yeni bir mesaj gelene kadar sunucuda bekletilir; mesaj
+# geldiği anda döner. Bir partideki tüm güncellemeler eşzamanlı işlenir ve
+# parti bittikten sonra ofset durum deposuna yazılır. İşlem yarıda kalırsa
+# aynı güncellemeler tekrar gelir; aynı soruya ikinci kez cevap gönderilmesini
+# soru kilidi engeller.
+
+LONG_POLL_SECONDS = 30
+MAX_PARALLEL_REPLIES = 4
+
+
+class TelegramListener:
+    def __init__(self, state_store: StateStore, stores_map, owner_id, add_event, max_workers=MAX_PARALLEL_REPLIES):
+        self.db = state_store
+        self.stores_map = stores_map
+        self.owner_id = owner_id
+        self.add_event = add_event
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="telegram")
+        self._stop = threading.Event()
+        self._thread = None
+
+    def fetch_updates(self, timeout=LONG_POLL_SECONDS):
+        offset = self.db.get_value('last_update_id', 0) + 1
+        url = f"{servisler.TELEGRAM_API_URL}/bot{servisler.TELEGRAM_BOT_TOKEN}/getUpdates"
+        with olcumler.track("telegram_updates") as call:
+            try:
+                response = http_havuzu.request(
+                    http_havuzu.get_session("telegram"), "GET", url,
+                    params={'offset': offset, 'timeout': timeout, 'allowed_updates': '["message"]'},
+                    # Sunucu isteği en fazla ``timeout`` saniye bekletir; bağlantı süresi için pay bırakılır.
+                    timeout=timeout + http_havuzu.REQUEST_TIMEOUT,
+                )
+                response.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                call.error(e.response.status_code)
+                raise
+            except requests.exceptions.RequestException:
+                call.error("connection")
+                raise
+            return response.json().get("result", [])
+
+    def poll_once(self, timeout=LONG_POLL_SECONDS):
+        """Bir parti güncellemeyi alıp işler; işlenen güncelleme sayısını döndürür."""
+        if not servisler.TELEGRAM_BOT_TOKEN: return 0
+        updates = self.fetch_updates(timeout)
+        if not updates: return 0
+
+        futures = [self.executor.submit(self.handle_update, update) for update in updates]
+        wait(futures)
+        self.db.set_value('last_update_id', max(update.get("update_id", 0) for update in updates))
+        return len(updates)
+
+    def handle_update(self, update):
+        try:
+            self.handle_telegram_message(update.get('message'))
+        except Exception as e:
+            logging.error(f"Telegram güncellemesi işlenirken hata: {e}")
+
+    def handle_telegram_message(self, message):
+        if not message: return
+        chat_id = str(message['chat']['id'])
+        if chat_id not in servisler.AUTHORIZED_CHAT_IDS: return
+
+        engine = read_template_engine()
+        reply_text = message.get("text", "").strip()
+
+        if reply_text == "/sablonlar":
+            send_telegram_message(engine.listing, chat_id=chat_id)
+            return
+
+        if 'reply_to_message' not in message: return
+        original_text = message['reply_to_message'].get("text", "")
+        if is_question_digest(original_text):
+            parsed = parse_digest_reply(original_text, reply_text)
+            if not parsed:
+                send_telegram_message("‼️ Özet mesajda cevaplamak için soru sıra numarasını yazın (ör. `2 Merhaba...` veya `2 #keyword`).", chat_id=chat_id)
+                return
+            question_id, store_name, reply_text = parsed
+        else:
+            parsed = parse_question_reply(original_text)
+            if not parsed: return
+            question_id, store_name = parsed
+        if store_name not in self.stores_map:
+            send_telegram_message(f"‼️ Yanıtlanan mesajdaki `{store_name}` mağazası bulunamadı; cevap gönderilmedi.", chat_id=chat_id)
+            return
+        store = self.stores_map[store_name]
+
+        if reply_text.startswith("#"):
+            keyword = reply_text[1:].strip()
+            matches = engine.resolve(keyword)
+            if not matches:
+                send_telegram_message(f"‼️ `{store_name}` için `#{keyword}` adında bir şablon bulunamadı.", chat_id=chat_id)
+                return
+            if len(matches) > 1:
+                options = ", ".join(f"`#{match}`" for match in matches)
+                send_telegram_message(f"❔ `#{keyword}` birden fazla şablona uyuyor: {options}. Lütfen birini seçin.", chat_id=chat_id)
+                return
+            final_answer = engine.templates[matches[0]]
+        else:
+            final_answer = reply_text
+
+        tracked = self.db.get_question(question_id)
+        if tracked and not self.db.try_lock_question(question_id, self.owner_id):
+            send_telegram_message(f"⚠️ `{store_name}` için (Soru ID: {question_id}) zaten cevaplandı veya şu anda cevaplanıyor.", chat_id=chat_id)
+            return
+
+        success, response_text = send_answer(store, question_id, final_answer)
+        if success:
+            msg = f"✅ `{store_name}` mağazası için (Soru ID: {question_id}) cevabı @{message.get('from', {}).get('username', chat_id)} tarafından gönderildi."
+            self.add_event(store_name, msg)
+            send_telegram_message(msg)
+            if tracked:
+                self.db.mark_question_handled(question_id, 'telegram')
+                record_answer(store_name, tracked['product_name'], tracked['text'], final_answer, 'telegram',
+                              time.time() - tracked['first_seen'])
+        else:
+            if tracked:
+                self.db.unlock_question(question_id, self.owner_id)
+            msg = f"❌ `{store_name}` için cevap gönderilemedi: {response_text}"
+            self.add_event(store_name, msg, level="error")
+            send_telegram_message(msg, chat_id=chat_id)
+
+    # --- Arka plan iş parçacığı ---
+
+    def run(self):
+        failures = 0
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+                failures = 0
+            except (requests.exceptions.RequestException, ValueError) as e:
+                delay = backoff_delay(failures)
+                failures += 1
+                status = getattr(getattr(e, 'response', None), 'status_code', None)
+                if status == 409:
+                    logging.error("Telegram güncellemeleri alınamadı: aynı bot için başka bir getUpdates dinleyicisi veya webhook çalışıyor.")
+                else:
+                    logging.error(f"Telegram güncellemeleri alınamadı: {e}")
+                self._stop.wait(delay)
+
+    def start(self):
+        if not servisler.TELEGRAM_BOT_TOKEN or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.run, name="telegram-dinleyici", daemon=True)
+        self._thread.start()
+        logging.info("Telegram dinleyicisi başladı (uzun yoklama).")
+
+    def stop(self):
+        self._stop.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,150 @@
+import time
+import heapq
+import logging
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from uretim_zamanlayici import TokenBucket, backoff_delay
+
+# Giden Telegram mesajları için kuyruk.
+#
+# Mesajlar kuyruğa eklenir ve arka planda gönderilir; çağıran beklemez.
+# Telegram'ın sınırlarına uyulur: bot genelinde saniyede 30, özel sohbete
+# saniyede ~1, gruba (negatif kimlik) dakikada 20 mesaj. 429 cevabındaki
+# ``retry_after`` süresi boyunca o sohbete gönderim durdurulur; ağ ve 5xx
+# hataları üstel geri çekilmeyle tekrar denenir.
+
+GLOBAL_PER_SECOND = 30
+PRIVATE_CHAT_PER_MINUTE = 60
+GROUP_CHAT_PER_MINUTE = 20
+CHAT_BURST = 3
+MAX_SEND_ATTEMPTS = 5
+SEND_PARALLELISM = 4
+
+
+def _retry_after(response):
+    try:
+        return response.json().get("parameters", {}).get("retry_after")
+    except ValueError:
+        return response.headers.get("Retry-After")
+
+
+class OutboundQueue:
+    def __init__(self, send, per_second=GLOBAL_PER_SECOND, private_per_minute=PRIVATE_CHAT_PER_MINUTE,
+                 group_per_minute=GROUP_CHAT_PER_MINUTE, max_attempts=MAX_SEND_ATTEMPTS, parallelism=SEND_PARALLELISM):
+        # ``send(chat_id, text, parse_mode)`` bir ``requests.Response`` döndürmelidir.
+        self._send = send
+        self.private_per_minute = private_per_minute
+        self.group_per_minute = group_per_minute
+        self.max_attempts = max_attempts
+        self._global = TokenBucket(per_second * 60, burst=per_second)
+        self._chats = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._thread = None
+        self._executor = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="telegram-gonderim")
+        self.counters = {'sent': 0, 'retried': 0, 'failed': 0}
+
+    def put(self, chat_id, text, parse_mode="Markdown"):
+        message = {'chat_id': chat_id, 'text': text, 'parse_mode': parse_mode, 'attempt': 0, 'reserved': False}
+        with self._cond:
+            self._pending += 1
+            self._push(0.0, message)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="telegram-kuyrugu", daemon=True)
+                self._thread.start()
+
+    def flush(self, timeout=None):
+        """Kuyruktaki tüm mesajlar gönderilene (ya da vazgeçilene) kadar bekler."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def stats(self):
+        with self._cond:
+            return dict(self.counters, pending=self._pending)
+
+    def _push(self, not_before, message):
+        heapq.heappush(self._heap, (not_before, next(self._seq), message))
+        self._cond.notify_all()
+
+    def _bucket(self, chat_id):
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # Grup ve kanal kimlikleri negatiftir.
+            per_minute = self.group_per_minute if str(chat_id).startswith("-") else self.private_per_minute
+            bucket = self._chats[chat_id] = TokenBucket(per_minute, burst=CHAT_BURST)
+        return bucket
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    self._cond.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                _, _, message = heapq.heappop(self._heap)
+                if not message['reserved']:
+                    # Sohbetin kotası doluysa mesaj sırası gelene kadar ertelenir; diğer sohbetler beklemez.
+                    message['reserved'] = True
+                    wait = self._bucket(message['chat_id']).reserve(1)
+                    if wait > 0:
+                        self._push(time.monotonic() + wait, message)
+                        continue
+            delay = self._global.reserve(1)
+            if delay > 0:
+                time.sleep(delay)
+            self._executor.submit(self._deliver, message)
+
+    def _done(self, outcome):
+        with self._cond:
+            self.counters[outcome] += 1
+            self._pending -= 1
+            self._cond.notify_all()
+
+    def _retry(self, message, delay):
+        with self._cond:
+            self.counters['retried'] += 1
+            # Tekrar deneme de yeni bir gönderimdir; sohbetin kotasından yeniden pay alır.
+            message['reserved'] = False
+            self._push(time.monotonic() + delay, message)
+
+    def _deliver(self, message):
+        retry_after = None
+        try:
+            response = self._send(message['chat_id'], message['text'], message['parse_mode'])
+            if response.status_code == 200:
+                self._done('sent')
+                return
+            if response.status_code == 429:
+                retry_after = _retry_after(response)
+            elif response.status_code == 400 and message['parse_mode'] and "can't parse entities" in response.text:
+                # Müşteri metinleri kaçırıldığı için beklenmez; yine de bozuk biçimli mesaj düz metin olarak tekrar gönderilir
+                # (cevap ayrıştırıcıları kalan işaretleri temizler).
+                message['parse_mode'] = None
+                self._retry(message, 0)
+                return
+            elif response.status_code < 500:
+                logging.error(f"Telegram mesajı gönderilemedi ({response.status_code}): {response.text[:200]}")
+                self._done('failed')
+                return
+            error = f"HTTP {response.status_code}"
+        except requests.exceptions.RequestException as e:
+            error = str(e)
+        except Exception:
+            logging.exception("Telegram mesajı gönderilirken beklenmedik hata")
+            self._done('failed')
+            return
+
+        message['attempt'] += 1
+        if message['attempt'] >= self.max_attempts:
+            logging.error(f"Telegram mesajı {message['attempt']} denemede gönderilemedi: {error}")
+            self._done('failed')
+            return
+        delay = backoff_delay(message['attempt'], retry_after)
+        if retry_after is not None:
+            self._bucket(message['chat_id']).drain(delay)
+        logging.warning(f"Telegram mesajı gönderilemedi ({error}), {delay:.1f} sn sonra tekrar denenecek.")
+        self._retry(message, delay)
@@ -0,0 +1,42 @@
+import os
+import sys
+import pickle
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sablon_motoru import TemplateEngine  # noqa: E402
+
+
+LETTERS = "abcçdefgğhıijklmnoöprsştuüvyz"
+
+
+def make_engine(count=400, seed=7):
+    # Farklı harflerle başlayan anahtarlar hata bağlantılarını trie boyunca
+    # birbirine bağlar; eski düğüm pickle'ı bunlarda özyineleme sınırını aşıyordu.
+    rng = random.Random(seed)
+    templates = {}
+    while len(templates) < count:
+        keyword = " ".join(
+            "".join(rng.choice(LETTERS) for _ in range(rng.randint(3, 9))) for _ in range(rng.randint(1, 3))
+        )
+        templates[keyword] = f"Şablon metni {len(templates)}"
+    templates["kargo süresi"] = "Siparişiniz 2 iş günü içinde kargoya verilir."
+    return TemplateEngine(templates, listing="liste")
+
+
+def test_pickle_round_trip_with_many_keywords():
+    engine = make_engine()
+    restored = pickle.loads(pickle.dumps(engine))
+
+    assert restored.templates == engine.templates
+    assert restored.listing == "liste"
+    assert len(restored) == len(engine)
+    # Otomat yüklemede yeniden kurulur; arama sonuçları aynı kalır.
+    keywords = list(engine.templates)
+    for query in keywords[::25] + ["kargo", "kargo suresi", keywords[3][:-1]]:
+        assert restored.resolve(query) == engine.resolve(query)
+    text = f"Kargo süresi ne kadar? {keywords[10]} ve {keywords[200]} hakkında bilgi"
+    assert restored.find(text) == engine.find(text)
+    assert len(restored.find(text)) >= 3
+    assert restored.best_match("Kargo süresi ne kadar?") == "kargo süresi"
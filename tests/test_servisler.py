@@ -0,0 +1,34 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from servisler import (  # noqa: E402
+    format_question_notification, format_question_digest, parse_question_reply, parse_digest_reply,
+)
+
+STORE = {'name': "Ev_Dekor *Shop*"}
+QUESTION = {'id': 42, 'productName': "Masa_Lambası *Yeni*", 'text': "Ampul dahil mi?"}
+
+
+def plain_text(message):
+    # Markdown ayrıştırılamayıp mesaj düz metin gönderildiğinde kaçış karakterleri kalır.
+    return message
+
+
+def parsed_text(message):
+    # Telegram biçimlendirmeyi uyguladığında yanıtlanan mesajda kaçışlar ve işaretler görünmez.
+    text = message.replace("\\_", "\0").replace("\\*", "\1")
+    return text.replace("*", "").replace("`", "").replace("\0", "_").replace("\1", "*")
+
+
+def test_notification_reply_keeps_store_name_with_markdown_characters():
+    message = format_question_notification(STORE, QUESTION)
+    for render in (plain_text, parsed_text):
+        assert parse_question_reply(render(message)) == (42, "Ev_Dekor *Shop*")
+
+
+def test_digest_reply_keeps_store_name_with_markdown_characters():
+    message = format_question_digest(STORE, [QUESTION, {**QUESTION, 'id': 43}])[0]
+    for render in (plain_text, parsed_text):
+        assert parse_digest_reply(render(message), "2 Evet, dahildir.") == (43, "Ev_Dekor *Shop*", "Evet, dahildir.")
@@ -0,0 +1,130 @@
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# OpenAI cevap üretimi için hız sınırlama ve zamanlama yardımcıları.
+#
+# RateLimiter dakikalık istek (RPM) ve token (TPM) sınırlarını iki ayrı token
+# kovasıyla uygular; kova boşsa çağıran iş parçacığı dolana kadar bekler.
+# GenerationScheduler işleri son tarihlerine göre sıralar ve sınırlı sayıda
+# iş parçacığında eşzamanlı çalıştırır.
+
+DEFAULT_MAX_RETRIES = 5
+BASE_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+
+
+class TokenBucket:
+    def __init__(self, per_minute, burst=None):
+        # ``burst`` verilmezse kova bir dakikalık kotayı birden harcayabilir.
+        self._lock = threading.Lock()
+        self.burst = burst
+        self.capacity = max(float(burst or per_minute), 1.0)
+        self.rate = max(float(per_minute), 1.0) / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def set_rate(self, per_minute):
+        with self._lock:
+            self._refill()
+            self.capacity = max(float(self.burst or per_minute), 1.0)
+            self.rate = max(float(per_minute), 1.0) / 60.0
+            self.tokens = min(self.tokens, self.capacity)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount):
+        """``amount`` kadar token ayırır ve beklenmesi gereken süreyi (sn) döndürür."""
+        with self._lock:
+            self._refill()
+            amount = min(amount, self.capacity)
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def drain(self, seconds):
+        """Sunucu 429 döndüğünde kovayı boşaltıp ``seconds`` boyunca yeni istek verilmesini engeller."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class RateLimiter:
+    def __init__(self, rpm, tpm):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+    def configure(self, rpm, tpm):
+        if self.requests.capacity != max(float(rpm), 1.0):
+            self.requests.set_rate(rpm)
+        if self.tokens.capacity != max(float(tpm), 1.0):
+            self.tokens.set_rate(tpm)
+
+    def acquire(self, estimated_tokens):
+        wait = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        self.requests.drain(seconds)
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Üstel geri çekilme (tam rastgele sapmalı); sunucu ``Retry-After`` verdiyse ona uyulur."""
+    if retry_after is not None:
+        return min(float(retry_after), MAX_BACKOFF_SECONDS)
+    return random.uniform(0, min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * 2 ** attempt))
+
+
+def call_with_backoff(fn, limiter, estimated_tokens, is_rate_limited, retry_after=lambda e: None,
+                      max_retries=DEFAULT_MAX_RETRIES):
+    """``fn()`` çağrısını hız sınırına uyarak yapar; 429 hatalarında geri çekilerek tekrar dener."""
+    for attempt in range(max_retries + 1):
+        limiter.acquire(estimated_tokens)
+        try:
+            return fn()
+        except Exception as e:
+            if not is_rate_limited(e) or attempt == max_retries:
+                raise
+            delay = backoff_delay(attempt, retry_after(e))
+            limiter.pause(delay)
+            logging.warning(f"OpenAI hız sınırına takıldı, {delay:.1f} sn sonra tekrar denenecek ({attempt + 1}/{max_retries}).")
+            time.sleep(delay)
+
+
+class GenerationScheduler:
+    def __init__(self, max_parallel=4):
+        self.max_parallel = max_parallel
+        self._executor = None
+
+    def _pool(self, max_parallel):
+        if self._executor is None or self.max_parallel != max_parallel:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self.max_parallel = max_parallel
+            self._executor = ThreadPoolExecutor(max_workers=max(1, max_parallel), thread_name_prefix="uretim")
+        return self._executor
+
+    def run(self, jobs, max_parallel=None):
+        """``(son_tarih, çağrılabilir)`` işlerini en yakın son tarihten başlayarak çalıştırır.
+
+        Tüm işler bitene kadar bekler; iş sonuçlarını gönderim sırasıyla döndürür.
+        """
+        pool = self._pool(max_parallel or self.max_parallel)
+        futures = [pool.submit(job) for _, job in sorted(jobs, key=lambda item: item[0])]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logging.exception("Cevap üretim işi başarısız oldu")
+                results.append(e)
+        return results
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
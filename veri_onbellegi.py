@@ -0,0 +1,129 @@
+import os
+import glob
+import pickle
+import logging
+import tempfile
+import threading
+
+import pandas as pd
+
+import olcumler
+
+# Excel dosyaları openpyxl ile ayrıştırılması yavaş olduğundan bir kez okunup
+# sütunsal bir önbellek dosyasına (pyarrow kuruluysa Parquet, değilse pickle)
+# dönüştürülür. Önbellek anahtarı kaynak dosyanın mtime ve boyutudur; kaynak
+# değişmedikçe panel ve arka plan işleyicisi aynı önbellek dosyasını okur.
+# Aynı süreç içindeki tekrar çağrılar bellekteki tek kopyayı döndürür.
+
+CACHE_DIR = os.environ.get("PANEL_ONBELLEK_DIZINI", ".onbellek")
+
+try:
+    import pyarrow  # noqa: F401
+    FRAME_FORMAT = "parquet"
+except ImportError:
+    FRAME_FORMAT = "pkl"
+
+_memory = {}
+# İndeks gibi türetilmiş nesneler kurulurken tablo önbelleği de çağrıldığı için yeniden girilebilir kilit.
+_lock = threading.RLock()
+
+
+def source_key(file_path):
+    """Kaynak dosya değiştiğinde değişen anahtar; dosya yoksa ``None``."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def _cache_path(file_path, name, key, extension):
+    base = os.path.basename(file_path)
+    return os.path.join(CACHE_DIR, f"{base}.{name}.{key}.{extension}")
+
+
+def _write_atomic(path, writer):
+    """``writer(geçici_yol)`` ile yazıp hedefin üzerine taşır; okuyucular yarım dosya görmez."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+    os.close(fd)
+    try:
+        writer(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _remove_stale(file_path, name, keep):
+    pattern = os.path.join(CACHE_DIR, f"{glob.escape(os.path.basename(file_path))}.{name}.*")
+    for path in glob.glob(pattern):
+        if path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _read_frame(path):
+    if FRAME_FORMAT == "parquet":
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def _write_frame(df, path):
+    if FRAME_FORMAT == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_pickle(path)
+
+
+def _cached(file_path, name, extension, build, read, write):
+    key = source_key(file_path)
+    if key is None:
+        raise FileNotFoundError(file_path)
+    memo_key = (os.path.abspath(file_path), name)
+    with _lock:
+        hit = _memory.get(memo_key)
+        if hit and hit[0] == key:
+            return hit[1]
+
+        path = _cache_path(file_path, name, key, extension)
+        value = None
+        if os.path.exists(path):
+            with olcumler.track(f"file_read_{name}") as call:
+                try:
+                    value = read(path)
+                except Exception as e:
+                    call.error()
+                    logging.warning(f"Önbellek dosyası okunamadı, kaynak yeniden okunuyor: {e}")
+        if value is None:
+            with olcumler.track(f"file_build_{name}"):
+                value = build()
+            try:
+                _write_atomic(path, lambda tmp_path: write(value, tmp_path))
+                _remove_stale(file_path, name, keep=path)
+            except Exception as e:
+                logging.warning(f"Önbellek dosyası yazılamadı ({path}): {e}")
+        _memory[memo_key] = (key, value)
+        return value
+
+
+def load_frame(file_path, reader=pd.read_excel, name="tablo"):
+    """``reader(file_path)`` sonucunu önbellekten ya da kaynaktan döndürür."""
+    return _cached(file_path, name, FRAME_FORMAT, lambda: reader(file_path), _read_frame, _write_frame)
+
+
+def load_object(file_path, builder, name):
+    """Kaynaktan türetilen bir nesneyi (ör. arama indeksi) pickle önbelleğiyle döndürür."""
+    def read(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def write(value, path):
+        with open(path, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    return _cached(file_path, name, "pkl", builder, read, write)
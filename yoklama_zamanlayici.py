@@ -0,0 +1,156 @@
+import math
+import time
+import random
+import logging
+
+# Mağaza başına uyarlanabilir yoklama zamanlaması.
+#
+# Her mağazanın yeni soru/talep geliş hızı üstel hareketli ortalamayla
+# izlenir; yoklama aralığı yoklama başına yaklaşık bir yeni kayıt düşecek
+# şekilde [min_interval, max_interval] arasında ayarlanır. Hatalarda aralık
+# üstel olarak büyür, art arda ``failure_threshold`` hatadan sonra devre
+# açılır ve ``open_seconds`` boyunca mağaza hiç yoklanmaz. Sunucu
+# ``Retry-After`` verdiyse o süreden önce yoklanmaz. Otomatik cevap son
+# tarihi yaklaşan mağazalar, cevap gönderilmeden önce bir kez daha yoklanır.
+
+DEFAULT_MIN_INTERVAL = 15
+DEFAULT_MAX_INTERVAL = 300
+DEFAULT_MAX_BACKOFF = 900
+FAILURE_THRESHOLD = 5
+CIRCUIT_OPEN_SECONDS = 600
+# Geliş hızı ortalamasının zaman sabiti (sn).
+RATE_TIME_CONSTANT = 15 * 60
+TARGET_ARRIVALS_PER_POLL = 1.0
+# Otomatik cevap son tarihinden bu kadar önce mağaza yeniden yoklanır.
+DEADLINE_LEAD_SECONDS = 10
+
+
+class StoreSchedule:
+    def __init__(self, interval):
+        self.interval = interval
+        self.next_poll = 0.0
+        self.last_poll = None
+        self.arrival_rate = None
+        self.failures = 0
+        self.circuit_open_until = 0.0
+        self.deadline = None
+        self.last_error = None
+
+    def to_dict(self):
+        return {
+            'interval': self.interval,
+            'next_poll': self.next_poll,
+            'last_poll': self.last_poll,
+            'arrivals_per_hour': None if self.arrival_rate is None else self.arrival_rate * 3600,
+            'failures': self.failures,
+            'circuit_open_until': self.circuit_open_until or None,
+            'deadline': self.deadline,
+            'last_error': self.last_error,
+        }
+
+
+class PollScheduler:
+    def __init__(self, store_names, base_interval=60, min_interval=DEFAULT_MIN_INTERVAL,
+                 max_interval=DEFAULT_MAX_INTERVAL, max_backoff=DEFAULT_MAX_BACKOFF,
+                 failure_threshold=FAILURE_THRESHOLD, open_seconds=CIRCUIT_OPEN_SECONDS):
+        self.base_interval = base_interval
+        self.min_interval = min(min_interval, base_interval)
+        self.max_interval = max(max_interval, base_interval)
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.stores = {name: StoreSchedule(base_interval) for name in store_names}
+
+    def is_due(self, name, now=None):
+        now = time.time() if now is None else now
+        schedule = self.stores[name]
+        if now < schedule.circuit_open_until:
+            return False
+        if now >= schedule.next_poll:
+            return True
+        # Son tarihi yaklaşan soru varsa, o noktadan sonra henüz yoklanmadıysa erkenden yoklanır.
+        wake_at = self._deadline_wake(schedule)
+        return wake_at is not None and wake_at <= now
+
+    def due_stores(self, now=None):
+        now = time.time() if now is None else now
+        return [name for name in self.stores if self.is_due(name, now)]
+
+    def _deadline_wake(self, schedule):
+        if schedule.deadline is None:
+            return None
+        wake_at = schedule.deadline - DEADLINE_LEAD_SECONDS
+        if schedule.last_poll is not None and schedule.last_poll >= wake_at:
+            return None
+        return wake_at
+
+    def set_deadline(self, name, deadline):
+        """Mağazadaki en yakın otomatik cevap son tarihini (epoch sn) bildirir; yoksa ``None``."""
+        self.stores[name].deadline = deadline
+
+    def next_wakeup(self):
+        """Herhangi bir mağazanın yoklanması gereken en erken zaman."""
+        times = []
+        for schedule in self.stores.values():
+            candidates = [schedule.next_poll]
+            wake_at = self._deadline_wake(schedule)
+            if wake_at is not None:
+                candidates.append(wake_at)
+            times.append(max(min(candidates), schedule.circuit_open_until))
+        return min(times) if times else None
+
+    def record_success(self, name, arrivals, now=None):
+        now = time.time() if now is None else now
+        schedule = self.stores[name]
+        if schedule.last_poll is not None:
+            elapsed = max(now - schedule.last_poll, 1.0)
+            observed = arrivals / elapsed
+            if schedule.arrival_rate is None:
+                schedule.arrival_rate = observed
+            else:
+                weight = 1 - math.exp(-elapsed / RATE_TIME_CONSTANT)
+                schedule.arrival_rate += weight * (observed - schedule.arrival_rate)
+        if schedule.failures >= self.failure_threshold:
+            logging.info(f"[{name}] Mağaza yeniden yanıt veriyor, devre kapatıldı.")
+        schedule.failures = 0
+        schedule.circuit_open_until = 0.0
+        schedule.last_error = None
+        schedule.last_poll = now
+        schedule.interval = self._adaptive_interval(schedule)
+        schedule.next_poll = now + schedule.interval
+
+    def _adaptive_interval(self, schedule):
+        if schedule.arrival_rate is None:
+            return self.base_interval
+        if schedule.arrival_rate <= 0:
+            return self.max_interval
+        interval = TARGET_ARRIVALS_PER_POLL / schedule.arrival_rate
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def record_failure(self, name, error, retry_after=None, now=None):
+        now = time.time() if now is None else now
+        schedule = self.stores[name]
+        schedule.failures += 1
+        schedule.last_poll = now
+        schedule.last_error = str(error)
+        delay = min(self.max_backoff, self.base_interval * 2 ** (schedule.failures - 1))
+        delay *= random.uniform(0.8, 1.2)
+        if retry_after is not None:
+            delay = max(delay, float(retry_after))
+        schedule.interval = delay
+        schedule.next_poll = now + delay
+        if schedule.failures >= self.failure_threshold:
+            # Yarı açık: süre dolunca tek bir deneme yapılır; o da başarısız olursa devre yeniden açılır.
+            schedule.circuit_open_until = now + max(self.open_seconds, delay)
+            logging.warning(f"[{name}] Art arda {schedule.failures} hata, mağaza {int(schedule.circuit_open_until - now)} sn yoklanmayacak.")
+
+    def reset(self, name=None):
+        """Mağazayı (verilmezse tümünü) hata ve devre durumunu silip hemen yoklanacak hâle getirir."""
+        for store_name in [name] if name is not None else list(self.stores):
+            schedule = self.stores[store_name]
+            schedule.next_poll = 0.0
+            schedule.failures = 0
+            schedule.circuit_open_until = 0.0
+
+    def snapshot(self):
+        return {name: schedule.to_dict() for name, schedule in self.stores.items()}